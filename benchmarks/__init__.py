@@ -0,0 +1,5 @@
+"""
+Offline benchmark harness for Science Downloader.
+
+Run with:  python -m benchmarks.run --help
+"""
@@ -0,0 +1,274 @@
+"""
+Local stand-in for the OpenAlex, CORE, arXiv, NCBI E-utilities and Europe PMC APIs and PDF hosts.
+
+Every DOI is deterministically assigned to one source (or none), so repeated
+runs with the same seed exercise the same fallback paths. Latency, error and
+rate-limit (429) rates are configurable per server.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+
+SOURCES = ("CORE", "arXiv", "NCBI", "EuropePMC")
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock provider server"""
+    latency: float = 0.02  # seconds added to every API response
+    pdf_latency: float = 0.05  # seconds added to every PDF/HTML response
+    error_rate: float = 0.0  # fraction of API responses answered with HTTP 500
+    rate_limit_rate: float = 0.0  # fraction of API responses answered with HTTP 429
+    hit_rate: float = 0.8  # fraction of DOIs that some source can serve
+    html_rate: float = 0.2  # fraction of found papers whose URL returns an HTML landing page
+    openalex_rate: float = 0.5  # fraction of found papers OpenAlex lists with an OA PDF URL
+    pdf_size: int = 200 * 1024  # bytes per served PDF
+    seed: int = 0
+    source_weights: Dict[str, float] = field(default_factory=lambda: {
+        "CORE": 0.4, "arXiv": 0.2, "NCBI": 0.2, "EuropePMC": 0.2
+    })
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Ignore clients hanging up mid-response, which the downloader does on purpose"""
+    
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockProviderServer:
+    """Threaded HTTP server imitating the upstream APIs, for offline benchmarks"""
+    
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or MockSettings()
+        self._random = random.Random(self.settings.seed)
+        self._random_lock = threading.Lock()
+        self._server = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+        self.request_counts: Dict[str, int] = {}
+        self._pmid_to_doi: Dict[str, str] = {}
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def config_overrides(self) -> Dict[str, str]:
+        """AppConfig base URLs pointing at this server"""
+        return {
+            "openalex_base_url": f"{self.base_url}/openalex",
+            "core_base_url": f"{self.base_url}/core/v3",
+            "arxiv_base_url": f"{self.base_url}/arxiv/api/query",
+            "ncbi_base_url": f"{self.base_url}/ncbi/entrez/eutils",
+            "europepmc_base_url": f"{self.base_url}/europepmc/webservices/rest",
+        }
+    
+    def start(self) -> "MockProviderServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    # ------------------------------------------------------------------
+    # Deterministic assignment of DOIs to sources
+    # ------------------------------------------------------------------
+    
+    def _doi_roll(self, doi: str, salt: str) -> float:
+        digest = hashlib.sha256(f"{self.settings.seed}:{salt}:{doi.lower()}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+    
+    def source_for(self, doi: str) -> Optional[str]:
+        """Source that can serve this DOI, or None"""
+        if self._doi_roll(doi, "hit") >= self.settings.hit_rate:
+            return None
+        roll = self._doi_roll(doi, "source") * sum(self.settings.source_weights.values())
+        for source in SOURCES:
+            roll -= self.settings.source_weights.get(source, 0)
+            if roll < 0:
+                return source
+        return SOURCES[-1]
+    
+    def file_url(self, doi: str) -> str:
+        """URL of the full text for a DOI (PDF, or HTML landing page for html_rate of them)"""
+        if self._doi_roll(doi, "html") < self.settings.html_rate:
+            # Landing pages live on their own host name, like publisher sites do
+            port = self._server.server_address[1]
+            return f"http://localhost:{port}/html/{quote(doi, safe='')}"
+        return f"{self.base_url}/pdf/{quote(doi, safe='')}"
+    
+    def _fail_roll(self) -> Optional[int]:
+        with self._random_lock:
+            roll = self._random.random()
+        if roll < self.settings.rate_limit_rate:
+            return 429
+        if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            return 500
+        return None
+    
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, Nagle plus
+            # delayed ACKs add ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+            
+            def log_message(self, format, *args):  # Keep benchmark output clean
+                pass
+            
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                route = parsed.path.strip("/").split("/")[0]
+                server.request_counts[route] = server.request_counts.get(route, 0) + 1
+                
+                extra_headers = {}
+                if route in ("pdf", "html"):
+                    time.sleep(server.settings.pdf_latency)
+                    status, content_type, body = server._file_response(route)
+                    status, body, extra_headers = server._apply_range(self.headers.get("Range"), status, body)
+                else:
+                    time.sleep(server.settings.latency)
+                    failure = server._fail_roll()
+                    if failure is not None:
+                        status, content_type, body = failure, "application/json", b'{"error": "mock failure"}'
+                    else:
+                        status, content_type, body = server._api_response(route, parsed.path, params)
+                
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+        
+        return Handler
+    
+    def _file_response(self, kind: str) -> Tuple[int, str, bytes]:
+        if kind == "html":
+            return 200, "text/html", b"<!DOCTYPE html><html><head><title>Paywall</title></head></html>"
+        body = b"%PDF-1.4\n" + b"0" * max(0, self.settings.pdf_size - 9)
+        return 200, "application/pdf", body
+    
+    @staticmethod
+    def _apply_range(range_header: Optional[str], status: int, body: bytes) -> Tuple[int, bytes, Dict[str, str]]:
+        """Honour a single "bytes=start-end" range like most PDF hosts do"""
+        if not range_header or not range_header.startswith("bytes=") or status != 200:
+            return status, body, {}
+        start_text, _, end_text = range_header[len("bytes="):].partition("-")
+        try:
+            start = int(start_text)
+            end = min(int(end_text) if end_text else len(body) - 1, len(body) - 1)
+        except ValueError:
+            return status, body, {}
+        return 206, body[start:end + 1], {"Content-Range": f"bytes {start}-{end}/{len(body)}"}
+    
+    def _api_response(self, route: str, path: str, params: Dict[str, str]) -> Tuple[int, str, bytes]:
+        if route == "openalex":
+            dois = params.get("filter", "").partition("doi:")[2].split("|")
+            works = []
+            for doi in filter(None, dois):
+                if self.source_for(doi) is None:
+                    continue
+                listed = self._doi_roll(doi, "openalex") < self.settings.openalex_rate
+                location = {"pdf_url": self.file_url(doi), "source": {"type": "repository"}} if listed else None
+                works.append({"doi": f"https://doi.org/{doi}", "title": f"Paper {doi}",
+                              "best_oa_location": location, "locations": [], "updated_date": "2024-01-01"})
+            return self._json({"meta": {"count": len(works)}, "results": works})
+        
+        if route == "core":
+            # q is doi:"X", or several of them OR-joined by the batch resolver
+            dois = re.findall(r'doi:"([^"]*)"', params.get("q", ""))
+            hits = [
+                {"title": f"Paper {doi}", "doi": doi, "downloadUrl": self.file_url(doi)}
+                for doi in dois if self.source_for(doi) == "CORE"
+            ]
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 10))
+            return self._json({"totalHits": len(hits), "results": hits[offset:offset + limit]})
+        
+        if route == "arxiv":
+            query = params.get("search_query", "")
+            doi = query.rpartition("doi:")[2] if "doi:" in query else ""
+            entries = ""
+            if doi and self.source_for(doi) == "arXiv":
+                entries = (
+                    "<entry><id>http://arxiv.org/abs/2401.00001v1</id>"
+                    f"<title>Paper {doi}</title>"
+                    f'<link title="pdf" href="{self.file_url(doi)}" type="application/pdf"/>'
+                    "<author><name>A. Author</name></author></entry>"
+                )
+            body = f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+            return 200, "application/atom+xml", body.encode()
+        
+        if route == "ncbi":
+            endpoint = path.rsplit("/", 1)[-1]
+            if endpoint == "esearch.fcgi":
+                doi = params.get("term", "").replace("[DOI]", "")
+                ids = [self._pmid(doi)] if self.source_for(doi) == "NCBI" else []
+                return self._json({"esearchresult": {"idlist": ids}})
+            if endpoint == "elink.fcgi":
+                if params.get("db") == "pmc":
+                    return self._json({"linksets": [{"linksetdbs": []}]})
+                doi = self._pmid_to_doi.get(params.get("id", ""), "")
+                return self._json({"linksets": [{"iurllist": [
+                    {"url": self.file_url(doi), "name": "Mock full text"}
+                ]}]})
+            if endpoint == "efetch.fcgi":
+                body = (
+                    "<PubmedArticleSet><PubmedArticle><MedlineCitation><Article>"
+                    "<ArticleTitle>Mock NCBI paper</ArticleTitle>"
+                    "</Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+                )
+                return 200, "text/xml", body.encode()
+        
+        if route == "europepmc":
+            doi = params.get("query", "").partition("DOI:")[2].strip('"')
+            if self.source_for(doi) != "EuropePMC":
+                return self._json({"resultList": {"result": []}})
+            return self._json({"resultList": {"result": [{
+                "id": "1", "pmid": "1", "doi": doi, "title": f"Paper {doi}",
+                "isOpenAccess": "Y", "inPMC": "N",
+                "fullTextUrlList": {"fullTextUrl": [
+                    {"url": self.file_url(doi), "documentStyle": "pdf", "site": "Mock"}
+                ]}
+            }]}})
+        
+        return 404, "application/json", b'{"error": "not found"}'
+    
+    def _pmid(self, doi: str) -> str:
+        pmid = str(int(self._doi_roll(doi, "pmid") * 10 ** 8))
+        self._pmid_to_doi[pmid] = doi
+        return pmid
+    
+    @staticmethod
+    def _json(data) -> Tuple[int, str, bytes]:
+        return 200, "application/json", json.dumps(data).encode()
@@ -0,0 +1,193 @@
+"""
+Run the downloader end-to-end against the local mock provider server.
+
+Example:
+    python -m benchmarks.run --dois 200 --latency 0.05 --error-rate 0.02 --json results.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import resource  # POSIX only; max RSS is not reported on Windows
+except ImportError:
+    resource = None
+
+from downloader.config.settings import AppConfig, set_config
+
+from .mock_server import MockProviderServer, MockSettings
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _route_name(url: str) -> str:
+    path = urlparse(url).path.lstrip("/")
+    parts = path.split("/")
+    if parts[0] in ("pdf", "html"):
+        return parts[0]
+    if parts[0] == "ncbi":
+        return f"ncbi/{parts[-1].replace('.fcgi', '')}"
+    return parts[0]
+
+
+def generate_dois(count: int, seed: int = 0) -> List[str]:
+    """Synthetic, valid DOIs"""
+    return [f"10.{5000 + seed}/bench.{index:06d}" for index in range(count)]
+
+
+def run_benchmark(dois: int, settings: MockSettings, work_dir: Path,
+                  config_overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Download a batch of synthetic DOIs from the mock server and measure it.
+    
+    Args:
+        dois: Number of DOIs to download
+        settings: Mock server behaviour
+        work_dir: Scratch directory used as data_dir and output folder
+        config_overrides: Extra AppConfig settings (e.g. worker counts)
+        
+    Returns:
+        Dictionary with throughput, per-request latency and memory figures
+    """
+    from downloader.core.downloaders import ScienceDownloader
+    
+    with MockProviderServer(settings) as server:
+        config = AppConfig(
+            data_dir=work_dir / "data",
+            delay_between_downloads=0,
+            ncbi_rate_limit=10_000,
+            core_rate_limit=600_000,
+            europepmc_rate_limit=600_000,
+            core_retry_base_delay=0.01,
+            core_server_error_delay=0.01,
+            **server.config_overrides(),
+            **(config_overrides or {}),
+        )
+        set_config(config)
+        output_folder = work_dir / "papers"
+        output_folder.mkdir(parents=True, exist_ok=True)
+        
+        downloader = ScienceDownloader(config)
+        latencies: Dict[str, List[float]] = {}
+        latency_lock = threading.Lock()
+        
+        def record_latency(response, *args, **kwargs):
+            route = _route_name(response.url)
+            with latency_lock:
+                latencies.setdefault(route, []).append(response.elapsed.total_seconds())
+        
+        downloader.session.hooks["response"].append(record_latency)
+        
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = downloader.download_papers(generate_dois(dois, settings.seed), output_folder)
+        elapsed = time.perf_counter() - started
+        downloader.close()
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        request_counts = dict(server.request_counts)
+    
+    return {
+        "dois": dois,
+        "settings": vars(settings),
+        "elapsed_seconds": round(elapsed, 3),
+        "dois_per_second": round(dois / elapsed, 2) if elapsed else None,
+        "downloaded": result.get("downloaded", 0),
+        "failed": result.get("failed", 0),
+        "requests": request_counts,
+        "latency_ms": {
+            route: {
+                "count": len(values),
+                "p50": round(_percentile(values, 50) * 1000, 2),
+                "p99": round(_percentile(values, 99) * 1000, 2),
+            }
+            for route, values in sorted(latencies.items())
+        },
+        "peak_traced_memory_mb": round(peak_traced / (1024 * 1024), 2),
+        "max_rss_mb": _max_rss_mb(),
+    }
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 2)
+
+
+def _print_report(report: Dict[str, Any]):
+    print(f"DOIs:        {report['dois']} ({report['downloaded']} downloaded, {report['failed']} failed)")
+    print(f"Elapsed:     {report['elapsed_seconds']}s ({report['dois_per_second']} DOIs/s)")
+    max_rss = f"{report['max_rss_mb']} MB" if report['max_rss_mb'] is not None else "n/a"
+    print(f"Memory:      {report['peak_traced_memory_mb']} MB peak traced, {max_rss} max RSS")
+    print("Latency (ms):")
+    for route, stats in report["latency_ms"].items():
+        print(f"  {route:<16} n={stats['count']:<6} p50={stats['p50']:<8} p99={stats['p99']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the downloader against a local mock provider server")
+    parser.add_argument("--dois", type=int, default=100, help="number of synthetic DOIs to download")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to each API response")
+    parser.add_argument("--pdf-latency", type=float, default=0.05, help="seconds added to each PDF response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API responses returning 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of API responses returning 429")
+    parser.add_argument("--hit-rate", type=float, default=0.8, help="fraction of DOIs some source can serve")
+    parser.add_argument("--html-rate", type=float, default=0.2, help="fraction of found papers behind an HTML page")
+    parser.add_argument("--openalex-rate", type=float, default=0.5, help="fraction of found papers OpenAlex lists")
+    parser.add_argument("--pdf-size", type=int, default=200 * 1024, help="bytes per served PDF")
+    parser.add_argument("--resolve-workers", type=int, help="pipeline resolve workers (0 = one DOI at a time)")
+    parser.add_argument("--fetch-workers", type=int, help="pipeline fetch workers (max_workers)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep downloader log output")
+    args = parser.parse_args(argv)
+    
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    
+    settings = MockSettings(
+        latency=args.latency,
+        pdf_latency=args.pdf_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        hit_rate=args.hit_rate,
+        html_rate=args.html_rate,
+        openalex_rate=args.openalex_rate,
+        pdf_size=args.pdf_size,
+        seed=args.seed,
+    )
+    
+    with tempfile.TemporaryDirectory(prefix="sd-bench-") as work_dir:
+        overrides = {}
+        if args.resolve_workers is not None:
+            overrides["resolve_workers"] = args.resolve_workers
+        if args.fetch_workers is not None:
+            overrides["max_workers"] = args.fetch_workers
+        report = run_benchmark(args.dois, settings, Path(work_dir), overrides)
+    
+    _print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 """Configuration management for Science Downloader"""
 
-from .settings import AppConfig, get_config
+from .settings import AppConfig, get_config, set_config
 
-__all__ = ["AppConfig", "get_config"] 
\ No newline at end of file
+__all__ = ["AppConfig", "get_config", "set_config"] 
\ No newline at end of file
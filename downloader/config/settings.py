@@ -42,6 +42,9 @@ class AppConfig:
     core_rate_limit: int = 10  # requests per minute (free tier)
     core_timeout: int = 30  # seconds
     core_max_results: int = 1  # results per DOI search
+    core_retry_base_delay: float = 10  # seconds; doubled on each 429 retry (10s, 20s, 40s)
+    core_server_error_delay: float = 5  # seconds before retrying after a 500
+    core_batch_size: int = 20  # DOIs OR-joined into one search ahead of downloads (0 = one search per DOI)
     
     # arXiv API settings
     arxiv_base_url: str = "https://export.arxiv.org/api/query"
@@ -59,6 +62,13 @@ class AppConfig:
     ncbi_rate_limit: int = 10  # requests per second with API key (600/minute)
     ncbi_databases: List[str] = field(default_factory=lambda: ["pubmed", "pmc"])
     
+    # OpenAlex API settings (batched DOI resolution ahead of the per-DOI sources)
+    use_openalex: bool = True
+    openalex_base_url: str = "https://api.openalex.org"
+    openalex_email: str = ""  # contact address for OpenAlex's polite pool
+    openalex_timeout: int = 30  # seconds
+    openalex_batch_size: int = 50  # DOIs per works request (OpenAlex allows up to 100)
+    
     # Europe PMC API settings
     europepmc_base_url: str = "https://www.ebi.ac.uk/europepmc/webservices/rest"
     europepmc_timeout: int = 30  # seconds
@@ -66,21 +76,62 @@ class AppConfig:
     europepmc_rate_limit: int = 20  # requests per minute (conservative estimate)
     europepmc_format: str = "json"  # json, xml, or dc
     
-    download_timeout: int = 10
+    # Local snapshot index settings (build with: python -m downloader.core.indexes import ...)
+    use_oa_index: bool = True  # look DOIs up in the OpenAlex/Unpaywall snapshot index before any source API
+    use_pmc_index: bool = True  # check the PMC OA file-list index before NCBI E-utilities and Europe PMC searches
+    pmc_ftp_base_url: str = "https://ftp.ncbi.nlm.nih.gov/pub/pmc"  # root the OA file-list paths are relative to
+    europepmc_site_url: str = "https://europepmc.org"  # serves rendered PDFs of PMC articles
+    use_arxiv_index: bool = True  # check the arXiv metadata index (journal DOI to arXiv ID) before searching arXiv
+    arxiv_pdf_base_url: str = "https://arxiv.org/pdf"  # indexed preprints are fetched from <base>/<arxiv id>
+    
+    # HTTP transport settings
+    dns_cache_ttl: float = 300  # seconds resolved addresses are reused (0 = resolve on every connection)
+    http_pool_size: int = 20  # keep-alive connections kept per host
+    http2_api: bool = True  # use HTTP/2 for API lookups when httpx[http2] is installed
+    
+    download_timeout: int = 10  # seconds per socket read of a PDF transfer
+    transfer_timeout: float = 120  # seconds a whole PDF transfer may take (0 = no limit)
+    min_transfer_rate: int = 10 * 1024  # bytes/s; slower transfers are aborted after min_rate_grace (0 = off)
+    min_rate_grace: float = 5  # seconds a transfer runs before its throughput is checked
+    doi_time_budget: float = 120  # seconds one DOI may spend across all lookups and transfers (0 = no limit)
+    deferred_retries: int = 1  # end-of-job passes for DOIs that ran out of time
+    probe_downloads: bool = True  # fetch the first 1KB of a candidate URL before downloading it in full
+    probe_timeout: int = 10  # seconds
+    probe_reject_after: int = 3  # non-PDF responses in a row before a host's URLs are skipped
+    probe_verdict_ttl: int = 3600  # seconds a cached host verdict is trusted
+    host_min_attempts: int = 5  # attempts before a host's success rate can get it skipped
+    host_min_success_rate: float = 0.1  # hosts below this (and failing lately) are skipped
     delay_between_downloads: int = 8  # 8 seconds = ~7.5 requests/minute (safe for 10/min limit)
-    max_workers: int = 5
+    max_workers: int = 5  # PDF fetch workers in the download pipeline
+    resolve_workers: int = 4  # DOIs looked up concurrently in the download pipeline (0 = one DOI at a time)
+    fetch_queue_size: int = 20  # looked-up DOIs waiting for a fetch worker at most
+    batch_prefetch_size: int = 50  # job DOIs resolved per OpenAlex/CORE batch step
+    parallel_source_lookup: bool = True  # query all sources at once instead of one after another
+    candidate_race_width: int = 3  # candidate URLs opened concurrently per DOI (1 = one at a time)
     
     # Web interface settings
     flask_host: str = "localhost"
     flask_port: int = 5000
-    max_upload_size: int = 16 * 1024 * 1024  # 16MB
+    max_upload_size: Optional[int] = 1024 ** 3  # bytes (1 GiB); uploads are streamed, None = no cap
     
     # File settings
     doi_regex: str = r'^10\.\d{4,9}/[-._;()/:A-Z0-9]+$'
+    extraction_chunk_size: int = 1024 * 1024  # characters read per chunk when streaming exports
+    extraction_workers: int = 0  # processes for multi-file extraction (0 = one per CPU)
+    extraction_parallel_min_bytes: int = 4 * 1024 * 1024  # smaller multi-file batches are parsed in-process
+    extraction_cache_size: int = 32  # extraction results kept in memory, keyed by content hash
+    extraction_summary_max_records: int = 500  # per-input records kept in extraction_summary.json
     
     # Logging settings
     log_max_bytes: int = 1_000_000
     log_backup_count: int = 5
+    log_async: bool = True  # format and write records on a background thread
+    log_format: str = "text"  # "text" or "json" (one JSON object per line)
+    log_sample_rate: float = 1.0  # fraction of DEBUG/INFO records kept; warnings and errors always kept
+    
+    # Tracing settings
+    trace_downloads: bool = False  # write a span timeline per download job to traces_dir
+    trace_keep_jobs: int = 20  # job traces kept on disk
     
     def __post_init__(self):
         """Initialize paths after object creation"""
@@ -195,6 +246,11 @@ class AppConfig:
         """Default extracted DOIs file path"""
         return self.data_dir / "extracted_dois.txt"
     
+    @property
+    def downloaded_library_file(self) -> Path:
+        """Sorted list of successfully downloaded DOIs"""
+        return self.data_dir / "downloaded_library.txt"
+    
     @property
     def failed_dois_file(self) -> Path:
         """Default failed DOIs file path"""
@@ -205,6 +261,31 @@ class AppConfig:
         """Default log file path"""
         return self.logs_dir / "downloader.log"
     
+    @property
+    def host_reputation_file(self) -> Path:
+        """Per-host download success and latency table"""
+        return self.data_dir / "host_reputation.json"
+    
+    @property
+    def oa_index_file(self) -> Path:
+        """OpenAlex/Unpaywall snapshot index (DOI to best OA PDF URL)"""
+        return self.data_dir / "indexes" / "oa_index.sqlite"
+    
+    @property
+    def pmc_index_file(self) -> Path:
+        """PMC Open Access file-list index (DOI to PMCID, package and PDF paths)"""
+        return self.data_dir / "indexes" / "pmc_index.sqlite"
+    
+    @property
+    def arxiv_index_file(self) -> Path:
+        """arXiv metadata index (journal DOI to arXiv ID)"""
+        return self.data_dir / "indexes" / "arxiv_index.sqlite"
+    
+    @property
+    def traces_dir(self) -> Path:
+        """Default download trace directory (one file pair per job)"""
+        return self.data_dir / "traces"
+    
     @property
     def extraction_summary_file(self) -> Path:
         """Default extraction summary file path"""
@@ -0,0 +1,224 @@
+"""
+Batched DOI resolution ahead of the per-DOI download loop
+"""
+
+import threading
+import time
+from concurrent.futures import Executor, Future, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from ...utils import doi_key, get_logger
+from ..indexes.oa import LOCATION_FIELDS, parse_record
+
+logger = get_logger(__name__)
+
+# Resolved locations by DOI key; a DOI missing from the mapping was not placed
+Locations = Dict[str, Optional[Dict[str, Any]]]
+
+
+class OpenAlexResolver:
+    """
+    Resolve many DOIs per request with the OpenAlex works endpoint.
+    
+    DOIs are OR-joined into one doi: filter per chunk, and each work's best OA
+    location with a PDF URL is returned.
+    """
+    
+    def __init__(self, get: Callable[..., requests.Response], base_url: str, batch_size: int = 50,
+                 timeout: float = 30, email: str = ""):
+        """
+        Args:
+            get: Callable issuing a GET (accepts params and timeout), e.g. a metered session wrapper
+            base_url: OpenAlex API base URL
+            batch_size: DOIs per request; OpenAlex accepts up to 100 OR-ed filter values
+            timeout: Request timeout in seconds
+            email: Contact address for OpenAlex's polite pool
+        """
+        self.get = get
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = max(1, min(batch_size, 100))
+        self.timeout = timeout
+        self.email = email
+    
+    def resolve(self, dois: List[str]) -> Locations:
+        """
+        Look up DOIs in chunks of batch_size.
+        
+        Returns:
+            Location dicts (url, license, host_type, version, title, origin, updated)
+            keyed by doi_key; works without an OA PDF map to None, and DOIs that
+            OpenAlex does not know or whose chunk failed are left out
+        """
+        locations: Locations = {}
+        # '|' and ',' are filter syntax, so DOIs containing them cannot be OR-joined
+        usable = [doi for doi in dois if '|' not in doi and ',' not in doi]
+        for start in range(0, len(usable), self.batch_size):
+            locations.update(self._resolve_chunk(usable[start:start + self.batch_size]))
+        return locations
+    
+    def _resolve_chunk(self, chunk: List[str]) -> Locations:
+        params = {
+            'filter': 'doi:' + '|'.join(doi_key(doi) for doi in chunk),
+            'per-page': len(chunk),
+            'select': 'doi,title,best_oa_location,locations,updated_date',
+        }
+        if self.email:
+            params['mailto'] = self.email
+        
+        try:
+            response = self.get(f"{self.base_url}/works", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            works = response.json().get('results', [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"OpenAlex batch lookup of {len(chunk)} DOIs failed: {e}")
+            return {}
+        
+        locations: Locations = {}
+        for work in works:
+            row = parse_record(work)
+            if row is None:
+                continue
+            locations[row[0]] = dict(zip(LOCATION_FIELDS, row[1:])) if row[1] else None
+        logger.info(f"OpenAlex placed {sum(1 for loc in locations.values() if loc)}/{len(chunk)} DOIs in one request")
+        return locations
+
+
+class CoreBatchResolver:
+    """
+    Resolve many DOIs per CORE search by OR-joining doi:"..." clauses.
+    
+    Every request waits for a slot from the shared CORE rate limiter, so the
+    batch and per-DOI lookups together stay within core_rate_limit.
+    """
+    
+    PAGE_SIZE = 100  # CORE's maximum search page size
+    MAX_PAGES = 3
+    
+    def __init__(self, get: Callable[..., requests.Response], base_url: str, api_key: str,
+                 wait: Callable[[], None], batch_size: int = 20, max_results: int = 1,
+                 timeout: float = 30, retry_delay: float = 10, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            get: Callable issuing a GET (accepts params and timeout)
+            base_url: CORE API v3 base URL
+            api_key: CORE API key
+            wait: Blocks until the CORE rate limiter allows the next request
+            batch_size: DOIs per search query
+            max_results: Works kept per DOI
+            timeout: Request timeout in seconds
+            retry_delay: Seconds to back off once after a 429
+            sleep: Sleep function used for the 429 backoff
+        """
+        self.get = get
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.wait = wait
+        self.batch_size = max(1, batch_size)
+        self.max_results = max(1, max_results)
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.sleep = sleep
+    
+    def resolve(self, dois: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search CORE for DOIs in chunks of batch_size.
+        
+        Returns:
+            CORE works keyed by doi_key; DOIs of successful searches without a
+            hit map to an empty list, and DOIs whose search failed are left out
+        """
+        works: Dict[str, List[Dict[str, Any]]] = {}
+        # Quotes would end the doi:"..." phrase early
+        usable = [doi for doi in dois if '"' not in doi]
+        for start in range(0, len(usable), self.batch_size):
+            works.update(self._resolve_chunk(usable[start:start + self.batch_size]))
+        return works
+    
+    def _resolve_chunk(self, chunk: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        found: Dict[str, List[Dict[str, Any]]] = {doi_key(doi): [] for doi in chunk}
+        query = ' OR '.join(f'doi:"{doi_key(doi)}"' for doi in chunk)
+        page_size = min(self.PAGE_SIZE, len(chunk) * self.max_results)
+        
+        for page in range(self.MAX_PAGES):
+            data = self._search(query, page_size, page * page_size)
+            if data is None:
+                return {}
+            results = data.get('results') or []
+            for work in results:
+                key = doi_key(work.get('doi') or '')
+                if key in found and len(found[key]) < self.max_results:
+                    found[key].append(work)
+            if len(results) < page_size or (page + 1) * page_size >= data.get('totalHits', 0):
+                break
+        
+        logger.info(f"CORE placed {sum(1 for hits in found.values() if hits)}/{len(chunk)} DOIs in one search")
+        return found
+    
+    def _search(self, query: str, limit: int, offset: int) -> Optional[Dict[str, Any]]:
+        """One search page, retried once after a 429; None if it failed"""
+        params = {'q': query, 'limit': limit, 'offset': offset, 'apiKey': self.api_key}
+        for attempt in range(2):
+            self.wait()
+            try:
+                response = self.get(f"{self.base_url}/search/works", params=params, timeout=self.timeout)
+                if response.status_code == 429 and attempt == 0:
+                    logger.warning(f"CORE rate limit hit during batch search, waiting {self.retry_delay}s")
+                    self.sleep(self.retry_delay)
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning(f"CORE batch search failed: {e}")
+                return None
+        return None
+
+
+class BatchPrefetcher:
+    """
+    Resolve a job's DOIs chunk by chunk, one chunk ahead of the download loop.
+    
+    Asking for a DOI starts the resolution of its chunk (if needed) and of the
+    next chunk in the background, then waits for its own chunk (unless
+    stopped() turns true meanwhile).
+    """
+    
+    def __init__(self, resolve: Callable[[List[str]], Dict[str, Any]], dois: List[str],
+                 chunk_size: int, executor: Executor, stopped: Callable[[], bool] = lambda: False):
+        self._resolve = resolve
+        self._executor = executor
+        self._stopped = stopped
+        self._chunks = [dois[start:start + chunk_size] for start in range(0, len(dois), chunk_size)]
+        self._chunk_of = {doi_key(doi): index for index, chunk in enumerate(self._chunks) for doi in chunk}
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+    
+    def _submit(self, index: int) -> Optional[Future]:
+        if index >= len(self._chunks):
+            return None
+        with self._lock:
+            future = self._futures.get(index)
+            if future is None:
+                future = self._futures[index] = self._executor.submit(self._resolve, self._chunks[index])
+            return future
+    
+    def covers(self, doi: str) -> bool:
+        return doi_key(doi) in self._chunk_of
+    
+    def get(self, doi: str) -> Any:
+        """What the resolve function returned for a DOI (keyed by doi_key), or None"""
+        key = doi_key(doi)
+        index = self._chunk_of.get(key)
+        if index is None:
+            return None
+        future = self._submit(index)
+        self._submit(index + 1)
+        while not wait([future], timeout=0.25).done:
+            if self._stopped():
+                return None
+        try:
+            return future.result().get(key)
+        except Exception as e:
+            logger.warning(f"Batch resolution failed for {doi}: {e}")
+            return None
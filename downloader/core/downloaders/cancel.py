@@ -0,0 +1,211 @@
+"""
+Cooperative cancellation of download jobs, and aborting of slow transfers
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import requests
+
+from ...utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class DownloadCancelled(BaseException):
+    """
+    Raised inside a job once its cancel token is cancelled.
+    
+    Like asyncio.CancelledError it is not an Exception, so the many
+    except Exception handlers that turn errors into failure results let it
+    through to the pipeline stages, which drop the DOI instead of recording
+    it as failed.
+    """
+
+
+class TimeBudgetExceeded(requests.exceptions.Timeout):
+    """A request or sleep would run past the current DOI's time budget"""
+
+
+class SlowTransfer(requests.exceptions.Timeout):
+    """A transfer passed its deadline or fell below its minimum throughput"""
+
+
+class CancelToken:
+    """
+    Stop signal shared by every thread of a download job.
+    
+    Sleeps wait on the token instead of time.sleep, loops call check(), and
+    blocking work registers an on_cancel callback (e.g. aborting a streamed
+    response), so cancel() interrupts rate-limit waits, backoff and stalled
+    transfers instead of waiting them out.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def cancel(self):
+        """Cancel the job and run the registered callbacks"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Cancel callback failed: {e}")
+    
+    def check(self):
+        """Raise DownloadCancelled if the token was cancelled"""
+        if self._event.is_set():
+            raise DownloadCancelled()
+    
+    def sleep(self, seconds: float):
+        """Sleep, waking up early with DownloadCancelled if the token is cancelled"""
+        if self._event.wait(seconds):
+            raise DownloadCancelled()
+    
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """Run callback (from the cancelling thread) if the token is cancelled inside the block"""
+        with self._lock:
+            cancelled = self._event.is_set()
+            if not cancelled:
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+        if cancelled:
+            callback()
+            raise DownloadCancelled()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.pop(callback_id, None)
+
+
+def abort_response(response):
+    """
+    Interrupt a streamed requests response from another thread.
+    
+    Closing the response does not wake a thread blocked reading its socket,
+    so the connection's socket is shut down instead; the reading thread then
+    fails with a connection error and closes the response itself.
+    """
+    connection = getattr(getattr(response, 'raw', None), '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        response.close()
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class TransferWatchdog:
+    """
+    Abort a streamed response that passes its deadline or falls below a minimum throughput.
+    
+    download_timeout only bounds each socket read, so a host trickling bytes
+    can otherwise hold a worker indefinitely. The reading loop reports bytes
+    with add(), which raises SlowTransfer as soon as a limit is broken; a
+    timer covers reads that block, checking again when the deadline comes or
+    when the bytes so far would fall below min_rate, and aborts the response.
+    """
+    
+    def __init__(self, response, deadline: Optional[float] = None, min_rate: float = 0, grace: float = 5):
+        """
+        Args:
+            response: Streamed requests response to abort
+            deadline: time.monotonic() by which the transfer must be done, or None
+            min_rate: Bytes per second the transfer must average (0 = no minimum)
+            grace: Seconds before min_rate applies
+        """
+        self.response = response
+        self.deadline = deadline
+        self.min_rate = min_rate
+        self.grace = grace
+        self.started = time.monotonic()
+        self.received = 0
+        self.reason: Optional[str] = None
+        self._timer: Optional[threading.Timer] = None
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._schedule()
+    
+    def add(self, size: int):
+        """Count received bytes; raise SlowTransfer if a limit is broken"""
+        self.received += size
+        reason = self._violation()
+        if reason:
+            self.reason = reason
+            raise SlowTransfer(reason)
+    
+    def watch(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass chunks through, counting them with add()"""
+        for chunk in chunks:
+            self.add(len(chunk))
+            yield chunk
+    
+    def explain(self, error: BaseException) -> BaseException:
+        """The SlowTransfer behind an error raised by a read this watchdog aborted, else the error"""
+        if self.reason and not isinstance(error, SlowTransfer):
+            return SlowTransfer(self.reason)
+        return error
+    
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self._timer is not None:
+                self._timer.cancel()
+    
+    def _violation(self) -> Optional[str]:
+        now = time.monotonic()
+        elapsed = now - self.started
+        if self.deadline is not None and now >= self.deadline:
+            return f"Transfer deadline passed after {elapsed:.1f}s ({self.received} bytes)"
+        if self.min_rate and elapsed >= self.grace and self.received < self.min_rate * elapsed:
+            return f"Transfer too slow: {self.received / elapsed / 1024:.1f} KB/s after {elapsed:.1f}s"
+        return None
+    
+    def _schedule(self):
+        """Arm the timer for the earliest moment a limit could be broken"""
+        checks = []
+        if self.deadline is not None:
+            checks.append(self.deadline)
+        if self.min_rate:
+            checks.append(self.started + max(self.grace, self.received / self.min_rate))
+        if not checks:
+            return
+        with self._lock:
+            if self._stopped:
+                return
+            delay = max(0.1, min(checks) - time.monotonic())
+            self._timer = threading.Timer(delay, self._check)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _check(self):
+        reason = self._violation()
+        if reason is None:
+            self._schedule()
+            return
+        with self._lock:
+            if self._stopped:
+                return
+            self.reason = reason
+        abort_response(self.response)
@@ -0,0 +1,56 @@
+"""
+Full-text download candidates collected from all sources for one DOI
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List
+
+from ...utils import doi_key
+
+# Source lookup order; also the tie-breaker when ranking candidates
+SOURCES = ("CORE", "arXiv", "NCBI", "EuropePMC")
+
+
+@dataclass
+class Candidate:
+    """One URL that may serve the full text of a paper"""
+    url: str
+    source: str  # provider that found the URL (one of SOURCES, "index" or "OpenAlex")
+    label: str  # value reported as the result's 'source', e.g. "NCBI-PMC"
+    filename: str  # file name to save the full text under
+    kind: str = "pdf"  # "pdf", or "xml" for Europe PMC full-text XML
+    metadata: Dict[str, Any] = field(default_factory=dict)  # title, authors, ids merged into the result
+    
+    @property
+    def priority(self) -> int:
+        return SOURCES.index(self.source) if self.source in SOURCES else len(SOURCES)
+
+
+def safe_title(title: str, max_length: int) -> str:
+    """Title truncated and reduced to file-name-safe characters"""
+    return re.sub(r'[^\w\-_\.]', '_', (title or 'unknown')[:max_length])
+
+
+def doi_filename_part(doi: str) -> str:
+    """DOI part of saved file names; case variants of a DOI map to the same name"""
+    return doi_key(doi).replace('/', '_')
+
+
+def unique_candidates(candidates: Iterable[Candidate], seen_urls: set) -> List[Candidate]:
+    """
+    Drop candidates whose URL was already collected.
+    
+    Args:
+        candidates: Newly collected candidates
+        seen_urls: URLs collected so far; updated in place
+    
+    Returns:
+        Candidates with URLs not seen before, in their original order
+    """
+    unique = []
+    for candidate in candidates:
+        if candidate.url not in seen_urls:
+            seen_urls.add(candidate.url)
+            unique.append(candidate)
+    return unique
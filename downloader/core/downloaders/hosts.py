@@ -0,0 +1,250 @@
+"""
+Persistent per-host reputation for full-text download URLs
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlparse
+
+from ...config import get_config
+from ...utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+LATENCY_SMOOTHING = 0.3  # weight of the newest sample in the latency moving average
+SAVE_EVERY = 50  # updates between automatic saves
+
+
+def host_of(url: str) -> str:
+    """Lowercased host (and port) of a URL"""
+    return urlparse(url).netloc.lower()
+
+
+class HostReputation:
+    """
+    Success rate, latency and last response behaviour of each download host.
+    
+    Outcomes come from pre-flight probes and full downloads. The table is
+    persisted as JSON so what was learned about a host survives restarts;
+    it is used to order candidate URLs and to skip hosts that keep failing.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, reject_after: int = 3, ttl: float = 3600,
+                 min_attempts: int = 5, min_success_rate: float = 0.1, max_hosts: int = 5000):
+        self.path = path
+        self.reject_after = reject_after
+        self.ttl = ttl
+        self.min_attempts = min_attempts
+        self.min_success_rate = min_success_rate
+        self.max_hosts = max_hosts
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._load()
+    
+    def _entry(self, host: str) -> Dict[str, Any]:
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {
+                'attempts': 0,
+                'successes': 0,
+                'consecutive_failures': 0,
+                'latency': None,
+                'last_status': None,
+                'last_content_type': None,
+                'last_failure': None,
+                'last_success_at': None,
+                'updated_at': 0.0,
+            }
+        entry['updated_at'] = time.time()
+        return entry
+    
+    def record_response(self, host: str, latency: Optional[float], status: Optional[int] = None,
+                        content_type: Optional[str] = None, error: Optional[str] = None,
+                        probe: bool = False):
+        """
+        Record transport-level behaviour of one request to a host.
+        
+        Errors and HTTP error statuses count as failed attempts; successful
+        responses only update latency and content type, since whether they
+        were PDFs is reported through record_outcome.
+        
+        Errors of range probes are not counted: an inconclusive probe is
+        followed by the full download, whose outcome is, so a candidate URL
+        adds at most one failure. This also keeps hosts that answer ranged
+        requests with 416 from being marked as failing.
+        
+        Args:
+            host: Host name as returned by host_of
+            latency: Seconds until response headers (or until the error)
+            status: HTTP status code, if a response arrived
+            content_type: Response Content-Type
+            error: Exception name if the request failed
+            probe: Whether the request was a range probe
+        """
+        with self._lock:
+            entry = self._entry(host)
+            if latency is not None:
+                previous = entry['latency']
+                entry['latency'] = latency if previous is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous
+                )
+            if status is not None:
+                entry['last_status'] = status
+            if content_type is not None:
+                entry['last_content_type'] = content_type.split(';')[0].strip()
+            if not probe and (error or (status is not None and status >= 400)):
+                self._fail(entry, error or f"HTTP {status}")
+            due = self._changed()
+        if due:
+            self.save()
+    
+    def record_outcome(self, host: str, is_pdf: bool, reason: Optional[str] = None):
+        """Record whether a URL on this host turned out to serve a PDF"""
+        with self._lock:
+            entry = self._entry(host)
+            if is_pdf:
+                entry['attempts'] += 1
+                entry['successes'] += 1
+                entry['consecutive_failures'] = 0
+                entry['last_success_at'] = entry['updated_at']
+            else:
+                self._fail(entry, reason or "not a PDF")
+            due = self._changed()
+        if due:
+            self.save()
+    
+    @staticmethod
+    def _fail(entry: Dict[str, Any], reason: str):
+        entry['attempts'] += 1
+        entry['consecutive_failures'] += 1
+        entry['last_failure'] = reason
+    
+    def score(self, host: str) -> float:
+        """Smoothed success rate in [0, 1]; unknown hosts score 0.5"""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                return 0.5
+            return (entry['successes'] + 1) / (entry['attempts'] + 2)
+    
+    def verdict(self, host: str) -> Optional[str]:
+        """
+        Cached verdict for a host.
+        
+        Returns:
+            "pdf" if its last outcome was a PDF, "bad" if it should be skipped,
+            or None when a probe should decide. Verdicts expire after ttl seconds
+            so bad hosts get re-tested.
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or time.time() - entry['updated_at'] > self.ttl:
+                return None
+            if entry['consecutive_failures'] == 0 and entry['successes'] > 0:
+                return "pdf"
+            if entry['successes'] == 0 and entry['consecutive_failures'] >= self.reject_after:
+                return "bad"
+            if (entry['attempts'] >= self.min_attempts
+                    and entry['successes'] / entry['attempts'] < self.min_success_rate
+                    and entry['consecutive_failures'] >= self.reject_after):
+                return "bad"
+            return None
+    
+    def rank(self, items: List[T], url: Callable[[T], Optional[str]]) -> List[T]:
+        """
+        Order candidates by host reputation, best first.
+        
+        Args:
+            items: Candidate objects
+            url: Function returning each candidate's URL
+        
+        Returns:
+            Candidates sorted by descending score, then ascending latency;
+            the original order is kept among equals
+        """
+        def sort_key(item: T):
+            host = host_of(url(item) or "")
+            with self._lock:
+                entry = self._hosts.get(host)
+                latency = entry['latency'] if entry and entry['latency'] is not None else float('inf')
+            return (-self.score(host), latency)
+        return sorted(items, key=sort_key)
+    
+    def get(self, host: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._hosts.get(host)
+            return dict(entry) if entry else None
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the whole table, for reporting"""
+        with self._lock:
+            return {host: dict(entry) for host, entry in self._hosts.items()}
+    
+    def clear(self):
+        with self._lock:
+            self._hosts.clear()
+            self._unsaved += 1
+        self.save()
+    
+    def _changed(self) -> bool:
+        """Count an update (lock held); returns True when a periodic save is due"""
+        self._unsaved += 1
+        return self._unsaved >= SAVE_EVERY
+    
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._hosts = {host: entry for host, entry in data.get('hosts', {}).items() if isinstance(entry, dict)}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load host reputation from {self.path}: {e}")
+    
+    def save(self):
+        """Write the table to disk, dropping the least recently seen hosts beyond max_hosts"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            if len(self._hosts) > self.max_hosts:
+                keep = sorted(self._hosts, key=lambda h: self._hosts[h]['updated_at'], reverse=True)[:self.max_hosts]
+                self._hosts = {host: self._hosts[host] for host in keep}
+            data = {'hosts': {host: dict(entry) for host, entry in self._hosts.items()}}
+            self._unsaved = 0
+        try:
+            tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save host reputation to {self.path}: {e}")
+
+
+# Global reputation table shared by downloader instances
+_host_reputation: Optional[HostReputation] = None
+_host_reputation_lock = threading.Lock()
+
+
+def get_host_reputation() -> HostReputation:
+    """Get the process-wide host reputation table"""
+    global _host_reputation
+    with _host_reputation_lock:
+        if _host_reputation is None:
+            config = get_config()
+            _host_reputation = HostReputation(
+                path=config.host_reputation_file,
+                reject_after=config.probe_reject_after,
+                ttl=config.probe_verdict_ttl,
+                min_attempts=config.host_min_attempts,
+                min_success_rate=config.host_min_success_rate
+            )
+        return _host_reputation
@@ -0,0 +1,198 @@
+"""
+Compact on-disk sets of downloaded and failed DOIs
+"""
+
+import heapq
+import mmap
+import os
+import threading
+from bisect import bisect_right
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from ...utils import doi_key, get_logger
+
+logger = get_logger(__name__)
+
+Data = Union[bytes, mmap.mmap]
+
+# Every INDEX_STRIDE-th line is kept in memory to narrow lookups down to one block
+INDEX_STRIDE = 32
+
+
+def _iter_lines_at(data: Data) -> Iterator[Tuple[int, bytes]]:
+    """(offset, stripped line) of each DOI line, skipping blank lines and comments"""
+    if not data:
+        return
+    # mmap.readline is much faster than slicing line by line (the caller holds the lock)
+    data.seek(0)
+    offset = 0
+    for raw in iter(data.readline, b''):
+        line = raw.strip()
+        if line and not line.startswith(b'#'):
+            yield offset, line
+        offset += len(raw)
+
+
+def _iter_lines(data: Data) -> Iterator[bytes]:
+    return (line for _, line in _iter_lines_at(data))
+
+
+class DoiLibrary:
+    """
+    Set of DOIs kept as a sorted text file, one doi_key per line.
+    
+    The file is memory-mapped; only every INDEX_STRIDE-th line is held in
+    memory, and membership is a binary search over those plus a scan of one
+    block of the file, so resident memory stays a small fraction of the
+    library. DOIs added since the last save live in an in-memory delta set;
+    save() merges them into the file in one sequential pass.
+    
+    Files written by older versions (or edited by hand) that are not sorted
+    or not in doi_key form are rewritten once when first used.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._opened = False
+        self._count = 0
+        self._keys: List[bytes] = []
+        self._offsets: List[int] = []
+        self._delta: Set[str] = set()
+        self._lock = threading.RLock()
+    
+    def _data(self) -> Data:
+        """The mapped file contents, opening (and if needed sorting) the file on first use"""
+        if not self._opened:
+            self._open()
+        return self._map if self._map is not None else b''
+    
+    def _open(self):
+        self._opened = True
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        self._map_file()
+        
+        count, previous, ordered = 0, None, True
+        for offset, line in _iter_lines_at(self._map):
+            if (previous is not None and line <= previous) or not self._is_key(line):
+                ordered = False
+                break
+            if count % INDEX_STRIDE == 0:
+                self._keys.append(line)
+                self._offsets.append(offset)
+            previous = line
+            count += 1
+        if ordered:
+            self._count = count
+            return
+        
+        logger.info(f"Sorting DOI library {self.path.name}")
+        keys = {doi_key(line.decode('utf-8', errors='replace')).encode('utf-8') for line in _iter_lines(self._map)}
+        keys.discard(b'')
+        self._write(sorted(keys))
+    
+    @staticmethod
+    def _is_key(line: bytes) -> bool:
+        """Whether a line is already lowercased (the other doi_key steps never change stored lines)"""
+        if line.lower() != line:
+            return False
+        if line.isascii():
+            return True
+        text = line.decode('utf-8', errors='replace')  # bytes.lower() leaves non-ASCII letters alone
+        return text == text.lower()
+    
+    def _map_file(self):
+        self._keys, self._offsets = [], []
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _write(self, lines: Iterable[bytes]):
+        """Replace the file with already sorted, unique lines and map the result"""
+        tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        keys, offsets = [], []
+        count = offset = 0
+        with open(tmp_path, 'wb') as f:
+            for line in lines:
+                if count % INDEX_STRIDE == 0:
+                    keys.append(line)
+                    offsets.append(offset)
+                f.write(line + b'\n')
+                offset += len(line) + 1
+                count += 1
+        # The old mapping has to be released before the file can be replaced on Windows
+        self._close_map()
+        os.replace(tmp_path, self.path)
+        if count:
+            self._map_file()
+        self._count, self._keys, self._offsets = count, keys, offsets
+    
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._keys, self._offsets = [], []
+    
+    def _in_file(self, key: bytes) -> bool:
+        data = self._data()
+        block = bisect_right(self._keys, key) - 1
+        if block < 0:
+            return False
+        end = self._offsets[block + 1] if block + 1 < len(self._offsets) else len(data)
+        return any(line.strip() == key for line in data[self._offsets[block]:end].split(b'\n'))
+    
+    def __contains__(self, doi: str) -> bool:
+        key = doi_key(doi)
+        with self._lock:
+            return key in self._delta or self._in_file(key.encode('utf-8'))
+    
+    def add(self, doi: str):
+        """Add a DOI; it reaches the file on the next save()"""
+        key = doi_key(doi)
+        with self._lock:
+            if key and key not in self:
+                self._delta.add(key)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._data()
+            return self._count + len(self._delta)
+    
+    def _merged(self) -> Iterator[bytes]:
+        """File and delta DOIs in sorted order (caller holds the lock)"""
+        delta = sorted(doi.encode('utf-8') for doi in self._delta)
+        return heapq.merge(_iter_lines(self._data()), delta)
+    
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """DOIs in sorted order, starting at offset"""
+        with self._lock:
+            end = None if limit is None else offset + limit
+            return [line.decode('utf-8', errors='replace') for line in islice(self._merged(), offset, end)]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.page())
+    
+    def save(self):
+        """Merge the DOIs added since the last save into the file"""
+        with self._lock:
+            if not self._delta:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(self._merged())
+            self._delta.clear()
+    
+    def clear(self):
+        """Remove every DOI, including the file contents"""
+        with self._lock:
+            self._delta.clear()
+            self._opened = True
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._write([])
+    
+    def close(self):
+        """Release the memory map (reopened on next use)"""
+        with self._lock:
+            self._close_map()
+            self._opened = False
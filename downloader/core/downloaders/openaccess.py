@@ -3,22 +3,114 @@ Legal open-access paper downloader with CORE API integration and progress tracki
 """
 
 import requests
+import threading
 import time
 import os
 import json
-import asyncio
-import aiohttp
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Set
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import chain
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Set, Tuple, Union
 from urllib.parse import urljoin, urlparse
 import re
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import xml.etree.ElementTree as ET
-from downloader.utils import get_logger, validate_doi, normalize_doi
+from contextlib import contextmanager
+from downloader.utils import doi_key, get_logger, get_metrics, normalize_dois, open_text_input
+from downloader.utils.tracing import Span, Tracer
+from downloader.core.indexes import get_arxiv_index, get_oa_index, get_pmc_index
+from .batch import BatchPrefetcher, CoreBatchResolver, OpenAlexResolver
+from .cancel import (CancelToken, DownloadCancelled, SlowTransfer, TimeBudgetExceeded, TransferWatchdog,
+                     abort_response)
+from .candidates import SOURCES, Candidate, doi_filename_part, safe_title, unique_candidates
+from .hosts import get_host_reputation, host_of
+from .library import DoiLibrary
+from .pipeline import Pipeline
+from .probe import probe_url
+from .ratelimit import RateLimiter
+from .transport import create_http2_client, create_session
 
 logger = get_logger(__name__)
 
+_metrics = get_metrics()
+HTTP_REQUESTS = _metrics.counter(
+    "science_downloader_http_requests_total",
+    "HTTP requests made to providers, by source, call type and status",
+    ["source", "call", "status"],
+)
+HTTP_LATENCY = _metrics.histogram(
+    "science_downloader_http_request_duration_seconds",
+    "Time until response headers were received, by source and call type",
+    ["source", "call"],
+)
+HTTP_BYTES = _metrics.counter(
+    "science_downloader_http_response_bytes_total",
+    "Response body bytes received, by source and call type",
+    ["source", "call"],
+)
+SOURCE_ATTEMPTS = _metrics.counter(
+    "science_downloader_source_attempts_total",
+    "Per-DOI source attempts, by source and outcome",
+    ["source", "outcome"],
+)
+SOURCE_LATENCY = _metrics.histogram(
+    "science_downloader_source_attempt_duration_seconds",
+    "Wall time of one source lookup for one DOI (search and link resolution, including retries and rate-limit sleeps)",
+    ["source"],
+)
+DOI_DURATION = _metrics.histogram(
+    "science_downloader_doi_duration_seconds",
+    "Wall time spent on one DOI across all sources, by outcome",
+    ["outcome"],
+)
+
+# Source names as they appear in combined error messages
+_SOURCE_NAMES = {"CORE": "CORE", "arXiv": "arXiv", "NCBI": "NCBI", "EuropePMC": "Europe PMC"}
+
+# Call types that hit full-text hosts rather than provider APIs
+_DOWNLOAD_CALLS = ("probe", "pdf")
+
+# Substrings of source error messages mapped to coarse outcome labels, first match wins
+_OUTCOME_PATTERNS = (
+    ("time budget", "over_budget"),
+    ("transfer too slow", "slow_transfer"),
+    ("transfer deadline", "slow_transfer"),
+    ("rate limit", "rate_limited"),
+    ("server error", "server_error"),
+    ("timed out", "timeout"),
+    ("not found", "not_found"),
+    ("no external links", "no_pdf"),
+    ("not available in pmc", "no_pdf"),
+    ("no downloadable pdf", "no_pdf"),
+    ("no pdf link", "no_pdf"),
+    ("no download url", "no_pdf"),
+    ("html", "not_pdf"),
+    ("not a valid pdf", "not_pdf"),
+    ("too small", "too_small"),
+    ("http error", "http_error"),
+    ("request failed", "network_error"),
+)
+
+
+def outcome_reason(result: Dict[str, Any]) -> str:
+    """
+    Classify a source result into a coarse outcome label for metrics.
+    
+    Args:
+        result: Result dictionary returned by a source attempt
+        
+    Returns:
+        "success" or a short failure reason such as "not_found" or "rate_limited"
+    """
+    if result.get('success'):
+        return "success"
+    error = str(result.get('error', '')).lower()
+    for pattern, reason in _OUTCOME_PATTERNS:
+        if pattern in error:
+            return reason
+    return "error"
+
 
 @dataclass
 class DownloadProgress:
@@ -28,6 +120,7 @@ class DownloadProgress:
     downloaded: int = 0
     failed: int = 0
     skipped: int = 0
+    deferred: int = 0  # DOIs that ran out of time, waiting for the end-of-job retry
     current_doi: str = ""
     status: str = "idle"  # idle, starting, processing, downloading, completed, stopped
     output_folder: str = ""
@@ -46,41 +139,143 @@ class DownloadProgress:
         return data
 
 
+@dataclass
+class DoiWork:
+    """State of one DOI as it moves between candidate lookups and fetches"""
+    doi: str
+    started: float = field(default_factory=time.perf_counter)
+    passes: int = 0  # pipeline resolve passes so far
+    tiers: List[str] = field(default_factory=lambda: ["index", "OpenAlex"])  # pre-resolved tiers not tried yet
+    lookups: Optional[Iterator[List[Tuple[str, Dict[str, Any]]]]] = None  # source lookups (_resolve_sources)
+    tier: Optional[str] = None  # tier the current candidates came from; None for source lookups
+    candidates: List[Candidate] = field(default_factory=list)  # candidates to fetch next
+    errors: Dict[str, str] = field(default_factory=dict)  # last error of each source
+    seen_urls: Set[str] = field(default_factory=set)
+    deadline: Optional[float] = None  # time.monotonic() by which the DOI must be done (doi_time_budget)
+    slow_transfer: bool = False  # a transfer was aborted for its deadline or throughput
+    deferrals: int = 0  # times the DOI was deferred to the end of the job
+    span: Optional[Span] = None  # pipeline DOI span, open from the first resolve pass until _finish_doi
+    
+    @property
+    def out_of_time(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
 class OpenAccessDownloader:
     """Modern open-access paper downloader with CORE API integration"""
     
     def __init__(self, config):
         self.config = config
-        self.session = requests.Session()
+        self.session = create_session(config)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Science Downloader) AppleWebKit/537.36'
         })
         
+        # HTTP/2 client for API lookups (None without httpx[http2]; the session is used instead)
+        self.http2 = create_http2_client(config, dict(self.session.headers))
+        
         # Progress tracking
         self.progress = DownloadProgress()
-        self.stop_flag = False
-        self.downloaded_dois: Set[str] = set()
-        self.failed_dois: Set[str] = set()
         
-        # Load existing tracking data
-        self._load_tracking_data()
+        # Cancelled by set_stop_flag; sleeps, lookups and transfers of the job watch it
+        self.cancel_token = CancelToken()
         
-    def download_papers(self, doi_file: Path, output_folder: Path) -> Dict[str, Any]:
+        # Downloaded/failed DOI libraries; the files are memory-mapped on first use
+        self.downloaded_dois = DoiLibrary(config.downloaded_library_file)
+        self.failed_dois = DoiLibrary(config.failed_dois_file)
+        
+        # Span tracing for the current job (replaced per download_papers call)
+        self.tracer = Tracer(enabled=False)
+        self.last_trace: Optional[Dict[str, str]] = None
+        
+        # Persistent success rate and latency of download hosts (shared across instances)
+        self.hosts = get_host_reputation()
+        
+        # Local OpenAlex/Unpaywall snapshot index, checked before the source APIs
+        self.oa_index = get_oa_index() if config.use_oa_index else None
+        
+        # Local PMC OA file-list index, checked before NCBI and Europe PMC searches
+        self.pmc_index = get_pmc_index() if config.use_pmc_index else None
+        
+        # Local arXiv metadata index mapping journal DOIs to preprints
+        self.arxiv_index = get_arxiv_index() if config.use_arxiv_index else None
+        
+        # OpenAlex, then OR-joined CORE searches, resolve job DOIs in batches;
+        # the per-DOI sources handle the rest
+        self.core_limiter = RateLimiter(config.core_rate_limit, per=60)
+        self.openalex = OpenAlexResolver(
+            lambda url, **kwargs: self._get(url, "OpenAlex", "batch", **kwargs),
+            config.openalex_base_url,
+            batch_size=config.openalex_batch_size,
+            timeout=config.openalex_timeout,
+            email=config.openalex_email
+        ) if config.use_openalex else None
+        self.core_batch = CoreBatchResolver(
+            lambda url, **kwargs: self._get(url, "CORE", "batch", **kwargs),
+            config.core_base_url,
+            config.core_api_key,
+            wait=lambda: self._sleep(self.core_limiter.reserve(), "core_rate_limit"),
+            batch_size=config.core_batch_size,
+            max_results=config.core_max_results,
+            timeout=config.core_timeout,
+            retry_delay=config.core_retry_base_delay,
+            sleep=lambda seconds: self._sleep(seconds, "core_rate_limit_backoff")
+        ) if config.core_batch_size > 0 else None
+        self._prefetcher: Optional[BatchPrefetcher] = None
+        # Own threads, so a lookup waiting for its batch never blocks the batch itself
+        self._batch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="batch-resolve")
+        
+        # Source lookups run concurrently, but only one at a time per provider so
+        # the per-call rate-limit sleeps still space out requests to each API;
+        # the pool has room for every pipeline resolve worker's lookups
+        self._lookup_pool = ThreadPoolExecutor(
+            max_workers=len(SOURCES) * max(2, config.resolve_workers), thread_name_prefix="source-lookup"
+        )
+        self._source_locks = {source: threading.Lock() for source in SOURCES}
+        # Candidate races of all fetch workers, with room for the losers of
+        # earlier races that are still closing their responses
+        self._race_pool = ThreadPoolExecutor(
+            max_workers=max(1, config.max_workers) * max(1, config.candidate_race_width) * 2,
+            thread_name_prefix="candidate-race"
+        )
+        
+        # Progress counters are updated from the pipeline's worker threads
+        self._progress_lock = threading.Lock()
+        self._doi_pacing: Optional[RateLimiter] = None
+        
+        # DOIs that ran out of time in the current pass, retried once the pass is over
+        self._deferred: List[DoiWork] = []
+        # Deadline of the DOI each thread is working on (see _within_budget)
+        self._budget = threading.local()
+    
+    @property
+    def stop_flag(self) -> bool:
+        """Whether a stop was requested for the current job"""
+        return self.cancel_token.cancelled
+        
+    def download_papers(self, doi_file: Union[Path, Iterable[str]], output_folder: Path,
+                        filtered: bool = False) -> Dict[str, Any]:
         """
         Download papers from a DOI file using CORE API
         
         Args:
-            doi_file: Path to file containing DOIs (one per line)
+            doi_file: Path to file containing DOIs (one per line), or the DOI
+                lines themselves (e.g. read from an upload stream)
             output_folder: Directory to save papers
+            filtered: doi_file is a list returned by read_dois, so its DOIs
+                are not validated and de-duplicated again
             
         Returns:
             Dict with download summary
         """
         try:
-            logger.info(f"Starting download from {doi_file} to {output_folder}")
-            
             # Read DOIs
-            dois = self._load_dois(doi_file)
+            if isinstance(doi_file, Path):
+                logger.info(f"Starting download from {doi_file} to {output_folder}")
+                dois = self._load_dois(doi_file)
+            else:
+                logger.info(f"Starting download of uploaded DOI list to {output_folder}")
+                dois = list(doi_file) if filtered else self._filter_dois(doi_file)
             if not dois:
                 return {
                     'success': False,
@@ -95,7 +290,8 @@ class OpenAccessDownloader:
                 output_folder=str(output_folder),
                 start_time=datetime.now()
             )
-            self.stop_flag = False
+            self.cancel_token = CancelToken()
+            self.tracer = Tracer(enabled=self.config.trace_downloads)
             
             # Ensure output directory exists
             output_folder.mkdir(parents=True, exist_ok=True)
@@ -103,8 +299,14 @@ class OpenAccessDownloader:
             # Process DOIs
             results = self._process_dois(dois, output_folder)
             
+            # Export the job trace for slow-paper diagnosis
+            trace_files = self._export_trace(self.progress.start_time)
+            if trace_files:
+                results['trace_files'] = trace_files
+            
             # Save tracking data
             self._save_tracking_data()
+            self.hosts.save()
             
             # Update final status
             self.progress.status = "completed" if not self.stop_flag else "stopped"
@@ -123,61 +325,87 @@ class OpenAccessDownloader:
     
     def _load_dois(self, doi_file: Path) -> List[str]:
         """Load and validate DOIs from file"""
-        dois = []
         try:
-            with open(doi_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        doi = normalize_doi(line)
-                        if validate_doi(doi):
-                            # Skip if already downloaded
-                            if doi not in self.downloaded_dois:
-                                dois.append(doi)
-                            else:
-                                self.progress.skipped += 1
-                                logger.info(f"Skipping already downloaded DOI: {doi}")
-                        else:
-                            logger.warning(f"Invalid DOI at line {line_num}: {line}")
-                            
+            # DOI lists may be gzip/zstd/zip-compressed
+            with open_text_input(doi_file) as (f, _):
+                return self._filter_dois(f)
         except Exception as e:
             logger.error(f"Error reading DOI file: {e}")
+            return []
+    
+    def read_dois(self, lines: Iterable[str]) -> List[str]:
+        """
+        Read the DOIs to download from lines as they arrive (e.g. an upload stream).
+        
+        Only the valid, de-duplicated DOIs that are not downloaded yet are kept,
+        not the lines themselves.
+        
+        Args:
+            lines: DOI lines; blank lines and # comments are skipped
             
+        Returns:
+            Normalized DOIs in input order, to pass to download_papers with filtered=True
+        """
+        return self._filter_dois(lines)
+    
+    def _filter_dois(self, lines: Iterable[str]) -> List[str]:
+        """Normalize and validate DOI lines, skipping comments, duplicates and downloaded DOIs"""
+        dois = []
+        seen = set()
+        line_num = 0
+        
+        def doi_lines() -> Iterator[str]:
+            nonlocal line_num
+            for line_num, line in enumerate(lines, 1):
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        
+        # Normalize and validate the lines in one batch as they are read;
+        # invalid lines are reported while line_num still points at them
+        valid, _ = normalize_dois(
+            doi_lines(), on_invalid=lambda line: logger.warning(f"Invalid DOI at line {line_num}: {line}")
+        )
+        
+        for doi in valid:
+            # DOIs are case-insensitive: "10.1016/J.X" repeats "10.1016/j.x"
+            key = doi_key(doi)
+            if key in seen:
+                self.progress.skipped += 1
+                logger.info(f"Skipping duplicate DOI: {doi}")
+                continue
+            seen.add(key)
+            
+            # Skip if already downloaded
+            if doi not in self.downloaded_dois:
+                dois.append(doi)
+            else:
+                self.progress.skipped += 1
+                logger.info(f"Skipping already downloaded DOI: {doi}")
+        
         return dois
     
     def _process_dois(self, dois: List[str], output_folder: Path) -> Dict[str, Any]:
         """Process DOIs and download papers"""
         self.progress.status = "processing"
+        if self.openalex or self.core_batch:
+            self._prefetcher = BatchPrefetcher(
+                self._batch_resolve, dois, self.config.batch_prefetch_size, self._batch_pool,
+                stopped=lambda: self.stop_flag
+            )
         
-        for i, doi in enumerate(dois):
-            if self.stop_flag:
-                break
-                
-            self.progress.current = i + 1
-            self.progress.current_doi = doi
-            self.progress.status = "downloading"
-            
-            try:
-                result = self._download_single_paper(doi, output_folder)
-                
-                if result['success']:
-                    self.progress.downloaded += 1
-                    self.downloaded_dois.add(doi)
-                    logger.info(f"Downloaded: {doi}")
-                else:
-                    self.progress.failed += 1
-                    self.failed_dois.add(doi)
-                    logger.warning(f"Failed to download {doi}: {result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                self.progress.failed += 1
-                self.failed_dois.add(doi)
-                logger.error(f"Exception downloading {doi}: {e}")
-            
-            # Rate limiting
-            if not self.stop_flag and i < len(dois) - 1:
-                time.sleep(self.config.delay_between_downloads)
+        works = [DoiWork(doi) for doi in dois]
+        while works and not self.stop_flag:
+            if works[0].deferrals:
+                logger.info(f"Retrying {len(works)} DOI(s) that ran out of time")
+            self._deferred = []
+            if self.config.resolve_workers > 0:
+                self._run_pipeline(works, output_folder)
+            else:
+                self._run_serial(works, output_folder)
+            works = self._deferred
         
+        self._prefetcher = None
         return {
             'success': True,
             'total_requested': len(dois),
@@ -186,53 +414,614 @@ class OpenAccessDownloader:
             'skipped': self.progress.skipped
         }
     
+    def _run_serial(self, works: List[DoiWork], output_folder: Path):
+        """Download DOIs one at a time, each looked up and fetched before the next starts"""
+        for i, work in enumerate(works):
+            if self.stop_flag:
+                break
+            
+            self._start_doi(work)
+            try:
+                with self.tracer.span(work.doi, "doi", doi=work.doi) as span:
+                    result = self._download_work(work, output_folder)
+                    span.set(outcome=outcome_reason(result))
+                self._finish_doi(work, result)
+            except (Exception, DownloadCancelled) as e:
+                self._finish_doi(work, exception=e)
+            
+            # Rate limiting
+            if i < len(works) - 1:
+                try:
+                    self._sleep(self.config.delay_between_downloads, "between_downloads")
+                except DownloadCancelled:
+                    break
+    
+    def _run_pipeline(self, works: List[DoiWork], output_folder: Path):
+        """
+        Download DOIs through the two-stage pipeline.
+        
+        resolve_workers threads look up candidates while max_workers threads
+        fetch them, so slow PDF transfers do not hold up the lookups of later
+        DOIs. Candidate lists wait in a queue of fetch_queue_size between the
+        stages. delay_between_downloads spaces out the DOIs' start times.
+        """
+        delay = self.config.delay_between_downloads
+        self._doi_pacing = RateLimiter(1, per=delay) if delay > 0 else None
+        pipeline = Pipeline(
+            lambda work: self._resolve_stage(work),
+            lambda work: self._fetch_stage(work, output_folder),
+            resolve_workers=self.config.resolve_workers,
+            fetch_workers=self.config.max_workers,
+            queue_size=self.config.fetch_queue_size,
+            stopped=lambda: self.stop_flag
+        )
+        with self.cancel_token.on_cancel(pipeline.wake):
+            pipeline.run(works)
+        self._doi_pacing = None
+    
+    def _resolve_stage(self, work: DoiWork) -> Optional[DoiWork]:
+        """Pipeline resolve stage: find the DOI's next candidates, or finish it as failed"""
+        work.passes += 1
+        if work.passes == 1:
+            # A new DOI rather than one sent back after its candidates failed
+            try:
+                if self._doi_pacing:
+                    self._sleep(self._doi_pacing.reserve(), "between_downloads")
+            except DownloadCancelled:
+                return None
+            self._start_doi(work)
+            # Resolve and fetch run on different threads, so their spans name the DOI span as parent
+            work.span = self.tracer.start(work.doi, "doi", doi=work.doi)
+        try:
+            with self.tracer.span(work.doi, "resolve", parent=work.span, doi=work.doi), self._within_budget(work.deadline):
+                if self._next_candidates(work):
+                    return work
+            self._finish_doi(work, self._exhausted_result(work))
+        except (Exception, DownloadCancelled) as e:
+            self._finish_doi(work, exception=e)
+        return None
+    
+    def _fetch_stage(self, work: DoiWork, output_folder: Path) -> Optional[DoiWork]:
+        """Pipeline fetch stage: fetch the DOI's candidates; send it back for more on failure"""
+        try:
+            with self.tracer.span(work.doi, "fetch", parent=work.span, doi=work.doi) as span, self._within_budget(work.deadline):
+                result = self._fetch_work(work, output_folder)
+                span.set(outcome=outcome_reason(result))
+        except (Exception, DownloadCancelled) as e:
+            self._finish_doi(work, exception=e)
+            return None
+        if result['success']:
+            self._finish_doi(work, result)
+            return None
+        return work
+    
+    def _start_doi(self, work: DoiWork):
+        """Start a DOI's clock and time budget and show it as the current DOI"""
+        work.started = time.perf_counter()
+        work.deadline = self._doi_deadline()
+        with self._progress_lock:
+            if work.deferrals:
+                self.progress.deferred -= 1
+            else:
+                self.progress.current += 1
+            self.progress.current_doi = work.doi
+            self.progress.status = "downloading"
+    
+    def _doi_deadline(self) -> Optional[float]:
+        """Deadline for a DOI starting now, or None without a doi_time_budget"""
+        budget = self.config.doi_time_budget
+        return time.monotonic() + budget if budget > 0 else None
+    
+    @contextmanager
+    def _within_budget(self, deadline: Optional[float]):
+        """
+        Hold the current thread's requests and sleeps to a DOI's deadline.
+        
+        Inside the block _get shortens request timeouts to the time left, and
+        _get and _sleep raise TimeBudgetExceeded once it is used up.
+        """
+        previous = getattr(self._budget, 'deadline', None)
+        self._budget.deadline = deadline
+        try:
+            yield
+        finally:
+            self._budget.deadline = previous
+    
+    def _time_left(self) -> Optional[float]:
+        """Seconds left in the current thread's DOI budget, or None without one"""
+        deadline = getattr(self._budget, 'deadline', None)
+        return None if deadline is None else deadline - time.monotonic()
+    
+    def _check_budget(self, needed: float = 0) -> Optional[float]:
+        """Raise TimeBudgetExceeded unless more than `needed` seconds are left; return the time left"""
+        left = self._time_left()
+        if left is not None and left <= needed:
+            raise TimeBudgetExceeded(f"DOI time budget of {self.config.doi_time_budget}s exhausted")
+        return left
+    
+    def _finish_doi(self, work: DoiWork, result: Optional[Dict[str, Any]] = None,
+                    exception: Optional[Exception] = None):
+        """Record a DOI's final result (or the exception that ended it) in metrics, progress and tracking"""
+        succeeded = exception is None and result['success']
+        if not succeeded and (isinstance(exception, DownloadCancelled) or self.stop_flag):
+            # Interrupted by a stop rather than failed: leave it for the next job
+            self._finish_doi_span(work, "cancelled")
+            logger.info(f"Stopped before finishing {work.doi}")
+            return
+        if (not succeeded and exception is None and (work.out_of_time or work.slow_transfer)
+                and work.deferrals < self.config.deferred_retries):
+            # Slow hosts or APIs rather than a missing paper: try again after the other DOIs
+            self._finish_doi_span(work, "deferred")
+            DOI_DURATION.observe(time.perf_counter() - work.started, outcome="deferred")
+            with self._progress_lock:
+                self.progress.deferred += 1
+                self._deferred.append(DoiWork(work.doi, deferrals=work.deferrals + 1))
+            logger.info(f"Deferred {work.doi} to the end of the job: {result.get('error', 'Unknown error')}")
+            return
+        outcome = "exception" if exception is not None else outcome_reason(result)
+        self._finish_doi_span(work, outcome)
+        DOI_DURATION.observe(time.perf_counter() - work.started, outcome=outcome)
+        with self._progress_lock:
+            if succeeded:
+                self.progress.downloaded += 1
+            else:
+                self.progress.failed += 1
+        
+        if succeeded:
+            self.downloaded_dois.add(work.doi)
+            logger.info(f"Downloaded: {work.doi}")
+        elif exception is not None:
+            self.failed_dois.add(work.doi)
+            logger.error(f"Exception downloading {work.doi}: {exception}")
+        else:
+            self.failed_dois.add(work.doi)
+            logger.warning(f"Failed to download {work.doi}: {result.get('error', 'Unknown error')}")
+    
+    def _finish_doi_span(self, work: DoiWork, outcome: str):
+        """Close a pipeline DOI's span (serial DOIs are traced by _run_serial)"""
+        if work.span is not None:
+            self.tracer.finish(work.span, outcome=outcome)
+            work.span = None
+    
     def _download_single_paper(self, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Download a single paper using CORE API with arXiv, NCBI, and Europe PMC fallbacks"""
-        # Try CORE API first
-        core_result = self._try_core_api(doi, output_folder)
-        if core_result['success']:
-            return core_result
+        """
+        Download a single paper from the best candidate URL found in CORE, arXiv, NCBI or Europe PMC.
         
-        logger.info(f"CORE failed for {doi}: {core_result.get('error', 'Unknown error')}. Trying arXiv...")
+        Candidate URLs are collected from every source and fetched as lookups
+        finish; the paper is saved from the first candidate that yields valid
+        full text.
+        """
+        return self._download_work(DoiWork(doi, deadline=self._doi_deadline()), output_folder)
+    
+    def _download_work(self, work: DoiWork, output_folder: Path) -> Dict[str, Any]:
+        """Alternate lookups and fetches for one DOI until a candidate succeeds, none are left or time runs out"""
+        with self._within_budget(work.deadline):
+            while self._next_candidates(work):
+                result = self._fetch_work(work, output_folder)
+                if result['success']:
+                    return result
+        return self._exhausted_result(work)
+    
+    def _next_candidates(self, work: DoiWork) -> bool:
+        """
+        Find the next candidates to fetch for a DOI (stored in work.candidates).
         
-        # Try arXiv as second fallback
-        arxiv_result = self._try_arxiv_api(doi, output_folder)
-        if arxiv_result['success']:
-            return arxiv_result
+        A known OA URL from the snapshot index or the OpenAlex batch needs no
+        per-DOI API calls, so those tiers come first; then the source lookups,
+        one finished batch at a time.
         
-        logger.info(f"arXiv failed for {doi}: {arxiv_result.get('error', 'Unknown error')}. Trying NCBI...")
+        Returns:
+            False once every tier and source has been tried, or the DOI's time budget is used up
+        """
+        doi = work.doi
+        if work.out_of_time:
+            return False
+        while work.tiers:
+            source = work.tiers.pop(0)
+            candidates = unique_candidates(self._located_candidates(source, doi), work.seen_urls)
+            if candidates:
+                work.tier, work.candidates = source, candidates
+                return True
         
-        # Try NCBI as third fallback
-        ncbi_result = self._try_ncbi_api(doi, output_folder)
-        if ncbi_result['success']:
-            return ncbi_result
+        work.tier = None
+        if work.lookups is None:
+            work.lookups = self._resolve_sources(doi, work.deadline)
+        for resolved_batch in work.lookups:
+            candidates: List[Candidate] = []
+            for source, resolved in resolved_batch:
+                if resolved['success']:
+                    candidates.extend(unique_candidates(resolved['candidates'], work.seen_urls))
+                else:
+                    work.errors[source] = resolved.get('error', 'Unknown error')
+                    logger.info(f"{_SOURCE_NAMES[source]} failed for {doi}: {work.errors[source]}")
+            if candidates:
+                work.candidates = candidates
+                return True
+        return False
+    
+    def _fetch_work(self, work: DoiWork, output_folder: Path) -> Dict[str, Any]:
+        """Fetch a DOI's current candidates and record how their tier or sources did"""
+        doi = work.doi
+        if work.tier:
+            result = self._fetch_candidates(work.candidates, doi, output_folder)
+            work.slow_transfer |= self._had_slow_transfer(result)
+            SOURCE_ATTEMPTS.inc(source=work.tier, outcome=outcome_reason(result))
+            if result['success']:
+                del result['candidate_source']
+            else:
+                logger.info(f"{work.tier} URL failed for {doi}: {result['error']}")
+            return result
         
-        logger.info(f"NCBI failed for {doi}: {ncbi_result.get('error', 'Unknown error')}. Trying Europe PMC...")
+        logger.info(f"Trying {len(work.candidates)} candidate URL(s) for {doi}")
+        result = self._fetch_candidates(work.candidates, doi, output_folder)
+        if result['success']:
+            self._record_source_outcomes(work.errors, winner=result['candidate_source'])
+            del result['candidate_source']
+            return result
         
-        # Try Europe PMC as fourth fallback
-        europepmc_result = self._try_europepmc_api(doi, output_folder)
-        if europepmc_result['success']:
-            return europepmc_result
+        work.slow_transfer |= self._had_slow_transfer(result)
+        # Keep the last failure of each source for the combined error
+        for failure in result['failures']:
+            work.errors[failure['candidate_source']] = failure.get('error', 'Unknown error')
+        return result
+    
+    @staticmethod
+    def _had_slow_transfer(result: Dict[str, Any]) -> bool:
+        return any(failure.get('slow_transfer') for failure in result.get('failures', []))
+    
+    def _exhausted_result(self, work: DoiWork) -> Dict[str, Any]:
+        """Failure result once every source has been tried for a DOI, or its time budget is used up"""
+        self._record_source_outcomes(work.errors)
         
         # All failed, return comprehensive error
-        core_error = core_result.get('error', 'CORE API failed')
-        arxiv_error = arxiv_result.get('error', 'arXiv API failed')
-        ncbi_error = ncbi_result.get('error', 'NCBI API failed')
-        europepmc_error = europepmc_result.get('error', 'Europe PMC API failed')
-        
+        details = '; '.join(
+            f"{_SOURCE_NAMES[source]}: {work.errors.get(source, f'{_SOURCE_NAMES[source]} API failed')}"
+            for source in SOURCES
+        )
+        if work.out_of_time:
+            summary = f'DOI time budget of {self.config.doi_time_budget}s exhausted'
+        else:
+            summary = 'All sources failed'
         return {
             'success': False,
-            'error': f'All sources failed - CORE: {core_error}; arXiv: {arxiv_error}; NCBI: {ncbi_error}; Europe PMC: {europepmc_error}',
-            'doi': doi
+            'error': f'{summary} - {details}',
+            'doi': work.doi
         }
     
-    def _try_core_api(self, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download using CORE API with retry logic"""
+    def _locate(self, source: str, doi: str) -> Optional[Dict[str, Any]]:
+        """OA location of a DOI from the snapshot index or the OpenAlex batch results"""
+        if source == "index":
+            return self.oa_index.lookup(doi) if self.oa_index else None
+        if self.openalex is None:
+            return None
+        if self._prefetcher and self._prefetcher.covers(doi):
+            return (self._prefetcher.get(doi) or {}).get("OpenAlex")
+        # Not part of a job (e.g. a single download_paper call): a batch of one
+        return self.openalex.resolve([doi]).get(doi_key(doi))
+    
+    def _batch_resolve(self, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve a chunk of job DOIs with the batch resolvers.
+        
+        CORE is only searched for the DOIs OpenAlex could not place.
+        
+        Returns:
+            Per DOI key, the OpenAlex location under "OpenAlex" and the CORE works
+            under "CORE"; a key is missing when that resolver has no answer
+        """
+        resolved: Dict[str, Dict[str, Any]] = {doi_key(doi): {} for doi in chunk}
+        remaining = chunk
+        if self.openalex:
+            locations = self.openalex.resolve(chunk)
+            for key, location in locations.items():
+                if key in resolved:
+                    resolved[key]["OpenAlex"] = location
+            remaining = [doi for doi in chunk if not locations.get(doi_key(doi))]
+        if self.core_batch and remaining:
+            for key, works in self.core_batch.resolve(remaining).items():
+                if key in resolved:
+                    resolved[key]["CORE"] = works
+        return resolved
+    
+    def _located_candidates(self, source: str, doi: str) -> List[Candidate]:
+        """Download candidates for a DOI from a pre-resolved OA location"""
+        started = time.perf_counter()
+        with self.tracer.span(source, "source", doi=doi) as span:
+            try:
+                location = self._locate(source, doi)
+            except Exception as e:
+                logger.warning(f"{source} lookup failed for {doi}: {e}")
+                location = None
+            span.set(hit=location is not None)
+        SOURCE_LATENCY.observe(time.perf_counter() - started, source=source)
+        if location is None:
+            return []
+        
+        title = safe_title(location.get('title') or 'unknown', 50)
+        return [Candidate(
+            url=location['url'],
+            source=source,
+            label=f"{location['origin']} snapshot" if source == "index" else "OpenAlex",
+            filename=f"{title}_{doi_filename_part(doi)}_{location['origin']}.pdf",
+            metadata={
+                'title': location.get('title') or '',
+                'license': location.get('license') or '',
+                'host_type': location.get('host_type') or '',
+                'version': location.get('version') or ''
+            }
+        )]
+    
+    def _resolve_sources(self, doi: str, deadline: Optional[float] = None) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Look up a DOI in every source.
+        
+        With parallel_source_lookup all sources are queried at once, and each
+        yield returns the lookups finished by then, so the fastest source's
+        candidates are tried first. Otherwise sources are queried one per yield
+        in SOURCES order, and later ones only if earlier candidates failed.
+        
+        With a deadline, parallel lookups share it, while sequential lookups
+        each get an even share of the time left so one slow API cannot use up
+        the budget of the sources after it.
+        
+        Yields:
+            Lists of (source, lookup result) pairs
+        """
+        if not self.config.parallel_source_lookup:
+            for i, source in enumerate(SOURCES):
+                share = None
+                if deadline is not None:
+                    now = time.monotonic()
+                    share = now + max(0.0, deadline - now) / (len(SOURCES) - i)
+                yield [(source, self._resolve_source(source, doi, share))]
+            return
+        
+        # Lookup threads have their own span stacks, so hand them this thread's span
+        parent = self.tracer.current()
+        futures = {
+            self._lookup_pool.submit(self._resolve_source, source, doi, deadline, parent): source
+            for source in SOURCES
+        }
+        pending = set(futures)
+        while pending:
+            # Lookups blocked in an API call are abandoned (not waited for) after a stop
+            # or once the DOI is out of time; their requests end at the deadline anyway
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            self.cancel_token.check()
+            if not done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                continue
+            finished = sorted(done, key=lambda future: SOURCES.index(futures[future]))
+            yield [(futures[future], future.result()) for future in finished]
+    
+    def _resolve_source(self, source: str, doi: str, deadline: Optional[float] = None,
+                        parent: Optional[Span] = None) -> Dict[str, Any]:
+        """Run one source lookup within a deadline, recording its duration and trace span"""
+        resolver = {
+            "CORE": self._resolve_core,
+            "arXiv": self._resolve_arxiv,
+            "NCBI": self._resolve_ncbi,
+            "EuropePMC": self._resolve_europepmc,
+        }[source]
+        
+        with self._source_locks[source], self._within_budget(deadline):
+            started = time.perf_counter()
+            with self.tracer.span(source, "source", parent=parent, doi=doi) as span:
+                try:
+                    resolved = resolver(doi)
+                except Exception as e:
+                    resolved = {'success': False, 'error': f'{_SOURCE_NAMES[source]} lookup error: {str(e)}', 'doi': doi}
+                span.set(candidates=len(resolved.get('candidates', [])))
+            SOURCE_LATENCY.observe(time.perf_counter() - started, source=source)
+        return resolved
+    
+    def _record_source_outcomes(self, errors: Dict[str, str], winner: Optional[str] = None):
+        """Count the outcome of each source that took part in a DOI"""
+        if winner:
+            SOURCE_ATTEMPTS.inc(source=winner, outcome="success")
+        for source, error in errors.items():
+            if source != winner:
+                SOURCE_ATTEMPTS.inc(source=source, outcome=outcome_reason({'success': False, 'error': error}))
+    
+    def _sleep(self, seconds: float, reason: str):
+        """
+        Sleep for rate limiting or backoff, traced so waits show up in job timelines.
+        
+        Raises:
+            DownloadCancelled: If the job is stopped before or during the sleep
+            TimeBudgetExceeded: If the sleep would outlast the current DOI's time budget
+        """
+        self.cancel_token.check()
+        if seconds <= 0:
+            return
+        self._check_budget(needed=seconds)
+        with self.tracer.span("sleep", "sleep", reason=reason, seconds=seconds):
+            self.cancel_token.sleep(seconds)
+    
+    def _get(self, url: str, source: str, call: str, **kwargs) -> requests.Response:
+        """
+        Issue a GET through the shared session and record request metrics.
+        
+        Non-streamed API calls to HTTPS endpoints go over HTTP/2 when available.
+        
+        Args:
+            url: Request URL
+            source: Provider label (CORE, arXiv, NCBI, EuropePMC)
+            call: Call type label (search, link, fetch, pdf)
+            **kwargs: Passed through to requests.Session.get
+            
+        Returns:
+            The response; body bytes of streamed responses are counted by _stream_to_file
+            
+        Raises:
+            DownloadCancelled: If the job was stopped (no request is made)
+            TimeBudgetExceeded: If the current DOI's time budget is used up (no request is made)
+        """
+        self.cancel_token.check()
+        left = self._check_budget()
+        if left is not None and kwargs.get('timeout'):
+            kwargs['timeout'] = min(kwargs['timeout'], left)
+        started = time.perf_counter()
+        with self.tracer.span(f"GET {call}", "http", source=source, url=url) as span:
+            try:
+                if self.http2 and call not in _DOWNLOAD_CALLS and not kwargs.get('stream') and self.http2.handles(url):
+                    response = self.http2.get(url, **kwargs)
+                    span.set(http_version=response.http_version)
+                else:
+                    response = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                elapsed = time.perf_counter() - started
+                HTTP_LATENCY.observe(elapsed, source=source, call=call)
+                HTTP_REQUESTS.inc(source=source, call=call, status=type(e).__name__)
+                if call in _DOWNLOAD_CALLS:
+                    self.hosts.record_response(host_of(url), elapsed, error=type(e).__name__, probe=call == "probe")
+                raise
+            elapsed = time.perf_counter() - started
+            HTTP_LATENCY.observe(elapsed, source=source, call=call)
+            HTTP_REQUESTS.inc(source=source, call=call, status=str(response.status_code))
+            if call in _DOWNLOAD_CALLS:
+                self.hosts.record_response(
+                    host_of(url), elapsed, response.status_code, response.headers.get('content-type'),
+                    probe=call == "probe"
+                )
+            span.set(status=response.status_code)
+            if not kwargs.get('stream'):
+                HTTP_BYTES.inc(len(response.content), source=source, call=call)
+                span.set(bytes=len(response.content))
+        return response
+    
+    def _stream_to_file(self, chunks: Iterable[bytes], filepath: Path, source: str,
+                        count_as: Optional[str] = "pdf") -> int:
+        """
+        Write a response body to disk.
+        
+        Args:
+            chunks: Body chunks, e.g. the bytes already read followed by iter_content
+            filepath: Destination file
+            source: Provider label for the byte counter
+            count_as: Call label for the byte counter, or None if _get already counted the body
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            DownloadCancelled: If the job is stopped during the transfer
+        """
+        written = 0
+        with self.tracer.span("write", "io", source=source, file=filepath.name) as span:
+            with open(filepath, 'wb') as f:
+                for chunk in chunks:
+                    self.cancel_token.check()
+                    if chunk:
+                        written += len(chunk)
+                        f.write(chunk)
+            span.set(bytes=written)
+        if count_as:
+            HTTP_BYTES.inc(written, source=source, call=count_as)
+        return written
+    
+    def _preflight(self, url: str, source: str, doi: str) -> Optional[Dict[str, Any]]:
+        """
+        Check a candidate URL before downloading it in full.
+        
+        Hosts that recently served a PDF are trusted without a probe; hosts that
+        kept serving landing pages are skipped without a request. Otherwise a
+        ranged GET of the first 1KB decides. Inconclusive probes allow the download.
+        
+        Args:
+            url: Candidate download URL
+            source: Provider label for metrics and tracing
+            doi: DOI being downloaded
+            
+        Returns:
+            A failure result if the URL should be skipped, otherwise None
+        """
+        if not self.config.probe_downloads:
+            return None
+        
+        host = host_of(url)
+        verdict = self.hosts.verdict(host)
+        if verdict == "pdf":
+            return None
+        if verdict == "bad":
+            last_failure = (self.hosts.get(host) or {}).get('last_failure')
+            return {
+                'success': False,
+                'error': f'Skipped {host}: host keeps failing (last: {last_failure})',
+                'doi': doi
+            }
+        
+        result = probe_url(
+            lambda **kwargs: self._get(url, source, "probe", **kwargs),
+            timeout=self.config.probe_timeout
+        )
+        if result.verdict == "unknown":
+            return None
+        
+        self.hosts.record_outcome(host, result.verdict == "pdf", result.reason)
+        if result.rejected:
+            return {
+                'success': False,
+                'error': f'Pre-flight check: {source} URL {result.reason}',
+                'doi': doi
+            }
+        return None
+    
+    def _record_host(self, url: str, is_pdf: bool, reason: Optional[str] = None):
+        """Feed the outcome of a full download back into the host reputation table"""
+        self.hosts.record_outcome(host_of(url), is_pdf, reason)
+    
+    def _export_trace(self, started: Optional[datetime]) -> Optional[Dict[str, str]]:
+        """
+        Write the current job's spans to the traces directory.
+        
+        Args:
+            started: Job start time, used to name the trace files
+            
+        Returns:
+            Paths of the JSON lines and Chrome trace files, or None if tracing is off
+        """
+        if not self.tracer.enabled:
+            return None
+        try:
+            job_id = (started or datetime.now()).strftime('%Y%m%d-%H%M%S-%f')
+            traces_dir = self.config.traces_dir
+            trace_files = {
+                'jsonl': str(self.tracer.export_jsonl(traces_dir / f"{job_id}.jsonl")),
+                'chrome': str(self.tracer.export_chrome(traces_dir / f"{job_id}.trace.json")),
+            }
+            if self.tracer.dropped:
+                logger.warning(f"Trace for job {job_id} dropped {self.tracer.dropped} spans")
+            self._prune_traces(traces_dir)
+            self.last_trace = trace_files
+            return trace_files
+        except Exception as e:
+            logger.error(f"Error exporting trace: {e}")
+            return None
+    
+    def _prune_traces(self, traces_dir: Path):
+        """Keep only the newest trace_keep_jobs job traces"""
+        jobs = sorted(traces_dir.glob("*.jsonl"))
+        for old in jobs[:max(0, len(jobs) - self.config.trace_keep_jobs)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".trace.json").unlink(missing_ok=True)
+    
+    def _resolve_core(self, doi: str) -> Dict[str, Any]:
+        """Find download candidates using CORE API with retry logic"""
+        # A batch search ahead of the download loop may already have the answer
+        if self._prefetcher and self._prefetcher.covers(doi):
+            works = (self._prefetcher.get(doi) or {}).get("CORE")
+            if works is not None:
+                return self._core_works_result(works, doi)
+        
         max_retries = 3
-        base_delay = 10  # Base delay for exponential backoff
+        base_delay = self.config.core_retry_base_delay  # Base delay for exponential backoff
         
         for attempt in range(max_retries + 1):
             try:
+                self._sleep(self.core_limiter.reserve(), "core_rate_limit")
+                
                 # Search CORE API for the paper
                 search_url = f"{self.config.core_base_url}/search/works"
                 params = {
@@ -241,8 +1030,8 @@ class OpenAccessDownloader:
                     'apiKey': self.config.core_api_key
                 }
                 
-                response = self.session.get(
-                    search_url, 
+                response = self._get(
+                    search_url, "CORE", "search",
                     params=params, 
                     timeout=self.config.core_timeout
                 )
@@ -250,25 +1039,7 @@ class OpenAccessDownloader:
                 
                 data = response.json()
                 
-                if data.get('totalHits', 0) > 0:
-                    results = data.get('results', [])
-                    for paper in results:
-                        # Try to download the paper
-                        download_result = self._try_download_paper(paper, doi, output_folder, source="CORE")
-                        if download_result['success']:
-                            return download_result
-                    
-                    return {
-                        'success': False,
-                        'error': 'Paper found but no downloadable PDF available',
-                        'doi': doi
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': 'Paper not found in CORE database',
-                        'doi': doi
-                    }
+                return self._core_works_result(data.get('results', []) if data.get('totalHits', 0) > 0 else [], doi)
                     
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 429:  # Rate limit exceeded
@@ -276,7 +1047,7 @@ class OpenAccessDownloader:
                         # Exponential backoff: 10s, 20s, 40s
                         delay = base_delay * (2 ** attempt)
                         logger.warning(f"Rate limit hit for {doi}, waiting {delay}s before retry {attempt + 1}")
-                        time.sleep(delay)
+                        self._sleep(delay, "core_rate_limit_backoff")
                         continue
                     else:
                         return {
@@ -286,9 +1057,9 @@ class OpenAccessDownloader:
                         }
                 elif e.response.status_code == 500:  # Server error
                     if attempt < max_retries:
-                        delay = 5  # Shorter delay for server errors
+                        delay = self.config.core_server_error_delay  # Shorter delay for server errors
                         logger.warning(f"Server error for {doi}, waiting {delay}s before retry {attempt + 1}")
-                        time.sleep(delay)
+                        self._sleep(delay, "core_server_error_retry")
                         continue
                     else:
                         return {
@@ -311,13 +1082,55 @@ class OpenAccessDownloader:
             except Exception as e:
                 return {
                     'success': False,
-                    'error': f'CORE download error: {str(e)}',
+                    'error': f'CORE lookup error: {str(e)}',
                     'doi': doi
                 }
     
-    def _try_arxiv_api(self, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download using arXiv API"""
+    def _core_works_result(self, works: List[Dict[str, Any]], doi: str) -> Dict[str, Any]:
+        """Lookup result for the CORE works found for a DOI"""
+        if works:
+            candidates = [
+                candidate for candidate in
+                (self._paper_candidate(paper, doi, "CORE") for paper in works)
+                if candidate
+            ]
+            if candidates:
+                return {
+                    'success': True,
+                    'candidates': candidates,
+                    'doi': doi
+                }
+            
+            return {
+                'success': False,
+                'error': 'Paper found but no downloadable PDF available',
+                'doi': doi
+            }
+        else:
+            return {
+                'success': False,
+                'error': 'Paper not found in CORE database',
+                'doi': doi
+            }
+    
+    def _resolve_arxiv(self, doi: str) -> Dict[str, Any]:
+        """Find a download candidate using arXiv API"""
         try:
+            preprint = self._arxiv_preprint(doi)
+            if preprint:
+                logger.info(f"Found arXiv:{preprint['arxiv_id']} for {doi} in the arXiv index")
+                paper_data = {
+                    'title': preprint.get('title') or 'unknown',
+                    'downloadUrl': f"{self.config.arxiv_pdf_base_url.rstrip('/')}/{preprint['arxiv_id']}",
+                    'authors': [],
+                    'arxiv_id': preprint['arxiv_id']
+                }
+                return {
+                    'success': True,
+                    'candidates': [self._paper_candidate(paper_data, doi, "arXiv")],
+                    'doi': doi
+                }
+            
             # Smart arXiv search - handle different DOI formats
             search_query = self._build_arxiv_search_query(doi)
             logger.info(f"Searching arXiv for {doi} with query: {search_query}")
@@ -328,8 +1141,8 @@ class OpenAccessDownloader:
                 'max_results': self.config.arxiv_max_results
             }
             
-            response = self.session.get(
-                self.config.arxiv_base_url,
+            response = self._get(
+                self.config.arxiv_base_url, "arXiv", "search",
                 params=params,
                 timeout=self.config.arxiv_timeout
             )
@@ -386,8 +1199,11 @@ class OpenAccessDownloader:
                 'arxiv_id': arxiv_id
             }
             
-            # Try to download
-            return self._try_download_paper(paper_data, doi, output_folder, source="arXiv")
+            return {
+                'success': True,
+                'candidates': [self._paper_candidate(paper_data, doi, "arXiv")],
+                'doi': doi
+            }
             
         except ET.ParseError as e:
             return {
@@ -404,10 +1220,18 @@ class OpenAccessDownloader:
         except Exception as e:
             return {
                 'success': False,
-                'error': f'arXiv download error: {str(e)}',
+                'error': f'arXiv lookup error: {str(e)}',
                 'doi': doi
             }
     
+    def _arxiv_preprint(self, doi: str) -> Optional[Dict[str, Any]]:
+        """arXiv preprint of a DOI from the local arXiv index, if any"""
+        try:
+            return self.arxiv_index.lookup(doi) if self.arxiv_index else None
+        except Exception as e:
+            logger.warning(f"arXiv index lookup failed for {doi}: {e}")
+            return None
+    
     def _build_arxiv_search_query(self, doi: str) -> str:
         """Build an intelligent arXiv search query based on DOI format"""
         
@@ -439,9 +1263,26 @@ class OpenAccessDownloader:
                 authors.append(name_elem.text.strip())
         return authors
     
-    def _try_ncbi_api(self, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download using NCBI E-utilities API"""
+    def _pmc_record(self, doi: str) -> Optional[Dict[str, Any]]:
+        """PMC Open Access files of a DOI from the local PMC index, if any"""
+        try:
+            return self.pmc_index.lookup(doi) if self.pmc_index else None
+        except Exception as e:
+            logger.warning(f"PMC index lookup failed for {doi}: {e}")
+            return None
+    
+    def _resolve_ncbi(self, doi: str) -> Dict[str, Any]:
+        """Find download candidates using NCBI E-utilities API"""
         try:
+            record = self._pmc_record(doi)
+            if record:
+                logger.info(f"Found {record['pmcid']} for {doi} in the PMC index")
+                return {
+                    'success': True,
+                    'candidates': self._pmc_index_candidates(record, doi),
+                    'doi': doi
+                }
+            
             logger.info(f"Searching NCBI for {doi}")
             
             # Step 1: Search PubMed for the DOI
@@ -460,15 +1301,27 @@ class OpenAccessDownloader:
             # Step 3: Get paper metadata
             paper_info = self._ncbi_get_paper_info(pmid)
             
-            # Step 4: Try to download from available sources
-            for link_info in link_result['links']:
-                download_result = self._try_ncbi_download(link_info, doi, output_folder, paper_info)
-                if download_result['success']:
-                    return download_result
+            # Step 4: Every full-text link is a download candidate
+            title = safe_title(paper_info.get('title', 'unknown'), 100)
+            filename = f"{title}_{paper_info.get('pmid', 'unknown')}_{doi_filename_part(doi)}_NCBI.pdf"
+            candidates = [
+                Candidate(
+                    url=link_info['url'],
+                    source="NCBI",
+                    label=f"NCBI-{link_info.get('source', 'NCBI')}",
+                    filename=filename,
+                    metadata={
+                        'title': paper_info.get('title', ''),
+                        'authors': paper_info.get('authors', []),
+                        'pmid': paper_info.get('pmid', '')
+                    }
+                )
+                for link_info in link_result['links']
+            ]
             
             return {
-                'success': False,
-                'error': f'Paper found in NCBI (PMID: {pmid}) but no downloadable PDF available',
+                'success': True,
+                'candidates': candidates,
                 'doi': doi
             }
             
@@ -479,6 +1332,29 @@ class OpenAccessDownloader:
                 'doi': doi
             }
     
+    def _pmc_index_candidates(self, record: Dict[str, Any], doi: str) -> List[Candidate]:
+        """Build NCBI download candidates for a PMC index record without calling E-utilities"""
+        pmcid = record['pmcid']
+        filename = f"unknown_{record.get('pmid') or pmcid}_{doi_filename_part(doi)}_NCBI.pdf"
+        metadata = {'pmid': record.get('pmid') or '', 'pmcid': pmcid, 'license': record.get('license') or ''}
+        candidates = []
+        if record.get('pdf'):
+            candidates.append(Candidate(
+                url=f"{self.config.pmc_ftp_base_url.rstrip('/')}/{record['pdf']}",
+                source="NCBI",
+                label="NCBI-PMC OA",
+                filename=filename,
+                metadata=metadata
+            ))
+        candidates.append(Candidate(
+            url=f"https://www.ncbi.nlm.nih.gov/pmc/articles/{pmcid}/pdf/",
+            source="NCBI",
+            label="NCBI-PMC",
+            filename=filename,
+            metadata=metadata
+        ))
+        return candidates
+    
     def _ncbi_search(self, doi: str) -> Dict[str, Any]:
         """Search NCBI PubMed for a DOI"""
         try:
@@ -493,13 +1369,13 @@ class OpenAccessDownloader:
                 'email': self.config.ncbi_email
             }
             
-            response = self.session.get(search_url, params=params, timeout=self.config.ncbi_timeout)
+            response = self._get(search_url, "NCBI", "search", params=params, timeout=self.config.ncbi_timeout)
             response.raise_for_status()
             
             data = response.json()
             
             # Add rate limiting
-            time.sleep(1.0 / self.config.ncbi_rate_limit)  # Respect rate limit
+            self._sleep(1.0 / self.config.ncbi_rate_limit, "ncbi_rate_limit")  # Respect rate limit
             
             if 'esearchresult' in data and data['esearchresult']['idlist']:
                 pmid = data['esearchresult']['idlist'][0]
@@ -540,13 +1416,13 @@ class OpenAccessDownloader:
                 'email': self.config.ncbi_email
             }
             
-            response = self.session.get(link_url, params=params, timeout=self.config.ncbi_timeout)
+            response = self._get(link_url, "NCBI", "link", params=params, timeout=self.config.ncbi_timeout)
             response.raise_for_status()
             
             data = response.json()
             
             # Add rate limiting
-            time.sleep(1.0 / self.config.ncbi_rate_limit)
+            self._sleep(1.0 / self.config.ncbi_rate_limit, "ncbi_rate_limit")
             
             links = []
             if 'linksets' in data:
@@ -591,13 +1467,13 @@ class OpenAccessDownloader:
                 'email': self.config.ncbi_email
             }
             
-            response = self.session.get(link_url, params=params, timeout=self.config.ncbi_timeout)
+            response = self._get(link_url, "NCBI", "link", params=params, timeout=self.config.ncbi_timeout)
             response.raise_for_status()
             
             data = response.json()
             
             # Add rate limiting
-            time.sleep(1.0 / self.config.ncbi_rate_limit)
+            self._sleep(1.0 / self.config.ncbi_rate_limit, "ncbi_rate_limit")
             
             if 'linksets' in data and data['linksets']:
                 for linkset in data['linksets']:
@@ -641,11 +1517,11 @@ class OpenAccessDownloader:
                 'email': self.config.ncbi_email
             }
             
-            response = self.session.get(fetch_url, params=params, timeout=self.config.ncbi_timeout)
+            response = self._get(fetch_url, "NCBI", "fetch", params=params, timeout=self.config.ncbi_timeout)
             response.raise_for_status()
             
             # Add rate limiting
-            time.sleep(1.0 / self.config.ncbi_rate_limit)
+            self._sleep(1.0 / self.config.ncbi_rate_limit, "ncbi_rate_limit")
             
             # Parse XML response
             root = ET.fromstring(response.content)
@@ -686,92 +1562,29 @@ class OpenAccessDownloader:
                 'pmid': pmid
             }
     
-    def _try_ncbi_download(self, link_info: Dict, doi: str, output_folder: Path, paper_info: Dict) -> Dict[str, Any]:
-        """Try to download from an NCBI link"""
+    def _resolve_europepmc(self, doi: str) -> Dict[str, Any]:
+        """Find download candidates using Europe PMC API"""
         try:
-            download_url = link_info['url']
-            source_name = link_info.get('source', 'NCBI')
-            
-            # Create filename
-            title = paper_info.get('title', 'unknown')
-            safe_title = re.sub(r'[^\w\-_\.]', '_', title)
-            pmid = paper_info.get('pmid', 'unknown')
-            
-            filename = f"{safe_title}_{pmid}_{doi.replace('/', '_')}_NCBI.pdf"
-            filepath = output_folder / filename
-            
-            # Download the content
-            response = self.session.get(download_url, timeout=self.config.download_timeout, stream=True)
-            response.raise_for_status()
-            
-            # Check Content-Type header
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type:
-                return {
-                    'success': False,
-                    'error': f'NCBI link returned HTML instead of PDF (Content-Type: {content_type})',
-                    'doi': doi
-                }
-            
-            # Download and validate content
-            content = b''
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    content += chunk
-                    if len(content) > 1024 * 1024:  # 1MB validation limit
-                        with open(filepath, 'wb') as f:
-                            f.write(content)
-                            for remaining_chunk in response.iter_content(chunk_size=8192):
-                                if remaining_chunk:
-                                    f.write(remaining_chunk)
-                        break
-            else:
-                with open(filepath, 'wb') as f:
-                    f.write(content)
-            
-            # Validate PDF
-            if not self._is_valid_pdf(content[:1024]):
-                if filepath.exists():
-                    filepath.unlink()
-                return {
-                    'success': False,
-                    'error': 'Downloaded content from NCBI is not a valid PDF',
-                    'doi': doi
+            record = self._pmc_record(doi)
+            if record:
+                # Indexed PMC OA articles need no search: Europe PMC serves their
+                # full-text XML and a rendered PDF by PMCID
+                paper_info = {
+                    'pmcid': record['pmcid'],
+                    'pmid': record.get('pmid') or '',
+                    'inPMC': 'Y',
+                    'fullTextUrlList': {'fullTextUrl': [{
+                        'url': f"{self.config.europepmc_site_url.rstrip('/')}/articles/{record['pmcid']}?pdf=render",
+                        'documentStyle': 'pdf',
+                        'site': 'render'
+                    }]}
                 }
-            
-            # Verify file
-            if filepath.exists() and filepath.stat().st_size > 1000:
                 return {
                     'success': True,
-                    'doi': doi,
-                    'file_path': str(filepath),
-                    'title': paper_info.get('title', ''),
-                    'authors': paper_info.get('authors', []),
-                    'source': f'NCBI-{source_name}',
-                    'pmid': paper_info.get('pmid', '')
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Downloaded NCBI file is empty or too small',
+                    'candidates': self._europepmc_candidates(paper_info, doi),
                     'doi': doi
                 }
-                
-        except Exception as e:
-            if 'filepath' in locals() and filepath.exists():
-                try:
-                    filepath.unlink()
-                except:
-                    pass
-            return {
-                'success': False,
-                'error': f'NCBI download failed: {str(e)}',
-                'doi': doi
-            }
-    
-    def _try_europepmc_api(self, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download using Europe PMC API"""
-        try:
+            
             logger.info(f"Searching Europe PMC for {doi}")
             
             # Step 1: Search Europe PMC for the DOI
@@ -782,15 +1595,21 @@ class OpenAccessDownloader:
             results = search_result['results']
             logger.info(f"Found {len(results)} results in Europe PMC for DOI {doi}")
             
-            # Try each result until we find a downloadable one
+            # Collect full-text links from every result
+            candidates = []
             for paper_info in results:
-                download_result = self._try_europepmc_download(paper_info, doi, output_folder)
-                if download_result['success']:
-                    return download_result
+                candidates.extend(self._europepmc_candidates(paper_info, doi))
+            
+            if candidates:
+                return {
+                    'success': True,
+                    'candidates': candidates,
+                    'doi': doi
+                }
             
             return {
                 'success': False,
-                'error': f'Paper found in Europe PMC but no downloadable PDF available',
+                'error': 'Paper found in Europe PMC but no downloadable PDF URL available',
                 'doi': doi
             }
             
@@ -813,13 +1632,13 @@ class OpenAccessDownloader:
                 'page': 1
             }
             
-            response = self.session.get(search_url, params=params, timeout=self.config.europepmc_timeout)
+            response = self._get(search_url, "EuropePMC", "search", params=params, timeout=self.config.europepmc_timeout)
             response.raise_for_status()
             
             data = response.json()
             
             # Add rate limiting
-            time.sleep(60.0 / self.config.europepmc_rate_limit)  # Convert from per-minute to delay
+            self._sleep(60.0 / self.config.europepmc_rate_limit, "europepmc_rate_limit")  # Convert from per-minute to delay
             
             if 'resultList' in data and data['resultList']['result']:
                 results = []
@@ -888,295 +1707,314 @@ class OpenAccessDownloader:
         
         return authors
     
-    def _try_europepmc_download(self, paper_info: Dict, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download from Europe PMC"""
-        try:
-            download_url = None
-            source_name = "Europe PMC"
-            
-            # Priority 1: Check if paper is in PMC (highest quality)
-            if paper_info.get('inPMC') == 'Y' and paper_info.get('pmcid'):
-                pmcid = paper_info['pmcid']
-                if pmcid.startswith('PMC'):
-                    pmcid = pmcid[3:]  # Remove PMC prefix
-                
-                # Try PMC full text XML endpoint
-                xml_url = f"{self.config.europepmc_base_url}/{pmcid}/fullTextXML"
-                xml_result = self._try_europepmc_xml_download(xml_url, paper_info, doi, output_folder)
-                if xml_result['success']:
-                    return xml_result
-            
-            # Priority 2: Check fullTextUrlList for PDF links
-            full_text_urls = paper_info.get('fullTextUrlList', {})
-            if 'fullTextUrl' in full_text_urls:
-                for url_info in full_text_urls['fullTextUrl']:
-                    if url_info.get('documentStyle') == 'pdf' or url_info.get('availabilityCode') == 'OA':
-                        download_url = url_info.get('url')
-                        source_name = f"Europe PMC-{url_info.get('site', 'PDF')}"
-                        break
-            
-            # Priority 3: Try to construct PMC PDF URL if we have PMCID
-            if not download_url and paper_info.get('pmcid'):
-                pmcid = paper_info['pmcid']
-                if pmcid.startswith('PMC'):
-                    pmcid = pmcid[3:]
-                download_url = f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{pmcid}/pdf/"
-                source_name = "Europe PMC-PMC"
-            
-            if download_url:
-                return self._download_europepmc_pdf(download_url, paper_info, doi, output_folder, source_name)
-            
-            return {
-                'success': False,
-                'error': 'No downloadable PDF URL found in Europe PMC',
-                'doi': doi
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Europe PMC download failed: {str(e)}',
-                'doi': doi
+    def _europepmc_candidates(self, paper_info: Dict, doi: str) -> List[Candidate]:
+        """Build download candidates for one Europe PMC search result"""
+        title = safe_title(paper_info.get('title', 'unknown'), 100)
+        pmcid = paper_info.get('pmcid') or ''
+        pmcid_number = pmcid[3:] if pmcid.startswith('PMC') else pmcid  # Remove PMC prefix
+        metadata = {
+            'title': paper_info.get('title', ''),
+            'authors': paper_info.get('authors', []),
+            'pmcid': pmcid,
+            'pmid': paper_info.get('pmid', '')
+        }
+        candidates = []
+        
+        # Priority 1: PMC full text XML (highest quality)
+        if paper_info.get('inPMC') == 'Y' and pmcid:
+            candidates.append(Candidate(
+                url=f"{self.config.europepmc_base_url}/{pmcid_number}/fullTextXML",
+                source="EuropePMC",
+                label="Europe PMC-XML",
+                filename=f"{title}_{pmcid}_{doi_filename_part(doi)}_EuropePMC.xml",
+                kind="xml",
+                metadata={**metadata, 'note': 'Downloaded as XML - full text available'}
+            ))
+        
+        # Priority 2: every PDF link in fullTextUrlList
+        identifier = pmcid or paper_info.get('pmid') or 'unknown'
+        pdf_filename = f"{title}_{identifier}_{doi_filename_part(doi)}_EuropePMC.pdf"
+        for url_info in (paper_info.get('fullTextUrlList') or {}).get('fullTextUrl', []):
+            if url_info.get('url') and (url_info.get('documentStyle') == 'pdf' or url_info.get('availabilityCode') == 'OA'):
+                candidates.append(Candidate(
+                    url=url_info['url'],
+                    source="EuropePMC",
+                    label=f"Europe PMC-{url_info.get('site', 'PDF')}",
+                    filename=pdf_filename,
+                    metadata=metadata
+                ))
+        
+        # Priority 3: construct the PMC PDF URL if there is no PDF link
+        if pmcid and not any(candidate.kind == "pdf" for candidate in candidates):
+            candidates.append(Candidate(
+                url=f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{pmcid_number}/pdf/",
+                source="EuropePMC",
+                label="Europe PMC-PMC",
+                filename=pdf_filename,
+                metadata=metadata
+            ))
+        
+        return candidates
+    
+    def _paper_candidate(self, paper: Dict, doi: str, source: str) -> Optional[Candidate]:
+        """Build a download candidate from a CORE work or arXiv entry"""
+        download_url = paper.get('downloadUrl')
+        if not download_url:
+            # Try repository document
+            download_url = (paper.get('repositoryDocument') or {}).get('pdfOrigin')
+        if not download_url:
+            return None
+        
+        # Include source and arXiv ID if available
+        title = safe_title(paper.get('title', 'unknown'), 50)
+        if source == "arXiv" and paper.get('arxiv_id'):
+            arxiv_id = paper['arxiv_id'].replace('/', '_')
+            filename = f"{title}_{arxiv_id}_{doi_filename_part(doi)}_{source}.pdf"
+        else:
+            filename = f"{title}_{doi_filename_part(doi)}_{source}.pdf"
+        
+        return Candidate(
+            url=download_url,
+            source=source,
+            label=source,
+            filename=filename,
+            metadata={
+                'title': paper.get('title', ''),
+                'authors': paper.get('authors', []),
+                'arxiv_id': paper.get('arxiv_id', '') if source == "arXiv" else ''
             }
+        )
     
-    def _try_europepmc_xml_download(self, xml_url: str, paper_info: Dict, doi: str, output_folder: Path) -> Dict[str, Any]:
-        """Try to download XML from Europe PMC and convert or save as alternative"""
-        try:
-            response = self.session.get(xml_url, timeout=self.config.europepmc_timeout)
-            response.raise_for_status()
-            
-            # Check if we got XML content
-            content_type = response.headers.get('content-type', '').lower()
-            if 'xml' not in content_type and 'text' not in content_type:
-                return {
-                    'success': False,
-                    'error': 'Europe PMC XML endpoint did not return XML content'
-                }
-            
-            # Save as XML file (alternative format)
-            title = paper_info.get('title', 'unknown')
-            safe_title = re.sub(r'[^\w\-_\.]', '_', title)
-            pmcid = paper_info.get('pmcid', 'unknown')
-            
-            filename = f"{safe_title}_{pmcid}_{doi.replace('/', '_')}_EuropePMC.xml"
-            filepath = output_folder / filename
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+    def _fetch_candidates(self, candidates: List[Candidate], doi: str, output_folder: Path) -> Dict[str, Any]:
+        """
+        Save the first candidate that yields valid full text.
+        
+        Candidates are ordered by host reputation (source order breaks ties)
+        and opened candidate_race_width at a time; the first to return a valid
+        PDF head is saved and the others are abandoned.
+        
+        Args:
+            candidates: Candidate URLs for the DOI
+            doi: DOI being downloaded
+            output_folder: Directory to save the file in
             
-            if filepath.exists() and filepath.stat().st_size > 1000:
-                return {
-                    'success': True,
-                    'doi': doi,
-                    'file_path': str(filepath),
-                    'title': paper_info.get('title', ''),
-                    'authors': paper_info.get('authors', []),
-                    'source': 'Europe PMC-XML',
-                    'pmcid': paper_info.get('pmcid', ''),
-                    'note': 'Downloaded as XML - full text available'
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Europe PMC XML file is empty or too small'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Europe PMC XML download failed: {str(e)}'
-            }
+        Returns:
+            Success result, or a failure listing each candidate's failure under 'failures'
+        """
+        ranked = self.hosts.rank(sorted(candidates, key=lambda c: c.priority), lambda c: c.url)
+        width = max(1, self.config.candidate_race_width)
+        failures: List[Dict[str, Any]] = []
+        
+        for start in range(0, len(ranked), width):
+            self.cancel_token.check()
+            opened, batch_failures = self._race_candidates(ranked[start:start + width], doi)
+            failures.extend(batch_failures)
+            if opened:
+                result = self._save_candidate(opened, doi, output_folder)
+                if result['success']:
+                    return result
+                failures.append(result)
+        
+        return {
+            'success': False,
+            'error': failures[-1]['error'] if failures else 'No candidate URLs to download',
+            'doi': doi,
+            'failures': failures
+        }
     
-    def _download_europepmc_pdf(self, download_url: str, paper_info: Dict, doi: str, output_folder: Path, source_name: str) -> Dict[str, Any]:
-        """Download PDF from Europe PMC URL"""
+    def _race_candidates(self, batch: List[Candidate], doi: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Open candidates concurrently and keep the first valid PDF stream.
+        
+        Returns as soon as one candidate wins; slower candidates finish in the
+        background and close their own responses.
+        
+        Returns:
+            (opened winner or None, failures of the candidates that finished first)
+        """
+        if len(batch) == 1:
+            opened = self._open_candidate(batch[0], doi)
+            return (opened, []) if opened['success'] else (None, [opened])
+        
+        race_lock = threading.Lock()
+        race = {'won': False}
+        deadline = getattr(self._budget, 'deadline', None)
+        # Race threads have their own span stacks, so hand them this thread's span
+        parent = self.tracer.current()
+        
+        def open_and_claim(candidate: Candidate) -> Optional[Dict[str, Any]]:
+            with self.tracer.span(candidate.source, "candidate", parent=parent, doi=doi, url=candidate.url), self._within_budget(deadline):
+                opened = self._open_candidate(candidate, doi)
+            if opened['success']:
+                with race_lock:
+                    if not race['won'] and not self.stop_flag:
+                        race['won'] = True
+                        return opened
+                self._close_opened(opened)  # Lost the race
+                return None
+            return opened
+        
+        futures = [self._race_pool.submit(open_and_claim, candidate) for candidate in batch]
+        
+        failures = []
+        for future in as_completed(futures):
+            opened = future.result()
+            if opened is None:
+                continue
+            if opened['success']:
+                return opened, failures
+            failures.append(opened)
+        return None, failures
+    
+    def _open_candidate(self, candidate: Candidate, doi: str) -> Dict[str, Any]:
+        """
+        Request a candidate URL and validate the start of its body.
+        
+        Returns:
+            On success the candidate, its open response, the bytes read so far
+            ('head') and the remaining body iterator ('chunks'); otherwise a
+            failure result
+        """
+        response = None
+        watchdog = None
         try:
-            # Create filename
-            title = paper_info.get('title', 'unknown')
-            safe_title = re.sub(r'[^\w\-_\.]', '_', title)
-            pmcid = paper_info.get('pmcid', '')
-            pmid = paper_info.get('pmid', '')
-            
-            identifier = pmcid if pmcid else (pmid if pmid else 'unknown')
-            filename = f"{safe_title}_{identifier}_{doi.replace('/', '_')}_EuropePMC.pdf"
-            filepath = output_folder / filename
-            
-            # Download the content
-            response = self.session.get(download_url, timeout=self.config.download_timeout, stream=True)
+            if candidate.kind == "xml":
+                # Europe PMC full text XML (API call, not a full-text host)
+                response = self._get(candidate.url, candidate.source, "fetch", timeout=self.config.europepmc_timeout)
+                response.raise_for_status()
+                
+                content_type = response.headers.get('content-type', '').lower()
+                if 'xml' not in content_type and 'text' not in content_type:
+                    return self._candidate_failure(candidate, doi, 'Europe PMC XML endpoint did not return XML content')
+                return {'success': True, 'candidate': candidate, 'response': response,
+                        'head': response.content, 'chunks': iter(()), 'watchdog': None}
+            
+            # Skip URLs a cheap probe or cached host verdict shows are not PDFs
+            rejection = self._preflight(candidate.url, candidate.source, doi)
+            if rejection:
+                return self._candidate_failure(candidate, doi, rejection['error'])
+            
+            response = self._get(candidate.url, candidate.source, "pdf",
+                                 timeout=self.config.download_timeout, stream=True)
             response.raise_for_status()
             
-            # Check Content-Type header
+            # Check Content-Type header first
             content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type:
-                return {
-                    'success': False,
-                    'error': f'Europe PMC link returned HTML instead of PDF (Content-Type: {content_type})',
-                    'doi': doi
-                }
+            if 'text/html' in content_type or 'text/plain' in content_type:
+                self._record_host(candidate.url, False, f'returned {content_type}')
+                response.close()
+                return self._candidate_failure(
+                    candidate, doi,
+                    f'{candidate.label} URL returned HTML/text instead of PDF (Content-Type: {content_type})'
+                )
             
-            # Download and validate content
-            content = b''
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    content += chunk
-                    if len(content) > 1024 * 1024:  # 1MB validation limit
-                        with open(filepath, 'wb') as f:
-                            f.write(content)
-                            for remaining_chunk in response.iter_content(chunk_size=8192):
-                                if remaining_chunk:
-                                    f.write(remaining_chunk)
+            # Read just enough to validate (first 1KB); the watchdog covers the rest of the transfer too
+            watchdog = self._watch_transfer(response)
+            chunks = response.iter_content(chunk_size=8192)
+            head = b''
+            with self.cancel_token.on_cancel(lambda: abort_response(response)):
+                for chunk in chunks:
+                    head += chunk
+                    watchdog.add(len(chunk))
+                    if len(head) >= 1024:
                         break
-            else:
-                with open(filepath, 'wb') as f:
-                    f.write(content)
             
-            # Validate PDF
-            if not self._is_valid_pdf(content[:1024]):
-                if filepath.exists():
-                    filepath.unlink()
-                return {
-                    'success': False,
-                    'error': 'Downloaded content from Europe PMC is not a valid PDF',
-                    'doi': doi
-                }
+            if not self._is_valid_pdf(head[:1024]):
+                self._record_host(candidate.url, False, 'content is not a PDF')
+                watchdog.stop()
+                response.close()
+                return self._candidate_failure(
+                    candidate, doi,
+                    'Downloaded content is not a valid PDF (likely HTML/text from publisher paywall)'
+                )
             
-            # Verify file
-            if filepath.exists() and filepath.stat().st_size > 1000:
-                return {
-                    'success': True,
-                    'doi': doi,
-                    'file_path': str(filepath),
-                    'title': paper_info.get('title', ''),
-                    'authors': paper_info.get('authors', []),
-                    'source': source_name,
-                    'pmcid': paper_info.get('pmcid', ''),
-                    'pmid': paper_info.get('pmid', '')
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Downloaded Europe PMC file is empty or too small',
-                    'doi': doi
-                }
-                
-        except Exception as e:
-            if 'filepath' in locals() and filepath.exists():
-                try:
-                    filepath.unlink()
-                except:
-                    pass
-            return {
-                'success': False,
-                'error': f'Europe PMC PDF download failed: {str(e)}',
-                'doi': doi
-            }
+            self._record_host(candidate.url, True)
+            return {'success': True, 'candidate': candidate, 'response': response, 'head': head, 'chunks': chunks,
+                    'watchdog': watchdog}
+            
+        except (Exception, DownloadCancelled) as e:
+            if watchdog is not None:
+                watchdog.stop()
+            if response is not None:
+                response.close()
+            # An aborted read fails with a connection error; report the stop instead
+            self.cancel_token.check()
+            if isinstance(e, DownloadCancelled):
+                raise
+            return self._transfer_failure(candidate, doi, e, watchdog)
     
-    def _try_download_paper(self, paper: Dict, doi: str, output_folder: Path, source: str = "CORE") -> Dict[str, Any]:
-        """Try to download a paper from CORE or arXiv data"""
+    def _save_candidate(self, opened: Dict[str, Any], doi: str, output_folder: Path) -> Dict[str, Any]:
+        """Write an opened candidate's body to disk and build the download result"""
+        candidate: Candidate = opened['candidate']
+        filepath = output_folder / candidate.filename
+        watchdog: Optional[TransferWatchdog] = opened['watchdog']
+        chunks = opened['chunks'] if watchdog is None else watchdog.watch(opened['chunks'])
         try:
-            # Get download URL
-            download_url = paper.get('downloadUrl')
-            if not download_url:
-                # Try repository document
-                repo_doc = paper.get('repositoryDocument', {})
-                download_url = repo_doc.get('pdfOrigin')
-            
-            if not download_url:
-                return {
-                    'success': False,
-                    'error': 'No download URL available',
-                    'doi': doi
-                }
-            
-            # Create filename
-            title = paper.get('title', 'unknown')[:50]  # Truncate title
-            safe_title = re.sub(r'[^\w\-_\.]', '_', title)
-            
-            # Include source and arXiv ID if available
-            source_suffix = f"_{source}"
-            if source == "arXiv" and paper.get('arxiv_id'):
-                arxiv_id = paper.get('arxiv_id').replace('/', '_')
-                filename = f"{safe_title}_{arxiv_id}_{doi.replace('/', '_')}{source_suffix}.pdf"
-            else:
-                filename = f"{safe_title}_{doi.replace('/', '_')}{source_suffix}.pdf"
-            filepath = output_folder / filename
-            
-            # Download the content
-            pdf_response = self.session.get(
-                download_url, 
-                timeout=self.config.download_timeout,
-                stream=True
-            )
-            pdf_response.raise_for_status()
-            
-            # Check Content-Type header first
-            content_type = pdf_response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type or 'text/plain' in content_type:
-                return {
-                    'success': False,
-                    'error': f'Download URL returned HTML/text instead of PDF (Content-Type: {content_type})',
-                    'doi': doi
-                }
-            
-            # Download content to memory first for validation
-            content = b''
-            for chunk in pdf_response.iter_content(chunk_size=8192):
-                if chunk:
-                    content += chunk
-                    # Stop if we've read enough to validate (first 1MB)
-                    if len(content) > 1024 * 1024:
-                        # Still download the rest to a file
-                        with open(filepath, 'wb') as f:
-                            f.write(content)
-                            for remaining_chunk in pdf_response.iter_content(chunk_size=8192):
-                                if remaining_chunk:
-                                    f.write(remaining_chunk)
-                        break
-            else:
-                # Small file, we have all content in memory
-                with open(filepath, 'wb') as f:
-                    f.write(content)
-            
-            # Validate that it's actually a PDF file
-            if not self._is_valid_pdf(content[:1024]):  # Check first 1KB
-                # Remove the invalid file
-                if filepath.exists():
-                    filepath.unlink()
-                return {
-                    'success': False,
-                    'error': 'Downloaded content is not a valid PDF (likely HTML/text from publisher paywall)',
-                    'doi': doi
-                }
-            
-            # Verify the file was saved and has reasonable size
-            if filepath.exists() and filepath.stat().st_size > 1000:  # At least 1KB
-                return {
-                    'success': True,
-                    'doi': doi,
-                    'file_path': str(filepath),
-                    'title': paper.get('title', ''),
-                    'authors': paper.get('authors', []),
-                    'source': source,
-                    'arxiv_id': paper.get('arxiv_id', '') if source == "arXiv" else ''
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Downloaded file is empty or too small to be a valid PDF',
-                    'doi': doi
-                }
-                
-        except Exception as e:
+            with self.cancel_token.on_cancel(lambda: abort_response(opened['response'])):
+                self._stream_to_file(
+                    chain([opened['head']], chunks), filepath, candidate.source,
+                    count_as="pdf" if candidate.kind == "pdf" else None
+                )
+        except (Exception, DownloadCancelled) as e:
             # Clean up any partially downloaded file
-            if 'filepath' in locals() and filepath.exists():
-                try:
-                    filepath.unlink()
-                except:
-                    pass
+            filepath.unlink(missing_ok=True)
+            self.cancel_token.check()
+            if isinstance(e, DownloadCancelled):
+                raise
+            return self._transfer_failure(candidate, doi, e, watchdog)
+        finally:
+            self._close_opened(opened)
+        
+        # Verify the file was saved and has reasonable size
+        if filepath.stat().st_size > 1000:  # At least 1KB
             return {
-                'success': False,
-                'error': f'PDF download failed: {str(e)}',
-                'doi': doi
+                'success': True,
+                'doi': doi,
+                'file_path': str(filepath),
+                'source': candidate.label,
+                'candidate_source': candidate.source,
+                **candidate.metadata
             }
+        
+        filepath.unlink(missing_ok=True)
+        self._record_host(candidate.url, False, 'file too small')
+        return self._candidate_failure(candidate, doi, 'Downloaded file is empty or too small to be a valid PDF')
+    
+    def _watch_transfer(self, response: requests.Response) -> TransferWatchdog:
+        """Watchdog ending a PDF transfer by transfer_timeout (or the DOI's deadline, if sooner)"""
+        now = time.monotonic()
+        deadlines = [now + self.config.transfer_timeout] if self.config.transfer_timeout > 0 else []
+        left = self._time_left()
+        if left is not None:
+            deadlines.append(now + left)
+        return TransferWatchdog(response, min(deadlines) if deadlines else None,
+                                self.config.min_transfer_rate, self.config.min_rate_grace)
+    
+    @staticmethod
+    def _close_opened(opened: Dict[str, Any]):
+        if opened['watchdog'] is not None:
+            opened['watchdog'].stop()
+        opened['response'].close()
+    
+    def _transfer_failure(self, candidate: Candidate, doi: str, error: BaseException,
+                          watchdog: Optional[TransferWatchdog]) -> Dict[str, Any]:
+        """Failure result for a candidate whose request or transfer raised, flagging slow transfers"""
+        if watchdog is not None:
+            error = watchdog.explain(error)
+        failure = self._candidate_failure(candidate, doi, f'PDF download failed: {str(error)}')
+        if isinstance(error, SlowTransfer):
+            failure['slow_transfer'] = True
+        return failure
+    
+    @staticmethod
+    def _candidate_failure(candidate: Candidate, doi: str, error: str) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'error': error,
+            'doi': doi,
+            'url': candidate.url,
+            'candidate_source': candidate.source
+        }
     
     def _is_valid_pdf(self, content: bytes) -> bool:
         """Check if content starts with PDF magic bytes and is not HTML"""
@@ -1228,15 +2066,30 @@ class OpenAccessDownloader:
         return self.progress
     
     def set_stop_flag(self):
-        """Stop the current download process"""
-        self.stop_flag = True
+        """Stop the current download process, interrupting its sleeps and transfers"""
+        self.cancel_token.cancel()
         self.progress.status = "stopping"
         logger.info("Download stop requested")
     
     def clear_progress(self):
         """Clear current progress tracking"""
         self.progress = DownloadProgress()
-        self.stop_flag = False
+        self.cancel_token = CancelToken()
+    
+    def close(self):
+        """
+        Release the worker threads and HTTP clients once no more downloads will run.
+        
+        Lookups and transfers abandoned by a stopped job finish in the
+        background. Progress, stats and library calls keep working on a
+        closed downloader.
+        """
+        self._batch_pool.shutdown(wait=False)
+        self._lookup_pool.shutdown(wait=False)
+        self._race_pool.shutdown(wait=False)
+        if self.http2:
+            self.http2.close()
+        self.session.close()
     
     def get_download_stats(self) -> Dict[str, Any]:
         """Get comprehensive download statistics"""
@@ -1247,11 +2100,11 @@ class OpenAccessDownloader:
             'last_update': datetime.now().isoformat()
         }
     
-    def _get_downloaded_dois(self) -> Set[str]:
+    def _get_downloaded_dois(self) -> DoiLibrary:
         """Get set of successfully downloaded DOIs"""
         return self.downloaded_dois
     
-    def _get_failed_dois(self) -> Set[str]:
+    def _get_failed_dois(self) -> DoiLibrary:
         """Get set of failed DOIs"""
         return self.failed_dois
     
@@ -1263,39 +2116,11 @@ class OpenAccessDownloader:
         self._save_tracking_data()
         return total_cleared
     
-    def _load_tracking_data(self):
-        """Load tracking data from disk"""
-        try:
-            # Load downloaded DOIs
-            downloaded_file = self.config.data_dir / "downloaded_library.txt"
-            if downloaded_file.exists():
-                with open(downloaded_file, 'r', encoding='utf-8') as f:
-                    self.downloaded_dois = set(line.strip() for line in f if line.strip())
-            
-            # Load failed DOIs
-            failed_file = self.config.data_dir / "failed_dois.txt"
-            if failed_file.exists():
-                with open(failed_file, 'r', encoding='utf-8') as f:
-                    self.failed_dois = set(line.strip() for line in f if line.strip())
-                    
-        except Exception as e:
-            logger.error(f"Error loading tracking data: {e}")
-    
     def _save_tracking_data(self):
-        """Save tracking data to disk"""
+        """Merge DOIs recorded since the last save into the tracking files"""
         try:
-            # Save downloaded DOIs
-            downloaded_file = self.config.data_dir / "downloaded_library.txt"
-            with open(downloaded_file, 'w', encoding='utf-8') as f:
-                for doi in sorted(self.downloaded_dois):
-                    f.write(f"{doi}\n")
-            
-            # Save failed DOIs
-            failed_file = self.config.data_dir / "failed_dois.txt"
-            with open(failed_file, 'w', encoding='utf-8') as f:
-                for doi in sorted(self.failed_dois):
-                    f.write(f"{doi}\n")
-                    
+            self.downloaded_dois.save()
+            self.failed_dois.save()
         except Exception as e:
             logger.error(f"Error saving tracking data: {e}")
 
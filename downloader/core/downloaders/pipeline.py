@@ -0,0 +1,181 @@
+"""
+Two-stage resolve/fetch pipeline for download jobs
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+from ...utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Pipeline(Generic[T]):
+    """
+    Run work items through a resolve stage and a fetch stage.
+    
+    Resolve workers (API lookups, bounded by provider quotas) hand items to
+    fetch workers (PDF transfers, bounded by bandwidth) through a queue of
+    queue_size items. When fetching falls behind, resolvers block on the full
+    queue instead of looking up DOIs far ahead; when lookups fall behind,
+    fetch workers simply wait. Each stage has its own worker count.
+    
+    resolve(item) returns the item to fetch, or None when the item is
+    finished. fetch(item) returns None when the item is finished, or the item
+    again to send it back to the resolve stage (e.g. to look up more sources
+    after its candidates failed). Items sent back are resolved before new
+    ones are taken from the input.
+    
+    Once stopped() turns true, queued items are dropped and run() waits at
+    most stop_grace seconds for workers still busy (e.g. in an HTTP call);
+    the rest finish in the background.
+    """
+    
+    def __init__(self, resolve: Callable[[T], Optional[T]], fetch: Callable[[T], Optional[T]],
+                 resolve_workers: int = 4, fetch_workers: int = 5, queue_size: int = 20,
+                 stopped: Callable[[], bool] = lambda: False, stop_grace: float = 1.0):
+        """
+        Args:
+            resolve: Resolve stage function
+            fetch: Fetch stage function
+            resolve_workers: Threads running the resolve stage
+            fetch_workers: Threads running the fetch stage
+            queue_size: Items waiting between the stages at most
+            stopped: Returns True once the job should stop; queued items are then dropped
+            stop_grace: Seconds run() waits for busy workers after a stop
+        """
+        self.resolve = resolve
+        self.fetch = fetch
+        self.resolve_workers = max(1, resolve_workers)
+        self.fetch_workers = max(1, fetch_workers)
+        self.stopped = stopped
+        self.stop_grace = stop_grace
+        self._fetch_queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._returned: Deque[T] = deque()
+        self._items: Iterator[T] = iter(())
+        self._exhausted = False
+        self._in_flight = 0
+        self._closed = False
+        self._give_up: Optional[float] = None
+        self._condition = threading.Condition()
+    
+    def run(self, items: Iterable[T]):
+        """Process every item (taken lazily from items) and return when all are finished or stopped"""
+        self._items = iter(items)
+        self._exhausted = False
+        self._closed = False
+        self._give_up = None
+        resolvers = self._start(self.resolve_workers, self._resolve_loop, "resolve")
+        fetchers = self._start(self.fetch_workers, self._fetch_loop, "fetch")
+        self._join(resolvers)
+        # Resolvers only exit once nothing is in flight (or after a stop), so no item is lost here
+        self._closed = True
+        self._join(fetchers)
+    
+    def wake(self):
+        """Wake idle workers so they notice a stop right away"""
+        with self._condition:
+            self._condition.notify_all()
+    
+    def _join(self, threads: List[threading.Thread]):
+        """Wait for threads, but only until stop_grace seconds after the pipeline was stopped"""
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.1)
+                if self._give_up is None and self.stopped():
+                    self._give_up = time.monotonic() + self.stop_grace
+                if self._give_up is not None and time.monotonic() >= self._give_up:
+                    busy = sum(1 for t in threads if t.is_alive())
+                    if busy:
+                        logger.info(f"Stopped without waiting for {busy} busy pipeline worker(s)")
+                    return
+    
+    @staticmethod
+    def _start(count: int, target: Callable[[], None], name: str) -> List[threading.Thread]:
+        threads = [threading.Thread(target=target, name=f"pipeline-{name}-{i}", daemon=True) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+    
+    def _next_item(self) -> Optional[T]:
+        """Next item to resolve, or None once every item is finished"""
+        with self._condition:
+            while True:
+                if self.stopped():
+                    # Drop items waiting to go back to the resolve stage; items
+                    # still being fetched finish (or are abandoned) on their own
+                    self._in_flight -= len(self._returned)
+                    self._returned.clear()
+                    self._exhausted = True
+                    self._condition.notify_all()
+                    return None
+                if self._returned:
+                    return self._returned.popleft()
+                if not self._exhausted:
+                    try:
+                        item = next(self._items)
+                    except StopIteration:
+                        self._exhausted = True
+                    else:
+                        self._in_flight += 1
+                        return item
+                if self._in_flight == 0:
+                    self._condition.notify_all()
+                    return None
+                # Wait for a fetch worker to finish or return an item
+                self._condition.wait(timeout=0.5)
+    
+    def _finish(self, returned: Optional[T]):
+        with self._condition:
+            if returned is not None and not self.stopped():
+                self._returned.append(returned)
+            else:
+                self._in_flight -= 1
+            self._condition.notify_all()
+    
+    def _resolve_loop(self):
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            try:
+                resolved = self.resolve(item)
+            except Exception as e:
+                logger.error(f"Resolve stage failed: {e}")
+                resolved = None
+            if resolved is None:
+                self._finish(None)
+            else:
+                self._put(resolved)
+    
+    def _put(self, item: T):
+        """Queue an item for the fetch stage, blocking while it is behind"""
+        while True:
+            try:
+                self._fetch_queue.put(item, timeout=0.25)
+                return
+            except queue.Full:
+                if self.stopped():
+                    self._finish(None)
+                    return
+    
+    def _fetch_loop(self):
+        while True:
+            try:
+                item = self._fetch_queue.get(timeout=0.25)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            returned = None
+            if not self.stopped():
+                try:
+                    returned = self.fetch(item)
+                except Exception as e:
+                    logger.error(f"Fetch stage failed: {e}")
+            self._finish(returned)
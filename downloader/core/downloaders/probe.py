@@ -0,0 +1,86 @@
+"""
+Cheap pre-flight checks of candidate download URLs
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import requests
+
+
+PROBE_BYTES = 1024
+MIN_PDF_SIZE = 1000  # bytes; matches the size check after a full download
+
+_CONTENT_RANGE_TOTAL = re.compile(r'/(\d+)\s*$')
+_HTML_MARKERS = (b'<!doctype html', b'<html', b'<head', b'<body')
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of probing one URL"""
+    verdict: str  # "pdf", "not_pdf" or "unknown" (probe inconclusive, fall back to a full GET)
+    reason: str = ""
+    status: Optional[int] = None
+    content_type: str = ""
+    content_length: Optional[int] = None
+    
+    @property
+    def rejected(self) -> bool:
+        return self.verdict == "not_pdf"
+
+
+def probe_url(get: Callable[..., requests.Response], timeout: float) -> ProbeResult:
+    """
+    Fetch only the first kilobyte of a URL and decide whether it is a PDF.
+    
+    Args:
+        get: Callable issuing the GET for the URL being probed (accepts headers, timeout, stream)
+        timeout: Request timeout in seconds
+    
+    Returns:
+        ProbeResult; only "not_pdf" verdicts should stop a download
+    """
+    try:
+        response = get(headers={'Range': f'bytes=0-{PROBE_BYTES - 1}'}, timeout=timeout, stream=True)
+    except requests.exceptions.RequestException as e:
+        return ProbeResult("unknown", reason=f"probe failed: {type(e).__name__}")
+    
+    try:
+        content_type = response.headers.get('content-type', '').lower()
+        if response.status_code >= 400:
+            # Some hosts reject ranged requests outright; let the full download decide
+            return ProbeResult("unknown", reason=f"HTTP {response.status_code}",
+                               status=response.status_code, content_type=content_type)
+        
+        content_length = _total_length(response)
+        result = ProbeResult("unknown", status=response.status_code,
+                             content_type=content_type, content_length=content_length)
+        
+        if 'text/html' in content_type or 'text/plain' in content_type:
+            result.verdict, result.reason = "not_pdf", f"returned HTML/text (Content-Type: {content_type})"
+            return result
+        if content_length is not None and content_length < MIN_PDF_SIZE:
+            result.verdict, result.reason = "not_pdf", f"too small to be a PDF ({content_length} bytes)"
+            return result
+        
+        # Servers ignoring Range send the whole body; read just the head either way
+        head = next(response.iter_content(chunk_size=PROBE_BYTES), b'')[:PROBE_BYTES]
+        if head.startswith(b'%PDF-'):
+            result.verdict = "pdf"
+        elif any(marker in head.lower() for marker in _HTML_MARKERS):
+            result.verdict, result.reason = "not_pdf", "content is an HTML page"
+        return result
+    except requests.exceptions.RequestException as e:
+        return ProbeResult("unknown", reason=f"probe failed: {type(e).__name__}")
+    finally:
+        response.close()
+
+
+def _total_length(response: requests.Response) -> Optional[int]:
+    """Full resource size from Content-Range (206) or Content-Length (200)"""
+    if response.status_code == 206:
+        match = _CONTENT_RANGE_TOTAL.search(response.headers.get('content-range', ''))
+        return int(match.group(1)) if match else None
+    length = response.headers.get('content-length')
+    return int(length) if length and length.isdigit() else None
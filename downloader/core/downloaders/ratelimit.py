@@ -0,0 +1,29 @@
+"""
+Request spacing for providers with per-minute quotas
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Space calls evenly so at most `rate` start within any `per` seconds.
+    
+    Threads reserve consecutive slots, so concurrent callers queue up instead
+    of bursting. Callers do the waiting themselves, which keeps the sleeps
+    visible in job traces.
+    """
+    
+    def __init__(self, rate: float, per: float = 60.0):
+        self.interval = per / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Claim the next slot and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
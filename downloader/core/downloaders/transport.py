@@ -0,0 +1,257 @@
+"""
+HTTP transport for provider clients: cached DNS resolution and optional HTTP/2
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from ...config import get_config
+from ...utils import get_logger
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:  # Optional dependency: pip install "httpx[http2]"
+    httpx = None
+
+logger = get_logger(__name__)
+
+
+class DnsCache:
+    """
+    Thread-safe cache of resolved host addresses.
+    
+    The system resolver does not report record TTLs, so entries live for a
+    fixed ttl. Keep it below the TTLs of the hosts you talk to; a failed
+    connection to a cached address evicts the entry early.
+    """
+    
+    def __init__(self, ttl: float = 300, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+    
+    def resolve(self, host: str, port: int) -> List[str]:
+        """
+        Addresses for a host, from cache when fresh.
+        
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+        """
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))  # dedupe, keep resolver order
+        
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+    
+    def invalidate(self, host: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == host]:
+                del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global DNS cache shared by all sessions
+_dns_cache: Optional[DnsCache] = None
+_dns_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DnsCache:
+    """Get the process-wide DNS cache"""
+    global _dns_cache
+    with _dns_cache_lock:
+        if _dns_cache is None:
+            _dns_cache = DnsCache(ttl=get_config().dns_cache_ttl)
+        return _dns_cache
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class _CachedDnsConnectionMixin:
+    """Connect using addresses from the DNS cache, trying each in turn"""
+    
+    def _new_conn(self):
+        host = self._dns_host
+        if _is_ip(host):
+            return super()._new_conn()
+        
+        cache = get_dns_cache()
+        try:
+            addresses = cache.resolve(host, self.port)
+        except socket.gaierror:
+            return super()._new_conn()  # Let urllib3 raise its NameResolutionError
+        
+        # TLS server name and Host header still come from self.host
+        last_error = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                last_error = e
+            finally:
+                self._dns_host = host
+        
+        cache.invalidate(host)
+        raise last_error
+
+
+class CachedDnsHTTPConnection(_CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+
+class CachedDnsHTTPSConnection(_CachedDnsConnectionMixin, HTTPSConnection):
+    pass
+
+
+class CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDnsHTTPConnection
+
+
+class CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDnsHTTPSConnection
+
+
+class CachedDnsAdapter(HTTPAdapter):
+    """requests adapter whose new connections resolve hosts through the DNS cache"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedDnsHTTPConnectionPool,
+            "https": CachedDnsHTTPSConnectionPool,
+        }
+
+
+def create_session(config) -> requests.Session:
+    """
+    Session for provider and download requests.
+    
+    Keeps up to http_pool_size keep-alive connections per host so concurrent
+    lookups reuse connections, and resolves hosts through the DNS cache
+    unless dns_cache_ttl is 0.
+    """
+    session = requests.Session()
+    adapter_class = CachedDnsAdapter if config.dns_cache_ttl > 0 else HTTPAdapter
+    for scheme in ("http://", "https://"):
+        session.mount(scheme, adapter_class(pool_connections=config.http_pool_size,
+                                            pool_maxsize=config.http_pool_size))
+    return session
+
+
+class Http2Response:
+    """Subset of requests.Response backed by an httpx response"""
+    
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+    
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+    
+    @property
+    def text(self) -> str:
+        return self._response.text
+    
+    def json(self, **kwargs) -> Any:
+        return self._response.json(**kwargs)
+    
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        return self._response.iter_bytes(chunk_size)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self._response.reason_phrase} for url: {self.url}",
+                response=self
+            )
+    
+    def close(self):
+        self._response.close()
+
+
+class Http2Client:
+    """
+    HTTP/2 client for provider API calls.
+    
+    One multiplexed connection per host carries all concurrent lookups to that
+    API. Servers without HTTP/2 are spoken to over HTTP/1.1. httpx errors are
+    re-raised as the equivalent requests exceptions so callers handle both
+    transports the same way.
+    """
+    
+    def __init__(self, headers: Dict[str, str], pool_size: int = 20):
+        self._client = httpx.Client(
+            http2=True,
+            headers=headers,
+            follow_redirects=True,  # like requests, which API calls otherwise go through
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+    
+    @staticmethod
+    def handles(url: str) -> bool:
+        # HTTP/2 is negotiated during the TLS handshake, so plain-HTTP URLs stay on requests
+        return url.startswith("https://")
+    
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+            headers: Optional[Dict[str, str]] = None) -> Http2Response:
+        try:
+            response = self._client.get(url, params=params, timeout=timeout, headers=headers)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except (httpx.ConnectError, httpx.RemoteProtocolError) as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        return Http2Response(response)
+    
+    def close(self):
+        self._client.close()
+
+
+def create_http2_client(config, headers: Dict[str, str]) -> Optional[Http2Client]:
+    """HTTP/2 client for API calls, or None if disabled or httpx[http2] is not installed"""
+    if not config.http2_api:
+        return None
+    if httpx is None:
+        logger.debug("httpx[http2] not installed; API calls use HTTP/1.1")
+        return None
+    return Http2Client(headers, pool_size=config.http_pool_size)
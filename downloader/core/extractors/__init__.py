@@ -1,7 +1,16 @@
 """DOI extractors for different file formats"""
 
+from .base import ExtractionResult
 from .bibtex import BibtexExtractor
 from .rayyan import RayyanExtractor
 from .scopus import ScopusExtractor
+from .multi import MultiFileExtractor, detect_format
 
-__all__ = ["BibtexExtractor", "RayyanExtractor", "ScopusExtractor"] 
\ No newline at end of file
+__all__ = [
+    "ExtractionResult",
+    "BibtexExtractor",
+    "RayyanExtractor",
+    "ScopusExtractor",
+    "MultiFileExtractor",
+    "detect_format",
+]
@@ -2,12 +2,22 @@
 Abstract base class for DOI extractors
 """
 
+import hashlib
+import io
+import json
+import threading
 from abc import ABC, abstractmethod
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Callable, IO, Optional, TextIO, Union
+from dataclasses import dataclass, field
 
-from ...utils import get_logger
+from .cache import ExtractionCache, HashingReader, get_extraction_cache
+from ...config import get_config
+from ...utils import doi_key, get_logger, open_decompressed
+
+# Serializes read-modify-write of the extraction summary file
+_summary_lock = threading.Lock()
 
 
 @dataclass
@@ -19,6 +29,9 @@ class ExtractionResult:
     duplicates_removed: int
     errors: List[str]
     source_format: str
+    total_records: Optional[int] = None
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    content_hash: Optional[str] = None
     
     @property
     def success(self) -> bool:
@@ -27,7 +40,7 @@ class ExtractionResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
+        data = {
             "source_format": self.source_format,
             "total_found": self.total_found,
             "unique_count": self.unique_count,
@@ -36,15 +49,121 @@ class ExtractionResult:
             "success": self.success,
             "errors": self.errors
         }
+        if self.total_records is not None:
+            data["total_records_processed"] = self.total_records
+        if self.files:
+            data["files"] = self.files
+        return data
 
 
-class BaseExtractor(ABC):
-    """Abstract base class for DOI extractors"""
+class ExtractionWriter:
+    """Save extraction results and record them in the extraction summary file"""
+    
+    # Format name used in log messages
+    source_format = "Unknown"
     
     def __init__(self):
         self.logger = get_logger(self.__class__.__name__)
     
-    @abstractmethod
+    def _save_result(self, result: ExtractionResult, output_path: Path,
+                     input_name: Optional[str]) -> ExtractionResult:
+        """Save the extracted DOIs and record the extraction in the summary file"""
+        # Save DOIs to output file
+        if result.dois and not self._save_dois(result.dois, output_path):
+            result.errors.append("Failed to save DOIs to output file")
+        
+        # Save extraction summary
+        self._save_summary(result, input_name)
+        
+        self.logger.info(
+            f"Extracted {result.unique_count} unique DOIs from {result.total_found} "
+            f"total DOIs ({self.source_format})"
+        )
+        return result
+    
+    def _save_dois(self, dois: List[str], output_path: Path) -> bool:
+        """
+        Save DOIs to output file.
+        
+        Args:
+            dois: List of DOI strings
+            output_path: Path to output file
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for doi in dois:
+                    f.write(doi.strip() + "\n")
+            self.logger.info(f"Saved {len(dois)} DOIs to {output_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving DOIs to {output_path}: {e}")
+            return False
+    
+    def _save_summary(self, result: ExtractionResult, input_name: Optional[str] = None):
+        """
+        Record the extraction in the JSON summary file.
+        
+        The summary keeps one record per extractor and input content hash, so
+        a new extraction no longer overwrites the records of earlier inputs.
+        """
+        try:
+            config = get_config()
+            summary_path = config.extraction_summary_file
+            
+            record = result.to_dict()
+            record["input_file"] = input_name
+            record["extracted_at"] = datetime.now().isoformat()
+            record_key = ExtractionCache.make_key(
+                self.__class__.__name__, result.content_hash or record["extracted_at"]
+            )
+            
+            with _summary_lock:
+                records = self._load_summary_records(summary_path)
+                records.pop(record_key, None)
+                records[record_key] = record
+                
+                # Keep only the most recent records (dicts preserve insertion order)
+                max_records = config.extraction_summary_max_records
+                keys = list(records)
+                for key in keys[:max(0, len(keys) - max_records)]:
+                    del records[key]
+                
+                with open(summary_path, 'w', encoding='utf-8') as f:
+                    json.dump({"latest": record_key, "extractions": records}, f, indent=2)
+            
+            self.logger.info(f"Extraction summary saved to {summary_path}")
+        except Exception as e:
+            self.logger.error(f"Error saving extraction summary: {e}")
+    
+    def _load_summary_records(self, summary_path: Path) -> Dict[str, Any]:
+        """Load existing per-input summary records, upgrading the legacy single-result format"""
+        if not summary_path.exists():
+            return {}
+        try:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable extraction summary {summary_path}: {e}")
+            return {}
+        
+        if isinstance(data, dict) and isinstance(data.get("extractions"), dict):
+            return data["extractions"]
+        if isinstance(data, dict) and "source_format" in data:
+            # Summary written by an older version: a single result for the last input
+            return {"legacy": data}
+        return {}
+
+
+class BaseExtractor(ExtractionWriter, ABC):
+    """Abstract base class for DOI extractors"""
+    
+    # Format name reported in ExtractionResult.source_format
+    source_format = "Unknown"
+    
     def extract(self, input_path: Path, output_path: Path) -> ExtractionResult:
         """
         Extract DOIs from input file and save to output file.
@@ -56,6 +175,153 @@ class BaseExtractor(ABC):
         Returns:
             ExtractionResult with details about the extraction
         """
+        result = self.collect(input_path)
+        return self._save_result(result, output_path, getattr(input_path, 'name', None))
+    
+    def collect(self, input_path: Path) -> ExtractionResult:
+        """
+        Extract DOIs from input file without writing any output.
+        
+        Results are cached by file version (path, size and modification time)
+        and by content hash, so extracting an unchanged file again returns
+        immediately without reading it.
+        
+        Args:
+            input_path: Path to input file
+            
+        Returns:
+            ExtractionResult with the unique DOIs found
+        """
+        if not input_path.exists() or not input_path.is_file():
+            return self._failed_result(f"Invalid or missing {self.source_format} file: {input_path}")
+        
+        cache = get_extraction_cache()
+        try:
+            file_key = ExtractionCache.make_key(self.__class__.__name__, ExtractionCache.file_id(input_path))
+        except OSError as e:
+            self.logger.error(f"Error reading {input_path}: {e}")
+            return self._failed_result(f"Error reading file: {e}")
+        
+        cached = cache.get(file_key)
+        if cached is not None:
+            self.logger.info(f"Using cached extraction result for {input_path.name}")
+            return cached
+        
+        try:
+            # Compressed inputs (gzip/zstd/zip) are decompressed while they are read;
+            # the decompressed content is hashed as it is parsed, as in extract_stream
+            with open(input_path, 'rb') as raw:
+                stream, name = open_decompressed(raw, input_path.name)
+                reader = HashingReader(stream)
+                with stream, io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8') as file:
+                    result = self._scan_stream(file, str(input_path.with_name(name)), reader.finish)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error reading {input_path}: {e}")
+            return self._failed_result(f"Error reading file: {e}")
+        
+        if result.content_hash:
+            cache.put(file_key, result)
+        return result
+    
+    def extract_content(self, content: Union[str, bytes], name: str = "content") -> ExtractionResult:
+        """
+        Extract DOIs from in-memory text or bytes without touching the disk.
+        
+        Args:
+            content: File content (bytes are decoded as UTF-8)
+            name: Name of the input, used for format checks and messages
+            
+        Returns:
+            ExtractionResult with the unique DOIs found
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        content_hash = hashlib.sha256(data).hexdigest()
+        
+        cache = get_extraction_cache()
+        cache_key = ExtractionCache.make_key(self.__class__.__name__, content_hash)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            self.logger.info(f"Using cached extraction result for {name}")
+            return cached
+        
+        if isinstance(content, str):
+            stream: TextIO = io.StringIO(content)
+        else:
+            stream = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8')
+        
+        return self._scan_stream(stream, name, lambda: content_hash)
+    
+    def extract_stream(self, stream: IO, name: str = "stream",
+                       output_path: Optional[Path] = None) -> ExtractionResult:
+        """
+        Extract DOIs from an open text or binary stream as it is read.
+        
+        The stream is read once; for binary streams the content hash is computed
+        while parsing so identical content is served from the cache later.
+        Nothing is written unless output_path is given.
+        
+        Args:
+            stream: Readable text or binary stream (binary is decoded as UTF-8)
+            name: Name of the input, used for format checks and messages
+            output_path: Optional path to save the DOIs to (also records the summary)
+            
+        Returns:
+            ExtractionResult with the unique DOIs found
+        """
+        if isinstance(stream.read(0), str):
+            # Text streams are parsed directly; there are no bytes to hash
+            result = self._scan_stream(stream, name)
+        else:
+            reader = HashingReader(stream)
+            text_stream = io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8')
+            result = self._scan_stream(text_stream, name, reader.hexdigest)
+        
+        if output_path is not None:
+            self._save_result(result, output_path, name)
+        return result
+    
+    def _scan_stream(self, stream: TextIO, name: str,
+                     content_hash: Optional[Callable[[], str]] = None) -> ExtractionResult:
+        """
+        Scan an in-memory or request stream.
+        
+        Args:
+            stream: Text stream positioned at the start of the input
+            name: Name of the input
+            content_hash: Returns the content hash once the stream is consumed;
+                if given, a successfully parsed result is cached under it
+            
+        Returns:
+            ExtractionResult with the unique DOIs found
+        """
+        try:
+            result = self._scan(stream, Path(name))
+        except Exception as e:
+            self.logger.error(f"Error reading {name}: {e}")
+            return self._failed_result(f"Error reading file: {e}")
+        
+        if result is None:
+            return self._failed_result(f"Invalid or missing {self.source_format} file: {name}")
+        
+        if content_hash is not None:
+            result.content_hash = content_hash()
+            get_extraction_cache().put(
+                ExtractionCache.make_key(self.__class__.__name__, result.content_hash), result
+            )
+        return result
+    
+    @abstractmethod
+    def _scan(self, stream: TextIO, input_path: Path) -> Optional[ExtractionResult]:
+        """
+        Parse DOIs from an open text stream.
+        
+        Args:
+            stream: Text stream positioned at the start of the input
+            input_path: Path (or name) of the input, used for messages
+            
+        Returns:
+            ExtractionResult, or None if the content is not in this format
+        """
         pass
     
     @abstractmethod
@@ -71,32 +337,50 @@ class BaseExtractor(ABC):
         """
         pass
     
-    def _save_dois(self, dois: List[str], output_path: Path) -> bool:
+    def _build_result(self, dois: List[str], errors: List[str],
+                      total_records: Optional[int] = None) -> ExtractionResult:
         """
-        Save DOIs to output file.
+        Deduplicate validated DOIs and build the extraction result.
         
         Args:
-            dois: List of DOI strings
-            output_path: Path to output file
+            dois: Valid, normalized DOIs in input order
+            errors: Errors collected while parsing
+            total_records: Number of records processed (if meaningful for the format)
             
         Returns:
-            True if successful, False otherwise
+            ExtractionResult for the input
         """
-        try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for doi in dois:
-                    f.write(doi.strip() + "\n")
-            self.logger.info(f"Saved {len(dois)} DOIs to {output_path}")
-            return True
-        except Exception as e:
-            self.logger.error(f"Error saving DOIs to {output_path}: {e}")
-            return False
+        if not dois:
+            self.logger.warning(f"No valid DOIs found in {self.source_format} file")
+            errors.append(f"No valid DOI entries were found in the {self.source_format} file")
+        
+        # Remove duplicates
+        unique_dois = self._remove_duplicates(dois)
+        duplicates_removed = len(dois) - len(unique_dois)
+        
+        if duplicates_removed > 0:
+            self.logger.info(f"Removed {duplicates_removed} duplicate DOIs")
+        
+        return ExtractionResult(
+            dois=unique_dois, total_found=len(dois), unique_count=len(unique_dois),
+            duplicates_removed=duplicates_removed, errors=errors,
+            source_format=self.source_format, total_records=total_records
+        )
+    
+    def _failed_result(self, error: str) -> ExtractionResult:
+        """Build an empty result for an input that could not be processed"""
+        return ExtractionResult(
+            dois=[], total_found=0, unique_count=0,
+            duplicates_removed=0, errors=[error], source_format=self.source_format
+        )
     
     def _remove_duplicates(self, dois: List[str]) -> List[str]:
         """
         Remove duplicates while preserving order.
         
+        DOIs are compared by doi_key, so spellings that differ only in case
+        count as duplicates; the first spelling is kept.
+        
         Args:
             dois: List of DOI strings
             
@@ -106,7 +390,8 @@ class BaseExtractor(ABC):
         seen = set()
         unique_dois = []
         for doi in dois:
-            if doi not in seen:
-                seen.add(doi)
+            key = doi_key(doi)
+            if key not in seen:
+                seen.add(key)
                 unique_dois.append(doi)
-        return unique_dois 
\ No newline at end of file
+        return unique_dois
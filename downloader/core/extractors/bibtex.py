@@ -2,95 +2,53 @@
 BibTeX DOI extractor
 """
 
-import re
-import json
 from pathlib import Path
-from typing import List
+from typing import Optional, TextIO
 
 from .base import BaseExtractor, ExtractionResult
-from ...utils import normalize_doi, validate_doi
+from .tokenizer import iter_bibtex_dois, looks_like_bibtex
+from ...utils import normalize_dois, open_text_input
 from ...config import get_config
 
 
 class BibtexExtractor(BaseExtractor):
     """Extract DOIs from BibTeX files"""
     
-    def extract(self, input_path: Path, output_path: Path) -> ExtractionResult:
+    source_format = "BibTeX"
+    
+    # Also take DOIs from doi.org links in url fields
+    include_urls = False
+    
+    def _scan(self, stream: TextIO, input_path: Path) -> Optional[ExtractionResult]:
         """
-        Extract DOIs from a BibTeX file.
+        Stream a BibTeX file entry by entry and extract its DOIs.
         
         Args:
-            input_path: Path to BibTeX file
-            output_path: Path to output file for DOIs
+            stream: Text stream of the BibTeX file
+            input_path: Path (or name) of the input
             
         Returns:
-            ExtractionResult with extraction details
+            ExtractionResult, or None if the content is not BibTeX
         """
         errors = []
-        dois = []
-        
-        # Validate input
-        if not self.validate_input(input_path):
-            errors.append(f"Invalid or missing BibTeX file: {input_path}")
-            return ExtractionResult(
-                dois=[], total_found=0, unique_count=0, 
-                duplicates_removed=0, errors=errors, source_format="BibTeX"
-            )
-        
-        # Read and parse BibTeX file
-        try:
-            with open(input_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-        except Exception as e:
-            self.logger.error(f"Error reading {input_path}: {e}")
-            errors.append(f"Error reading file: {e}")
-            return ExtractionResult(
-                dois=[], total_found=0, unique_count=0,
-                duplicates_removed=0, errors=errors, source_format="BibTeX"
-            )
         
-        # Extract DOIs using regex
-        # Match entries like DOI = {value} or DOI = "value"
-        doi_matches = re.findall(r'DOI\s*=\s*[{"]([^}"]+)[}"]', content, re.IGNORECASE)
+        # Sniff the format from the same handle we stream from
+        head = stream.read(1000)
+        if not self._check_content(input_path, head):
+            return None
         
-        # Process and validate DOIs
-        for doi_raw in doi_matches:
-            doi = normalize_doi(doi_raw)
-            if validate_doi(doi):
-                dois.append(doi)
-            else:
-                self.logger.warning(f"Invalid DOI format: {doi_raw}")
-                errors.append(f"Invalid DOI format: {doi_raw}")
-        
-        if not dois:
-            self.logger.warning("No valid DOIs found in BibTeX file")
-            errors.append("No valid DOI entries were found in the BibTeX file")
-        
-        # Remove duplicates
-        unique_dois = self._remove_duplicates(dois)
-        duplicates_removed = len(dois) - len(unique_dois)
-        
-        if duplicates_removed > 0:
-            self.logger.info(f"Removed {duplicates_removed} duplicate DOIs")
-        
-        # Save DOIs to output file
-        if unique_dois and not self._save_dois(unique_dois, output_path):
-            errors.append("Failed to save DOIs to output file")
-        
-        # Save extraction summary
-        self._save_summary(
-            ExtractionResult(
-                dois=unique_dois, total_found=len(dois), unique_count=len(unique_dois),
-                duplicates_removed=duplicates_removed, errors=errors, source_format="BibTeX"
-            )
+        # Find DOI fields in a single pass and normalize/validate them as they are yielded
+        raw_dois = iter_bibtex_dois(
+            stream, include_urls=self.include_urls,
+            chunk_size=get_config().extraction_chunk_size, prefix=head
         )
+        dois, invalid = normalize_dois(raw_dois)
         
-        self.logger.info(f"Extracted {len(unique_dois)} unique DOIs from {len(dois)} total DOIs in BibTeX file")
+        for doi_raw in invalid:
+            self.logger.warning(f"Invalid DOI format: {doi_raw}")
+            errors.append(f"Invalid DOI format: {doi_raw}")
         
-        return ExtractionResult(
-            dois=unique_dois, total_found=len(dois), unique_count=len(unique_dois),
-            duplicates_removed=duplicates_removed, errors=errors, source_format="BibTeX"
-        )
+        return self._build_result(dois, errors)
     
     def validate_input(self, input_path: Path) -> bool:
         """
@@ -105,36 +63,27 @@ class BibtexExtractor(BaseExtractor):
         if not input_path.exists() or not input_path.is_file():
             return False
         
-        # Check file extension
-        if input_path.suffix.lower() not in ['.bib', '.bibtex']:
-            self.logger.warning(f"File {input_path} doesn't have .bib or .bibtex extension")
-        
-        # Check if file contains BibTeX-like content
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                content = f.read(1000)  # Read first 1000 chars
-                # Look for BibTeX entry patterns
-                if '@' in content and '{' in content:
-                    return True
-                else:
-                    self.logger.warning(f"File {input_path} doesn't appear to contain BibTeX entries")
-                    return False
+            with open_text_input(input_path) as (f, name):
+                head = f.read(1000)  # Read first 1000 chars
         except Exception as e:
             self.logger.error(f"Error validating {input_path}: {e}")
             return False
+        
+        return self._check_content(input_path.with_name(name), head)
     
-    def _save_summary(self, result: ExtractionResult):
-        """Save extraction summary to JSON file"""
-        try:
-            config = get_config()
-            summary_path = config.extraction_summary_file
-            
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(result.to_dict(), f, indent=2)
-            
-            self.logger.info(f"Extraction summary saved to {summary_path}")
-        except Exception as e:
-            self.logger.error(f"Error saving extraction summary: {e}")
+    def _check_content(self, input_path: Path, head: str) -> bool:
+        """Check extension and leading content of a BibTeX file"""
+        # Check file extension
+        if input_path.suffix.lower() not in ['.bib', '.bibtex']:
+            self.logger.warning(f"File {input_path} doesn't have .bib or .bibtex extension")
+        
+        # Look for BibTeX entry patterns
+        if looks_like_bibtex(head):
+            return True
+        
+        self.logger.warning(f"File {input_path} doesn't appear to contain BibTeX entries")
+        return False
 
 
 # Convenience function for backward compatibility
@@ -151,4 +100,4 @@ def extract_dois_from_bibtex(bibtex_path: str, output_path: str) -> int:
     """
     extractor = BibtexExtractor()
     result = extractor.extract(Path(bibtex_path), Path(output_path))
-    return result.unique_count 
\ No newline at end of file
+    return result.unique_count
@@ -0,0 +1,113 @@
+"""
+Cache of extraction results keyed by content hash or file version
+"""
+
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, TYPE_CHECKING
+
+from ...config import get_config
+
+if TYPE_CHECKING:
+    from .base import ExtractionResult
+
+
+class HashingReader(io.RawIOBase):
+    """Binary reader that computes the SHA-256 of everything read through it"""
+    
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self._digest.update(data)
+        return size
+    
+    def hexdigest(self) -> str:
+        """Hex digest of the content read so far"""
+        return self._digest.hexdigest()
+    
+    def finish(self) -> str:
+        """Read the rest of the stream and return the hex digest of the whole content"""
+        while self.read(1024 * 1024):
+            pass
+        return self.hexdigest()
+
+
+class ExtractionCache:
+    """Thread-safe LRU cache of ExtractionResults keyed by extractor and content hash"""
+    
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(extractor_name: str, content_hash: str) -> str:
+        """Build the cache key for an extractor and input content"""
+        return f"{extractor_name}:{content_hash}"
+    
+    @staticmethod
+    def file_id(input_path: Path) -> str:
+        """
+        Identify the current version of a file by path, size and modification
+        time, without reading it; use in place of a content hash in make_key.
+        
+        Raises:
+            OSError: If the file cannot be accessed
+        """
+        stat = input_path.stat()
+        return f"file:{input_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def get(self, key: str) -> Optional["ExtractionResult"]:
+        """Return a copy of the cached result for key, or None on a miss"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+        # Callers may append errors to the result, never hand out the cached object
+        return copy.deepcopy(result)
+    
+    def put(self, key: str, result: "ExtractionResult"):
+        """Store a copy of result, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached results"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache instance
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get the global extraction cache (singleton pattern)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache(get_config().extraction_cache_size)
+        return _cache
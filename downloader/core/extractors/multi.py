@@ -0,0 +1,294 @@
+"""
+Multi-file DOI extraction with format detection and merged deduplication
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Type
+
+from .base import BaseExtractor, ExtractionResult, ExtractionWriter
+from .cache import ExtractionCache, get_extraction_cache
+from .bibtex import BibtexExtractor
+from .rayyan import RayyanExtractor
+from .scopus import ScopusExtractor
+from ...config import AppConfig, get_config, set_config
+from ...utils import doi_key
+
+
+EXTRACTORS: Dict[str, Type[BaseExtractor]] = {
+    "bibtex": BibtexExtractor,
+    "scopus": ScopusExtractor,
+    "rayyan": RayyanExtractor,
+}
+
+# Formats tried, in order, when a file's format is not given. Scopus exports
+# are valid BibTeX and cannot be told apart by content checks, so they are
+# detected as BibTeX unless "scopus" is requested explicitly.
+DETECTION_ORDER = ("bibtex", "rayyan")
+
+
+def detect_format(input_path: Path) -> Optional[str]:
+    """
+    Detect the export format of a (possibly compressed) file with the
+    extractors' own input validation.
+    
+    Args:
+        input_path: Path to the export file
+        
+    Returns:
+        "bibtex" or "rayyan", or None if no extractor accepts the file
+    """
+    for file_format in DETECTION_ORDER:
+        if EXTRACTORS[file_format]().validate_input(input_path):
+            return file_format
+    return None
+
+
+def _init_worker(config: AppConfig):
+    """Share the parent's configuration with pool workers"""
+    set_config(config)
+
+
+def _collect_file(file_format: str, input_path: Path) -> ExtractionResult:
+    """Run the extractor for one file (executed in a pool worker)"""
+    return EXTRACTORS[file_format]().collect(input_path)
+
+
+# Global worker pool, shared by all multi-file extractions
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for multi-file extraction (singleton pattern)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_config()
+            _pool = ProcessPoolExecutor(
+                max_workers=config.extraction_workers or os.cpu_count() or 1,
+                initializer=_init_worker, initargs=(config,)
+            )
+        return _pool
+
+
+def shutdown_extraction_pool():
+    """Shut down the global extraction pool; the next extraction starts a new one"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        if sys.version_info >= (3, 9):
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            # No cancel_futures before 3.9; queued jobs of a broken pool have failed already
+            pool.shutdown(wait=False)
+
+
+class MultiFileExtractor(ExtractionWriter):
+    """
+    Extract DOIs from many BibTeX, Scopus and Rayyan exports at once.
+    
+    Each file is parsed by the extractor for its format; this class only
+    detects formats, schedules the per-file extractions and merges the results.
+    """
+    
+    source_format = "Multi-file"
+    
+    def __init__(self, parallel_min_bytes: Optional[int] = None):
+        """
+        Args:
+            parallel_min_bytes: Total size below which files are parsed in-process
+                instead of in the extraction pool (default from config)
+        """
+        super().__init__()
+        if parallel_min_bytes is None:
+            parallel_min_bytes = get_config().extraction_parallel_min_bytes
+        self.parallel_min_bytes = parallel_min_bytes
+    
+    def extract(self, input_paths: Sequence[Path], output_path: Path,
+                formats: Optional[Sequence[Optional[str]]] = None) -> ExtractionResult:
+        """
+        Extract DOIs from several export files and save the merged list.
+        
+        Args:
+            input_paths: Paths to BibTeX, Scopus BibTeX or Rayyan CSV files
+            output_path: Path to output file for the merged DOIs
+            formats: Format of each file ("bibtex", "scopus", "rayyan"); None
+                entries (or no list) are detected
+            
+        Returns:
+            ExtractionResult with merged DOIs and a per-file breakdown in `files`
+        """
+        input_paths = [Path(p) for p in input_paths]
+        result = self.collect(input_paths, formats)
+        return self._save_result(result, output_path, ", ".join(path.name for path in input_paths))
+    
+    def collect(self, input_paths: Sequence[Path],
+                formats: Optional[Sequence[Optional[str]]] = None) -> ExtractionResult:
+        """
+        Extract DOIs from several export files, without writing output.
+        
+        Each file's format is detected unless given, files are parsed in the
+        extraction pool and the results are merged in input order with one
+        shared deduplication set.
+        
+        Args:
+            input_paths: Paths to export files
+            formats: Format of each file; None entries (or no list) are detected
+            
+        Returns:
+            ExtractionResult with merged DOIs and a per-file breakdown in `files`
+        """
+        input_paths = [Path(p) for p in input_paths]
+        formats = list(formats or [None] * len(input_paths))
+        if len(formats) != len(input_paths):
+            raise ValueError("formats must give one entry per input file")
+        
+        errors: List[str] = []
+        for index, (fmt, path) in enumerate(zip(formats, input_paths)):
+            if fmt is None:
+                formats[index] = detect_format(path)
+            elif fmt not in EXTRACTORS:
+                errors.append(f"{path.name}: Unknown format {fmt!r}")
+                formats[index] = None
+        
+        jobs = [(fmt, path) for fmt, path in zip(formats, input_paths) if fmt is not None]
+        results = self._collect_jobs(jobs)
+        
+        files: List[Dict] = []
+        merged: List[str] = []
+        seen = set()
+        total_found = 0
+        
+        result_iter = iter(results)
+        for fmt, path in zip(formats, input_paths):
+            if fmt is None:
+                self.logger.warning(f"Could not detect export format of {path.name}")
+                errors.append(f"{path.name}: Unrecognized file format")
+                files.append({"file": path.name, "format": None, "total_found": 0,
+                              "unique_count": 0, "new_dois": 0, "total_errors": 1})
+                continue
+            
+            result = next(result_iter)
+            total_found += result.total_found
+            new_dois = 0
+            for doi in result.dois:
+                key = doi_key(doi)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(doi)
+                    new_dois += 1
+            
+            errors.extend(f"{path.name}: {error}" for error in result.errors)
+            files.append({
+                "file": path.name,
+                "format": result.source_format,
+                "total_found": result.total_found,
+                "unique_count": result.unique_count,
+                "new_dois": new_dois,
+                "total_errors": len(result.errors),
+            })
+        
+        # Identify the combined input by the hashes of its parts
+        combined_hash = hashlib.sha256(
+            "".join(result.content_hash or "" for result in results).encode()
+        ).hexdigest()
+        
+        return ExtractionResult(
+            dois=merged, total_found=total_found, unique_count=len(merged),
+            duplicates_removed=total_found - len(merged), errors=errors,
+            source_format=self.source_format, files=files, content_hash=combined_hash
+        )
+    
+    def _collect_jobs(self, jobs: List[tuple]) -> List[ExtractionResult]:
+        """
+        Serve unchanged files from the extraction cache and run the rest.
+        
+        Files are looked up by version (path, size and modification time), so
+        nothing is read here; each remaining file is read once, by the
+        extractor that parses and hashes it.
+        """
+        cache = get_extraction_cache()
+        results: List[Optional[ExtractionResult]] = [None] * len(jobs)
+        pending = []
+        
+        for index, (fmt, path) in enumerate(jobs):
+            try:
+                key = ExtractionCache.make_key(EXTRACTORS[fmt].__name__, ExtractionCache.file_id(path))
+            except OSError:
+                key = None
+            cached = cache.get(key) if key else None
+            if cached is not None:
+                self.logger.info(f"Using cached extraction result for {path.name}")
+                results[index] = cached
+            else:
+                pending.append((index, fmt, path, key))
+        
+        fresh = self._run_jobs([(fmt, path) for _, fmt, path, _ in pending])
+        for (index, fmt, _, key), result in zip(pending, fresh):
+            results[index] = result
+            # Pool workers cached the result in their own process; keep it here too
+            if result.content_hash:
+                cache.put(ExtractionCache.make_key(EXTRACTORS[fmt].__name__, result.content_hash), result)
+                if key:
+                    cache.put(key, result)
+        
+        return results
+    
+    def _run_jobs(self, jobs: List[tuple]) -> List[ExtractionResult]:
+        """Run extraction jobs in the shared pool, or in-process for small batches"""
+        if len(jobs) > 1 and self._total_size(jobs) >= self.parallel_min_bytes:
+            try:
+                pool = get_extraction_pool()
+                futures = [pool.submit(_collect_file, fmt, path) for fmt, path in jobs]
+                return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError) as e:
+                self.logger.warning(f"Process pool unavailable ({e}), extracting files sequentially")
+                shutdown_extraction_pool()
+        
+        return [_collect_file(fmt, path) for fmt, path in jobs]
+    
+    @staticmethod
+    def _total_size(jobs: List[tuple]) -> int:
+        total = 0
+        for _, path in jobs:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def validate_input(self, input_path: Path) -> bool:
+        """
+        Check that an input file is in one of the supported export formats.
+        
+        Args:
+            input_path: Path to an export file
+            
+        Returns:
+            True if the format was recognized, False otherwise
+        """
+        return detect_format(input_path) is not None
+
+
+# Convenience function mirroring the single-format helpers
+def extract_dois_from_files(input_paths: Sequence[str], output_path: str) -> int:
+    """
+    Extract and merge DOIs from several export files.
+    
+    Args:
+        input_paths: Paths to BibTeX, Scopus BibTeX or Rayyan CSV files
+        output_path: Path to output file
+        
+    Returns:
+        Number of unique DOIs extracted
+    """
+    extractor = MultiFileExtractor()
+    result = extractor.extract([Path(p) for p in input_paths], Path(output_path))
+    return result.unique_count
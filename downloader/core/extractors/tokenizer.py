@@ -0,0 +1,88 @@
+"""
+Streaming BibTeX tokenizer shared by the BibTeX-based extractors
+"""
+
+import re
+from typing import Iterator, TextIO
+
+# Start of an entry ("@article{", "@inproceedings{", ...) at the beginning of a line
+_ENTRY_START = re.compile(r'^[ \t]*@', re.MULTILINE)
+
+# DOI field, or a url field pointing at a DOI resolver, matched in a single pass.
+# Group 1 holds the DOI field value, group 2 the DOI taken from the URL.
+_DOI_FIELDS = re.compile(
+    r'\b(?:doi\s*=\s*[{"]([^}"]+)[}"]'
+    r'|url\s*=\s*[{"]https?://(?:dx\.|www\.)?doi\.org/([^}"]+)[}"])',
+    re.IGNORECASE
+)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_bibtex_entries(stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        prefix: str = "") -> Iterator[str]:
+    """
+    Split a BibTeX stream into entries without reading it fully into memory.
+    
+    Only the current, incomplete entry is buffered between chunks, so memory
+    use is bounded by chunk_size plus the size of the largest entry.
+    
+    Args:
+        stream: Text stream to read from
+        chunk_size: Number of characters read per chunk
+        prefix: Text already consumed from the stream (e.g. while sniffing the format)
+        
+    Yields:
+        Raw entry text, one entry at a time
+    """
+    buffer = prefix
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        
+        # Everything before the last entry start is complete; the prefix is
+        # split along with the first chunk, and the tail once more at EOF
+        pos = 0
+        for match in _ENTRY_START.finditer(buffer, 1):
+            yield buffer[pos:match.start()]
+            pos = match.start()
+        buffer = buffer[pos:]
+        if not chunk:
+            break
+    
+    if buffer.strip():
+        yield buffer
+
+
+def iter_bibtex_dois(stream: TextIO, include_urls: bool = False,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, prefix: str = "") -> Iterator[str]:
+    """
+    Yield raw DOI values from a BibTeX stream, entry by entry.
+    
+    DOI fields are preferred; with include_urls, an entry without a DOI field
+    falls back to a doi.org link in its url field.
+    
+    Args:
+        stream: Text stream to read from
+        include_urls: Also take DOIs from doi.org url fields
+        chunk_size: Number of characters read per chunk
+        prefix: Text already consumed from the stream
+        
+    Yields:
+        Raw (un-normalized) DOI strings
+    """
+    for entry in iter_bibtex_entries(stream, chunk_size, prefix):
+        doi_values = []
+        url_values = []
+        for match in _DOI_FIELDS.finditer(entry):
+            if match.group(1) is not None:
+                doi_values.append(match.group(1))
+            elif include_urls:
+                url_values.append(match.group(2))
+        
+        yield from doi_values or url_values
+
+
+def looks_like_bibtex(head: str) -> bool:
+    """Check whether the first characters of a file look like BibTeX entries"""
+    return '@' in head and '{' in head
@@ -0,0 +1,7 @@
+"""Local lookup indexes built from bulk data snapshots"""
+
+from .arxiv import ArxivIndex, get_arxiv_index
+from .oa import OAIndex, get_oa_index
+from .pmc import PMCIndex, get_pmc_index
+
+__all__ = ["ArxivIndex", "get_arxiv_index", "OAIndex", "get_oa_index", "PMCIndex", "get_pmc_index"]
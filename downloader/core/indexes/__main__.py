@@ -0,0 +1,65 @@
+"""
+Build and inspect local lookup indexes
+
+    python -m downloader.core.indexes import oa openalex-snapshot/data/works/
+    python -m downloader.core.indexes import oa unpaywall_snapshot.jsonl.gz
+    python -m downloader.core.indexes import arxiv arxiv-metadata-oai-snapshot.json
+    python -m downloader.core.indexes import pmc PMC-ids.csv.gz oa_file_list.csv oa_non_comm_use_pdf.csv
+    python -m downloader.core.indexes stats
+    python -m downloader.core.indexes lookup 10.1000/example.2024.001
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from ...utils import setup_logging
+from .arxiv import get_arxiv_index
+from .oa import get_oa_index
+from .pmc import get_pmc_index
+
+# Index name -> (accessor, what its import command loads)
+INDEXES = {
+    "oa": (get_oa_index, "OpenAlex works or Unpaywall snapshot files (JSON Lines)"),
+    "pmc": (get_pmc_index, "PMC-ids.csv and PMC OA file lists (oa_file_list.csv, PDF lists)"),
+    "arxiv": (get_arxiv_index, "arXiv metadata snapshot (arxiv-metadata-oai-snapshot.json)"),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m downloader.core.indexes",
+                                     description="Build and inspect the local snapshot indexes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = commands.add_parser("import", help="load snapshot files into an index")
+    import_parser.add_argument("index", choices=sorted(INDEXES),
+                               help="; ".join(f"{name}: {loads}" for name, (_, loads) in INDEXES.items()))
+    import_parser.add_argument("paths", nargs="+", type=Path, help="files (.gz/.zst allowed) or directories")
+    import_parser.add_argument("--force", action="store_true", help="re-import files that were already imported")
+    
+    commands.add_parser("stats", help="show index sizes and imported files")
+    
+    lookup_parser = commands.add_parser("lookup", help="show what each index knows about DOIs")
+    lookup_parser.add_argument("dois", nargs="+")
+    
+    args = parser.parse_args(argv)
+    setup_logging()
+    
+    if args.command == "import":
+        missing = [str(path) for path in args.paths if not path.exists()]
+        if missing:
+            parser.error(f"not found: {', '.join(missing)}")
+        summary = INDEXES[args.index][0]().import_files(args.paths, force=args.force)
+        print(json.dumps(summary, indent=2))
+    elif args.command == "stats":
+        print(json.dumps({name: get_index().stats() for name, (get_index, _) in INDEXES.items()}, indent=2))
+    else:
+        for doi in args.dois:
+            found = {name: get_index().lookup(doi) for name, (get_index, _) in INDEXES.items()}
+            print(json.dumps({'doi': doi, **found}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
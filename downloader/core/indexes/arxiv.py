@@ -0,0 +1,117 @@
+"""
+Journal DOI to arXiv ID index built from the arXiv metadata snapshot
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ...config import get_config
+from ...utils import doi_key
+from .oa import MAX_TITLE_LENGTH
+from .store import SqliteIndex, iter_json_lines
+
+# (doi, arxiv_id, title, license, updated)
+ArxivRow = Tuple[str, str, Optional[str], Optional[str], str]
+
+# The dump's doi field may hold several DOIs separated by spaces, commas or semicolons
+_DOI_SEPARATOR = re.compile(r'[\s,;]+')
+
+
+def parse_record(record: Dict[str, Any]) -> Iterator[ArxivRow]:
+    """Index rows for one arXiv metadata record, one per journal DOI it lists"""
+    arxiv_id = (record.get('id') or '').strip()
+    if not arxiv_id:
+        return
+    title = ' '.join((record.get('title') or '').split())[:MAX_TITLE_LENGTH] or None
+    updated = record.get('update_date') or ''
+    for value in _DOI_SEPARATOR.split(record.get('doi') or ''):
+        doi = doi_key(value)
+        if doi.startswith('10.'):
+            yield (doi, arxiv_id, title, record.get('license'), updated)
+
+
+class ArxivIndex(SqliteIndex):
+    """
+    Local journal DOI to arXiv preprint lookup.
+    
+    Imports the arXiv metadata snapshot (arxiv-metadata-oai-snapshot.json,
+    one JSON record per line). When several preprints list the same DOI,
+    the most recently updated one wins.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS arxiv_ids (
+            doi TEXT PRIMARY KEY,
+            arxiv_id TEXT NOT NULL,
+            title TEXT,
+            license TEXT,
+            updated TEXT
+        ) WITHOUT ROWID;
+    """
+    
+    def _import_file(self, connection: sqlite3.Connection, path: Path) -> int:
+        return self._write_batches(connection, self._rows(path), self._write)
+    
+    @staticmethod
+    def _rows(path: Path) -> Iterator[ArxivRow]:
+        for record in iter_json_lines(path):
+            yield from parse_record(record)
+    
+    @staticmethod
+    def _write(connection: sqlite3.Connection, batch):
+        connection.executemany("""
+            INSERT INTO arxiv_ids (doi, arxiv_id, title, license, updated) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(doi) DO UPDATE SET
+                arxiv_id = excluded.arxiv_id, title = excluded.title, license = excluded.license,
+                updated = excluded.updated
+            WHERE excluded.updated >= arxiv_ids.updated
+        """, batch)
+    
+    def lookup(self, doi: str) -> Optional[Dict[str, Any]]:
+        """
+        arXiv preprint of a journal DOI.
+        
+        Returns:
+            Dict with arxiv_id, title, license and updated, or None if the DOI
+            is not in the index (or no index has been built)
+        """
+        connection = self._connection()
+        if connection is None:
+            return None
+        row = connection.execute(
+            "SELECT arxiv_id, title, license, updated FROM arxiv_ids WHERE doi = ?",
+            (doi_key(doi),)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('arxiv_id', 'title', 'license', 'updated'), row))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Row counts and the imported files"""
+        connection = self._connection()
+        if connection is None:
+            return {'path': str(self.path), 'exists': False, 'dois': 0}
+        return {
+            'path': str(self.path),
+            'exists': True,
+            'dois': connection.execute("SELECT COUNT(*) FROM arxiv_ids").fetchone()[0],
+            'preprints': connection.execute("SELECT COUNT(DISTINCT arxiv_id) FROM arxiv_ids").fetchone()[0],
+            'imports': self.imports(),
+        }
+
+
+# Global arXiv index shared by downloader instances
+_arxiv_index: Optional[ArxivIndex] = None
+_arxiv_index_lock = threading.Lock()
+
+
+def get_arxiv_index() -> ArxivIndex:
+    """Get the process-wide arXiv metadata index"""
+    global _arxiv_index
+    with _arxiv_index_lock:
+        if _arxiv_index is None:
+            _arxiv_index = ArxivIndex(get_config().arxiv_index_file)
+        return _arxiv_index
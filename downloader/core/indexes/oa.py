@@ -0,0 +1,173 @@
+"""
+DOI to open-access PDF URL index built from OpenAlex or Unpaywall snapshots
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ...config import get_config
+from ...utils import doi_key
+from .store import SqliteIndex, iter_json_lines
+
+# (doi, url, license, host_type, version, title, origin, updated); url is None for closed papers
+OARow = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], str, str]
+
+# Keys of the location dicts returned by lookups (the row without its DOI)
+LOCATION_FIELDS = ('url', 'license', 'host_type', 'version', 'title', 'origin', 'updated')
+
+MAX_TITLE_LENGTH = 100  # titles are only kept for file names
+
+
+def _openalex_location(work: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Best OA location of an OpenAlex work that has a PDF URL"""
+    best = work.get('best_oa_location') or {}
+    if best.get('pdf_url'):
+        return best
+    for location in work.get('locations') or []:
+        if location and location.get('is_oa') and location.get('pdf_url'):
+            return location
+    return None
+
+
+def _unpaywall_location(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Best OA location of an Unpaywall record that has a PDF URL"""
+    best = record.get('best_oa_location') or {}
+    if best.get('url_for_pdf'):
+        return best
+    for location in record.get('oa_locations') or []:
+        if location and location.get('url_for_pdf'):
+            return location
+    return None
+
+
+def parse_record(record: Dict[str, Any]) -> Optional[OARow]:
+    """
+    Convert one OpenAlex work or Unpaywall record into an index row.
+    
+    The format is detected per record: OpenAlex works have 'locations',
+    Unpaywall records have 'oa_locations'.
+    
+    Returns:
+        Index row, or None if the record has no DOI
+    """
+    doi = doi_key(record.get('doi') or '')
+    if not doi:
+        return None
+    title = (record.get('title') or record.get('display_name') or '')[:MAX_TITLE_LENGTH] or None
+    
+    if 'oa_locations' in record:
+        location = _unpaywall_location(record)
+        updated = record.get('updated') or ''
+        if location is None:
+            return (doi, None, None, None, None, title, "Unpaywall", updated)
+        return (doi, location['url_for_pdf'], location.get('license'), location.get('host_type'),
+                location.get('version'), title, "Unpaywall", updated)
+    
+    location = _openalex_location(record)
+    updated = record.get('updated_date') or ''
+    if location is None:
+        return (doi, None, None, None, None, title, "OpenAlex", updated)
+    source_type = (location.get('source') or {}).get('type')
+    host_type = "repository" if source_type == "repository" else "publisher"
+    return (doi, location['pdf_url'], location.get('license'), host_type,
+            location.get('version'), title, "OpenAlex", updated)
+
+
+class OAIndex(SqliteIndex):
+    """
+    Local DOI to best OA PDF URL lookup.
+    
+    Only papers with a PDF URL are stored. Imports are incremental: a row is
+    replaced only by a record with the same or a newer update date, and a
+    newer record without an OA PDF removes the DOI.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS oa_locations (
+            doi TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            license TEXT,
+            host_type TEXT,
+            version TEXT,
+            title TEXT,
+            origin TEXT,
+            updated TEXT
+        ) WITHOUT ROWID;
+    """
+    
+    def _import_file(self, connection: sqlite3.Connection, path: Path) -> int:
+        return self._write_batches(connection, self._rows(path), self._write)
+    
+    @staticmethod
+    def _rows(path: Path) -> Iterator[OARow]:
+        for record in iter_json_lines(path):
+            row = parse_record(record)
+            if row is not None:
+                yield row
+    
+    @staticmethod
+    def _write(connection: sqlite3.Connection, batch):
+        connection.executemany("""
+            INSERT INTO oa_locations (doi, url, license, host_type, version, title, origin, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(doi) DO UPDATE SET
+                url = excluded.url, license = excluded.license, host_type = excluded.host_type,
+                version = excluded.version, title = excluded.title, origin = excluded.origin,
+                updated = excluded.updated
+            WHERE excluded.updated >= oa_locations.updated
+        """, [row for row in batch if row[1]])
+        connection.executemany(
+            "DELETE FROM oa_locations WHERE doi = ? AND updated <= ?",
+            [(row[0], row[7]) for row in batch if not row[1]]
+        )
+    
+    def lookup(self, doi: str) -> Optional[Dict[str, Any]]:
+        """
+        Best OA PDF location for a DOI.
+        
+        Returns:
+            Dict with url, license, host_type, version, title, origin and updated,
+            or None if the DOI is not in the index (or no index has been built)
+        """
+        connection = self._connection()
+        if connection is None:
+            return None
+        row = connection.execute(
+            "SELECT url, license, host_type, version, title, origin, updated FROM oa_locations WHERE doi = ?",
+            (doi_key(doi),)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(LOCATION_FIELDS, row))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Row counts by origin and host type, and the imported files"""
+        connection = self._connection()
+        if connection is None:
+            return {'path': str(self.path), 'exists': False, 'dois': 0}
+        by_origin = dict(connection.execute("SELECT origin, COUNT(*) FROM oa_locations GROUP BY origin").fetchall())
+        by_host = dict(connection.execute("SELECT host_type, COUNT(*) FROM oa_locations GROUP BY host_type").fetchall())
+        return {
+            'path': str(self.path),
+            'exists': True,
+            'dois': sum(by_origin.values()),
+            'by_origin': by_origin,
+            'by_host_type': by_host,
+            'imports': self.imports(),
+        }
+
+
+# Global OA index shared by downloader instances
+_oa_index: Optional[OAIndex] = None
+_oa_index_lock = threading.Lock()
+
+
+def get_oa_index() -> OAIndex:
+    """Get the process-wide OA snapshot index"""
+    global _oa_index
+    with _oa_index_lock:
+        if _oa_index is None:
+            _oa_index = OAIndex(get_config().oa_index_file)
+        return _oa_index
@@ -0,0 +1,200 @@
+"""
+PubMed Central Open Access index built from the PMC OA file lists and PMC-ids.csv
+"""
+
+import csv
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ...config import get_config
+from ...utils import doi_key, get_logger, open_text_input
+from .store import SqliteIndex
+
+logger = get_logger(__name__)
+
+_PMCID = re.compile(r'^PMC\d+$')
+
+
+def _pmcid(value: str) -> Optional[str]:
+    value = (value or '').strip().upper()
+    if value.isdigit():
+        value = f"PMC{value}"
+    return value if _PMCID.match(value) else None
+
+
+def _pmid(value: str) -> Optional[str]:
+    value = (value or '').strip()
+    if value.upper().startswith('PMID:'):
+        value = value[5:]
+    return value if value.isdigit() else None
+
+
+def _iter_rows(path: Path) -> Iterator[List[str]]:
+    """
+    Rows of a PMC list file.
+    
+    Handles the CSV lists (header row first) and the older tab-separated .txt
+    lists, whose first line is a timestamp instead of a header.
+    """
+    with open_text_input(path, errors='replace') as (stream, _):
+        first = stream.readline()
+        if '\t' in first or (',' not in first and not first.strip().startswith('File')):
+            # Tab-separated list; the first line is usually the list's timestamp
+            if '\t' in first:
+                yield first.rstrip('\n').split('\t')
+            for line in stream:
+                if line.strip():
+                    yield line.rstrip('\n').split('\t')
+            return
+        yield next(csv.reader([first]))
+        yield from csv.reader(stream)
+
+
+class PMCIndex(SqliteIndex):
+    """
+    Local DOI to PMC Open Access files lookup.
+    
+    Two kinds of NCBI files are imported and detected from their columns:
+    PMC-ids.csv (DOI, PMCID, PMID) and the OA file lists (oa_file_list.csv
+    for packages, oa_non_comm_use_pdf/oa_comm_use_pdf lists for PDFs), which
+    give each PMCID's file paths on the PMC FTP server and its license.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pmc_ids (
+            doi TEXT PRIMARY KEY,
+            pmcid TEXT NOT NULL,
+            pmid TEXT
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS pmc_files (
+            pmcid TEXT PRIMARY KEY,
+            pmid TEXT,
+            package TEXT,
+            pdf TEXT,
+            license TEXT,
+            updated TEXT
+        ) WITHOUT ROWID;
+    """
+    
+    def _import_file(self, connection: sqlite3.Connection, path: Path) -> int:
+        rows = _iter_rows(path)
+        header = next(rows, None)
+        if header is None:
+            return 0
+        columns = {name.strip().lower(): i for i, name in enumerate(header)}
+        
+        if 'doi' in columns and 'pmcid' in columns:
+            return self._write_batches(connection, self._id_rows(rows, columns), self._write_ids)
+        if 'accession id' in columns or 'file' in columns:
+            return self._write_batches(connection, self._file_rows(rows, columns), self._write_files)
+        if header and header[0].startswith(('oa_package/', 'oa_pdf/')):
+            # Headerless tab-separated list: File, Citation, PMCID, PMID, License
+            columns = {'file': 0, 'accession id': 2, 'pmid': 3, 'license': 4}
+            rows = iter([header, *rows])
+            return self._write_batches(connection, self._file_rows(rows, columns), self._write_files)
+        
+        logger.warning(f"{path.name}: not a PMC-ids or PMC OA file list, skipped")
+        return 0
+    
+    @staticmethod
+    def _id_rows(rows: Iterator[List[str]], columns: Dict[str, int]) -> Iterator[Tuple]:
+        doi_col, pmcid_col, pmid_col = columns['doi'], columns['pmcid'], columns.get('pmid')
+        for row in rows:
+            if len(row) <= max(doi_col, pmcid_col):
+                continue
+            doi = doi_key(row[doi_col])
+            pmcid = _pmcid(row[pmcid_col])
+            if doi and pmcid:
+                pmid = _pmid(row[pmid_col]) if pmid_col is not None and pmid_col < len(row) else None
+                yield (doi, pmcid, pmid)
+    
+    @staticmethod
+    def _file_rows(rows: Iterator[List[str]], columns: Dict[str, int]) -> Iterator[Tuple]:
+        def column(row: List[str], name: Optional[str]) -> str:
+            index = columns.get(name)
+            return row[index].strip() if index is not None and index < len(row) else ''
+        
+        # NCBI names the column with its format, e.g. "Last Updated (YYYY-MM-DD HH:MM:SS)"
+        updated = next((name for name in columns if name.startswith('last updated')), None)
+        
+        for row in rows:
+            pmcid = _pmcid(column(row, 'accession id'))
+            file_path = column(row, 'file')
+            if not pmcid or not file_path:
+                continue
+            is_pdf = file_path.lower().endswith('.pdf')
+            yield (pmcid, _pmid(column(row, 'pmid')), None if is_pdf else file_path,
+                   file_path if is_pdf else None, column(row, 'license') or None,
+                   column(row, updated) or None)
+    
+    @staticmethod
+    def _write_ids(connection: sqlite3.Connection, batch):
+        connection.executemany("INSERT OR REPLACE INTO pmc_ids (doi, pmcid, pmid) VALUES (?, ?, ?)", batch)
+    
+    @staticmethod
+    def _write_files(connection: sqlite3.Connection, batch):
+        # Package and PDF lists are separate files, so keep whichever path the other one set
+        connection.executemany("""
+            INSERT INTO pmc_files (pmcid, pmid, package, pdf, license, updated) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(pmcid) DO UPDATE SET
+                pmid = COALESCE(excluded.pmid, pmid),
+                package = COALESCE(excluded.package, package),
+                pdf = COALESCE(excluded.pdf, pdf),
+                license = COALESCE(excluded.license, license),
+                updated = COALESCE(excluded.updated, updated)
+        """, batch)
+    
+    def lookup(self, doi: str) -> Optional[Dict[str, Any]]:
+        """
+        PMC Open Access record for a DOI.
+        
+        Returns:
+            Dict with pmcid, pmid, package and pdf (paths relative to the PMC FTP
+            root, or None), license and updated; None if the DOI has no PMCID in
+            the index or its article is not in the OA subset
+        """
+        connection = self._connection()
+        if connection is None:
+            return None
+        row = connection.execute("""
+            SELECT ids.pmcid, COALESCE(files.pmid, ids.pmid), files.package, files.pdf, files.license, files.updated
+            FROM pmc_ids AS ids JOIN pmc_files AS files ON files.pmcid = ids.pmcid
+            WHERE ids.doi = ?
+        """, (doi_key(doi),)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('pmcid', 'pmid', 'package', 'pdf', 'license', 'updated'), row))
+    
+    def stats(self) -> Dict[str, Any]:
+        connection = self._connection()
+        if connection is None:
+            return {'path': str(self.path), 'exists': False}
+        
+        def count(sql: str) -> int:
+            return connection.execute(sql).fetchone()[0]
+        
+        return {
+            'path': str(self.path),
+            'exists': True,
+            'dois': count("SELECT COUNT(*) FROM pmc_ids"),
+            'oa_articles': count("SELECT COUNT(*) FROM pmc_files"),
+            'with_pdf': count("SELECT COUNT(*) FROM pmc_files WHERE pdf IS NOT NULL"),
+            'imports': self.imports(),
+        }
+
+
+# Global PMC index shared by downloader instances
+_pmc_index: Optional[PMCIndex] = None
+_pmc_index_lock = threading.Lock()
+
+
+def get_pmc_index() -> PMCIndex:
+    """Get the process-wide PMC Open Access index"""
+    global _pmc_index
+    with _pmc_index_lock:
+        if _pmc_index is None:
+            _pmc_index = PMCIndex(get_config().pmc_index_file)
+        return _pmc_index
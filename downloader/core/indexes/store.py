@@ -0,0 +1,176 @@
+"""
+Shared SQLite plumbing for local lookup indexes
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ...utils import get_logger, open_text_input
+
+logger = get_logger(__name__)
+
+# Rows written per transaction while importing
+BATCH_SIZE = 10000
+
+
+def iter_snapshot_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """
+    Expand snapshot paths into the data files to import.
+    
+    Directories are searched recursively (OpenAlex snapshots are partitioned
+    into updated_date=... folders); manifests and hidden files are skipped.
+    """
+    for path in paths:
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and not child.name.startswith(".") and "manifest" not in child.name.lower():
+                    yield child
+        else:
+            yield path
+
+
+def iter_json_lines(path: Path) -> Iterator[Dict[str, Any]]:
+    """Records of a (possibly gzip/zstd compressed) JSON Lines file; bad lines are logged and skipped"""
+    with open_text_input(path, errors='replace') as (stream, _):
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"{path.name}:{line_number}: skipping invalid JSON line")
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+class SqliteIndex(ABC):
+    """
+    Base class for read-mostly SQLite indexes under the data directory.
+    
+    Readers get one connection per thread. Each imported file is recorded
+    with its size and modification time so re-running an import only loads
+    new or changed files.
+    
+    Subclasses define SCHEMA (executed on first write) and _import_file.
+    """
+    
+    SCHEMA = ""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+    
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection, or None if the index has not been built yet"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if not self.path.exists():
+                return None
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._local.connection = connection
+        return connection
+    
+    def _open_for_write(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path))
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(self.SCHEMA + """
+            CREATE TABLE IF NOT EXISTS imports (
+                file TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                records INTEGER,
+                imported_at REAL
+            );
+        """)
+        return connection
+    
+    @staticmethod
+    def _already_imported(connection: sqlite3.Connection, path: Path) -> bool:
+        stat = path.stat()
+        row = connection.execute(
+            "SELECT size, mtime FROM imports WHERE file = ?", (str(path.resolve()),)
+        ).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime
+    
+    @staticmethod
+    def _mark_imported(connection: sqlite3.Connection, path: Path, records: int):
+        stat = path.stat()
+        connection.execute(
+            "INSERT OR REPLACE INTO imports (file, size, mtime, records, imported_at) VALUES (?, ?, ?, ?, ?)",
+            (str(path.resolve()), stat.st_size, stat.st_mtime, records, time.time())
+        )
+    
+    def import_files(self, paths: Iterable[Path], force: bool = False) -> Dict[str, Any]:
+        """
+        Load snapshot files into the index.
+        
+        Args:
+            paths: Snapshot files or directories
+            force: Re-import files that were imported before and have not changed
+        
+        Returns:
+            Counts of files imported/skipped and records read
+        """
+        summary = {'files_imported': 0, 'files_skipped': 0, 'records': 0}
+        with self._write_lock:
+            connection = self._open_for_write()
+            try:
+                for path in iter_snapshot_files(paths):
+                    if self._is_own_file(path):
+                        continue
+                    if not force and self._already_imported(connection, path):
+                        summary['files_skipped'] += 1
+                        continue
+                    started = time.perf_counter()
+                    records = self._import_file(connection, path)
+                    self._mark_imported(connection, path, records)
+                    connection.commit()
+                    summary['files_imported'] += 1
+                    summary['records'] += records
+                    logger.info(f"Imported {records} records from {path.name} in {time.perf_counter() - started:.1f}s")
+            finally:
+                connection.close()
+        return summary
+    
+    def _is_own_file(self, path: Path) -> bool:
+        """Whether a path is the index database or its WAL/shared-memory file"""
+        path = path.resolve()
+        return path.parent == self.path.resolve().parent and path.name.startswith(self.path.name)
+    
+    @abstractmethod
+    def _import_file(self, connection: sqlite3.Connection, path: Path) -> int:
+        """Import one file inside the caller's transaction; returns records read"""
+        pass
+    
+    def _write_batches(self, connection: sqlite3.Connection, rows: Iterable[Any], write) -> int:
+        """Call write(connection, batch) for every BATCH_SIZE rows; returns the number of rows"""
+        count = 0
+        batch: List[Any] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                write(connection, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            write(connection, batch)
+            count += len(batch)
+        return count
+    
+    def imports(self) -> List[Dict[str, Any]]:
+        """Files imported so far"""
+        connection = self._connection()
+        if connection is None:
+            return []
+        rows = connection.execute("SELECT file, size, records, imported_at FROM imports ORDER BY imported_at").fetchall()
+        return [{'file': r[0], 'size': r[1], 'records': r[2], 'imported_at': r[3]} for r in rows]
@@ -1,6 +1,8 @@
 """Utility functions and classes for Science Downloader"""
 
-from .logging import get_logger, setup_logging
-from .validation import validate_doi, validate_file_path, sanitize_filename, normalize_doi
+from .logging import get_logger, setup_logging, shutdown_logging
+from .metrics import get_metrics
+from .validation import validate_doi, validate_file_path, sanitize_filename, normalize_doi, normalize_dois, doi_key
+from .streams import open_decompressed, open_text_input
 
-__all__ = ["get_logger", "setup_logging", "validate_doi", "validate_file_path", "sanitize_filename", "normalize_doi"] 
\ No newline at end of file
+__all__ = ["get_logger", "setup_logging", "shutdown_logging", "get_metrics", "validate_doi", "validate_file_path", "sanitize_filename", "normalize_doi", "normalize_dois", "doi_key", "open_decompressed", "open_text_input"] 
\ No newline at end of file
@@ -2,15 +2,216 @@
 Modern logging configuration for Science Downloader
 """
 
+import atexit
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from ..config import get_config
 
 
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of records below WARNING; warnings and errors always pass"""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+# Shared output handlers, the queue feeding them, its background listener and
+# the sampling filter every logger carries
+_handlers: Optional[List[logging.Handler]] = None
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_sampler: Optional[SamplingFilter] = None
+_handlers_lock = threading.Lock()
+
+
+def _create_handlers(config) -> List[logging.Handler]:
+    """Create the console and rotating file handlers shared by all loggers"""
+    if config.log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+    
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    if config.debug:
+        console_handler.setLevel(logging.DEBUG)
+    else:
+        console_handler.setLevel(logging.INFO)
+    handlers = [console_handler]
+    
+    # File handler (with rotation)
+    try:
+        file_handler = RotatingFileHandler(
+            config.log_file,
+            maxBytes=config.log_max_bytes,
+            backupCount=config.log_backup_count,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(logging.DEBUG)  # File gets all messages
+        handlers.append(file_handler)
+    except (PermissionError, OSError) as e:
+        # If we can't write to log file, just use console
+        console_handler.handle(logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Could not create log file {config.log_file}: {e}",
+        }))
+    
+    return handlers
+
+
+def _get_logger_handlers() -> List[logging.Handler]:
+    """
+    Get the handlers to attach to a logger, creating them on first use.
+    
+    With log_async enabled every logger gets the same QueueHandler, and a
+    single background QueueListener formats records and writes them to the
+    console and log file, so callers never block on handler I/O or locks.
+    """
+    global _handlers, _queue_handler, _listener, _sampler
+    
+    with _handlers_lock:
+        if _handlers is None:
+            config = get_config()
+            _handlers = _create_handlers(config)
+            
+            if config.log_async:
+                log_queue: queue.SimpleQueue = queue.SimpleQueue()
+                _queue_handler = QueueHandler(log_queue)
+                _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+                _listener.start()
+            
+            # Sampled on the logger so the console and the file keep the same records
+            _sampler = SamplingFilter(config.log_sample_rate) if config.log_sample_rate < 1.0 else None
+        
+        return [_queue_handler] if _queue_handler else list(_handlers)
+
+
+def _bind(logger: logging.Logger, handlers: List[logging.Handler]):
+    for handler in handlers:
+        logger.addHandler(handler)
+    if _sampler is not None:
+        logger.addFilter(_sampler)
+
+
+def _unbind_all(handlers: List[logging.Handler], sampler: Optional[SamplingFilter]) -> List[logging.Logger]:
+    """Detach handlers and sampler from every logger using them; returns those loggers"""
+    bound = []
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and any(h in handlers for h in logger.handlers):
+            for handler in handlers:
+                logger.removeHandler(handler)
+            if sampler is not None:
+                logger.removeFilter(sampler)
+            bound.append(logger)
+    return bound
+
+
+def _switch_to_sync():
+    """
+    Bind loggers to the output handlers directly instead of the queue.
+    
+    Called once the listener is gone, so nothing is left to drain the queue
+    and records put on it would be lost.
+    """
+    global _queue_handler, _listener
+    
+    if _queue_handler is None:
+        return
+    for logger in _unbind_all([_queue_handler], None):
+        for handler in _handlers or []:
+            logger.addHandler(handler)
+    _queue_handler = _listener = None
+
+
+def _reset_handlers() -> List[logging.Logger]:
+    """Stop and detach the shared handlers so the next use rebuilds them; returns the loggers that had them"""
+    global _handlers, _queue_handler, _listener, _sampler
+    
+    with _handlers_lock:
+        if _handlers is None:
+            return []
+        if _listener is not None:
+            _listener.stop()
+        in_use = [_queue_handler] if _queue_handler else list(_handlers)
+        loggers = _unbind_all(in_use, _sampler)
+        for handler in _handlers:
+            handler.close()
+        _handlers = _queue_handler = _listener = _sampler = None
+    return loggers
+
+
+def _after_fork_in_child():
+    """
+    Make inherited logging usable in a forked child, e.g. a pool worker.
+    
+    The child gets the parent's QueueHandler but not its listener thread, so
+    records queued there would never be written. Workers log synchronously.
+    """
+    global _handlers_lock
+    
+    _handlers_lock = threading.Lock()
+    _switch_to_sync()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener.
+    
+    Loggers holding the QueueHandler are rebound to the output handlers, so
+    anything logged afterwards is still written, synchronously.
+    """
+    with _handlers_lock:
+        if _listener is not None:
+            _listener.stop()
+        _switch_to_sync()
+        for handler in _handlers or []:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str = "downloader") -> logging.Logger:
     """
     Get a configured logger instance.
@@ -33,35 +234,7 @@ def get_logger(name: str = "downloader") -> logging.Logger:
         else:
             logger.setLevel(logging.INFO)
         
-        # Create formatter
-        formatter = logging.Formatter(
-            "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        if config.debug:
-            console_handler.setLevel(logging.DEBUG)
-        else:
-            console_handler.setLevel(logging.INFO)
-        logger.addHandler(console_handler)
-        
-        # File handler (with rotation)
-        try:
-            file_handler = RotatingFileHandler(
-                config.log_file,
-                maxBytes=config.log_max_bytes,
-                backupCount=config.log_backup_count,
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(formatter)
-            file_handler.setLevel(logging.DEBUG)  # File gets all messages
-            logger.addHandler(file_handler)
-        except (PermissionError, OSError) as e:
-            # If we can't write to log file, just use console
-            logger.warning(f"Could not create log file {config.log_file}: {e}")
+        _bind(logger, _get_logger_handlers())
         
         # Prevent propagation to root logger
         logger.propagate = False
@@ -87,5 +260,15 @@ def setup_logging(debug: bool = False, log_file: Optional[Path] = None):
         config.logs_dir = log_file.parent
         config.logs_dir.mkdir(parents=True, exist_ok=True)
     
+    # Module loggers created at import time share handlers built from the
+    # settings of that moment; rebuild them so these settings take effect
+    rebound = _reset_handlers()
+    if rebound:
+        new_handlers = _get_logger_handlers()
+        level = logging.DEBUG if config.debug else logging.INFO
+        for logger in rebound:
+            _bind(logger, new_handlers)
+            logger.setLevel(level)
+    
     # Get the root application logger to ensure it's configured
     get_logger() 
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Stream helpers for reading (optionally compressed) uploads and input files
+"""
+
+import gzip
+import io
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, TextIO, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: pip install zstandard
+    zstandard = None
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Spool non-seekable zip uploads in memory up to this size before using disk
+_ZIP_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class PrefixedStream(io.RawIOBase):
+    """Binary stream that replays already-consumed leading bytes before the rest"""
+    
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        return size
+
+
+class ArchiveMemberStream(io.RawIOBase):
+    """Binary stream of a zip member that also closes its archive (and spool file) when closed"""
+    
+    def __init__(self, member: BinaryIO, archive: zipfile.ZipFile, spool: Optional[BinaryIO] = None):
+        self._member = member
+        self._archive = archive
+        self._spool = spool
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        return self._member.readinto(buffer)
+    
+    def close(self):
+        if not self.closed:
+            try:
+                self._member.close()
+                self._archive.close()
+            finally:
+                if self._spool is not None:
+                    self._spool.close()
+        super().close()
+
+
+def _strip_suffix(name: str, suffixes: Tuple[str, ...]) -> str:
+    """Remove a compression suffix from a file name"""
+    for suffix in suffixes:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _is_seekable(stream: BinaryIO) -> bool:
+    """Check whether a stream supports seek/tell"""
+    try:
+        return stream.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+def open_decompressed(stream: BinaryIO, name: str = "") -> Tuple[BinaryIO, str]:
+    """
+    Wrap a binary stream so that compressed content is decompressed on the fly.
+    
+    gzip, zstd and zip are detected from the leading magic bytes, not the file
+    name. gzip and zstd are decompressed while they are read; zip archives need
+    random access, so non-seekable zip streams are spooled first. The first
+    file member of a zip archive is returned.
+    
+    The caller owns the returned stream and must close it; for zip input,
+    closing it also closes the archive and the spool file.
+    
+    Args:
+        stream: Readable binary stream (file, upload or request body)
+        name: Original file name, used to derive the name of the decompressed content
+        
+    Returns:
+        Tuple of (binary stream of the decompressed content, content name)
+    """
+    if _is_seekable(stream):
+        start = stream.tell()
+        head = stream.read(4)
+        stream.seek(start)
+        source = stream
+    else:
+        head = stream.read(4)
+        source = io.BufferedReader(PrefixedStream(head, stream))
+    
+    if head.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=source, mode='rb'), _strip_suffix(name, ('.gz', '.gzip'))
+    
+    if head.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError(f"{name or 'Input'} is zstd-compressed; install the 'zstandard' package to read it")
+        reader = zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True)
+        return io.BufferedReader(reader), _strip_suffix(name, ('.zst', '.zstd'))
+    
+    if head.startswith(ZIP_MAGIC):
+        spool = None
+        if not _is_seekable(source):
+            spool = tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_SIZE)
+            shutil.copyfileobj(source, spool)
+            spool.seek(0)
+            source = spool
+        try:
+            archive = zipfile.ZipFile(source)
+        except BaseException:
+            if spool is not None:
+                spool.close()
+            raise
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if not members:
+            archive.close()
+            if spool is not None:
+                spool.close()
+            raise ValueError(f"Zip archive {name} contains no files")
+        member = ArchiveMemberStream(archive.open(members[0]), archive, spool)
+        return io.BufferedReader(member), members[0].filename.rsplit('/', 1)[-1]
+    
+    return source, name
+
+
+@contextmanager
+def open_text_input(input_path: Path, encoding: str = 'utf-8',
+                    errors: str = 'strict') -> Iterator[Tuple[TextIO, str]]:
+    """
+    Open a possibly compressed input file for streaming text reads.
+    
+    Usage:
+        with open_text_input(path) as (stream, name):
+            for line in stream: ...
+    
+    Args:
+        input_path: Path to a plain, gzip, zstd or zip file
+        encoding: Text encoding of the (decompressed) content
+        errors: Decoding error handling, as for open()
+        
+    Yields:
+        Tuple of (text stream, name of the decompressed content)
+    """
+    with open(input_path, 'rb') as raw:
+        stream, name = open_decompressed(raw, input_path.name)
+        with io.TextIOWrapper(stream, encoding=encoding, errors=errors) as text:
+            yield text, name
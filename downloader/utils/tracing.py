@@ -0,0 +1,187 @@
+"""
+Lightweight span tracing for download jobs, exported as JSON lines or Chrome trace
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Span:
+    """A timed operation inside a trace"""
+    
+    __slots__ = ("span_id", "parent_id", "name", "category", "start", "end", "thread", "attrs")
+    
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, category: str, attrs: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.thread = threading.get_ident()
+        self.attrs = attrs
+    
+    def set(self, **attrs):
+        """Attach or update attributes on the span"""
+        self.attrs.update(attrs)
+    
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "category": self.category,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects nested spans for one download job.
+    
+    Spans nest per thread: a span opened while another is active on the same
+    thread becomes its child. Work handed to another thread passes its parent
+    explicitly (see current() and the parent argument), and spans that outlive
+    a block, such as a DOI moving between pipeline stages, use start()/finish().
+    A disabled tracer still yields spans so callers can set attributes
+    unconditionally, but records nothing.
+    """
+    
+    def __init__(self, enabled: bool = True, max_spans: int = 100_000):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.dropped = 0
+        self._spans: List[Span] = []
+        self._ids = count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def span(self, name: str, category: str = "default", parent: Optional[Span] = None,
+             **attrs) -> Iterator[Span]:
+        """
+        Time a block of work as a span.
+        
+        Args:
+            name: Span name shown in trace viewers
+            category: Span category (doi, resolve, fetch, source, http, sleep, io)
+            parent: Parent span; defaults to the span active on this thread
+            **attrs: Initial span attributes
+        
+        Yields:
+            The open span, for attaching attributes such as status codes
+        """
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1]
+        span = Span(next(self._ids), parent.span_id if parent else None, name, category, attrs)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.time()
+            stack.pop()
+            self._record(span)
+    
+    def start(self, name: str, category: str = "default", parent: Optional[Span] = None,
+              **attrs) -> Span:
+        """
+        Open a span that is not tied to a block or thread; close it with finish().
+        
+        The span does not become the active span of any thread, so spans
+        nested in it must pass it as their parent.
+        """
+        if parent is None:
+            parent = self.current()
+        return Span(next(self._ids), parent.span_id if parent else None, name, category, attrs)
+    
+    def finish(self, span: Span, **attrs):
+        """Close and record a span opened with start()"""
+        span.set(**attrs)
+        span.end = time.time()
+        self._record(span)
+    
+    def current(self) -> Optional[Span]:
+        """The span active on this thread, to pass as parent to work on other threads"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+    
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+    
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def _record(self, span: Span):
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped += 1
+    
+    def export_jsonl(self, path: Path) -> Path:
+        """
+        Write one JSON object per span, ordered by start time.
+        
+        Args:
+            path: Destination file
+        
+        Returns:
+            The written path
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in sorted(self.spans(), key=lambda s: s.start):
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        return path
+    
+    def export_chrome(self, path: Path) -> Path:
+        """
+        Write spans in the Chrome trace event format (chrome://tracing, Perfetto).
+        
+        Args:
+            path: Destination file
+        
+        Returns:
+            The written path
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": int(span.start * 1_000_000),
+                "dur": int(span.duration * 1_000_000),
+                "pid": pid,
+                "tid": span.thread,
+                "args": span.attrs,
+            }
+            for span in sorted(self.spans(), key=lambda s: s.start)
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
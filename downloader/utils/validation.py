@@ -3,8 +3,10 @@ Validation utilities for Science Downloader
 """
 
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Callable, Iterable, List, Optional, Pattern, Tuple, Union
+from urllib.parse import unquote
 
 from ..config import get_config
 
@@ -39,6 +41,33 @@ def sanitize_filename(filename: str) -> str:
     return sanitized
 
 
+# Resolver and scheme prefixes stripped by normalize_doi, matched in one pass:
+# "doi:", "DOI: ", "info:doi/", "urn:doi:", "https://doi.org/", "http://dx.doi.org/", "doi.org/", ...
+_DOI_PREFIX_PATTERN = re.compile(
+    r'^(?:doi:\s*|info:doi/|urn:doi:|(?:https?://)?(?:dx\.|www\.)?doi\.org/)',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=8)
+def _compile_doi_pattern(doi_regex: str) -> Pattern[str]:
+    """Compile (once per distinct regex) the configured DOI pattern"""
+    return re.compile(doi_regex, re.IGNORECASE)
+
+
+def get_doi_pattern() -> Pattern[str]:
+    """
+    Get the compiled DOI validation pattern.
+    
+    The pattern is compiled once and cached, keyed by the configured regex
+    so that a changed configuration still takes effect.
+    
+    Returns:
+        Compiled DOI regular expression
+    """
+    return _compile_doi_pattern(get_config().doi_regex)
+
+
 def validate_doi(doi: str) -> bool:
     """
     Validate a DOI string format.
@@ -52,9 +81,7 @@ def validate_doi(doi: str) -> bool:
     if not doi or not isinstance(doi, str):
         return False
     
-    config = get_config()
-    doi_pattern = re.compile(config.doi_regex, re.IGNORECASE)
-    return bool(doi_pattern.match(doi.strip()))
+    return get_doi_pattern().match(doi.strip()) is not None
 
 
 def validate_file_path(file_path: Union[str, Path], must_exist: bool = True) -> bool:
@@ -116,6 +143,9 @@ def normalize_doi(doi: str) -> str:
     """
     Normalize a DOI string by removing extra formatting.
     
+    Handles "doi:", "info:doi/" and "urn:doi:" prefixes, doi.org / dx.doi.org
+    resolver URLs (with or without a scheme) and percent-encoded DOIs.
+    
     Args:
         doi: DOI string to normalize
         
@@ -125,15 +155,66 @@ def normalize_doi(doi: str) -> str:
     if not doi:
         return ""
     
+    # Remove quotes and surrounding whitespace
+    doi = doi.strip().strip('\'"').strip()
+    
+    # Decode URL-encoded DOIs (e.g. 10.1000%2Fabc)
+    if '%' in doi:
+        doi = unquote(doi)
+    
     # Remove common prefixes
-    doi = doi.strip()
-    prefixes = ["doi:", "DOI:", "https://doi.org/", "http://dx.doi.org/"]
-    for prefix in prefixes:
-        if doi.startswith(prefix):
-            doi = doi[len(prefix):]
-            break
+    doi = _DOI_PREFIX_PATTERN.sub('', doi, count=1)
     
     # Remove quotes and extra whitespace
-    doi = doi.strip('\'"')
+    doi = doi.strip().strip('\'"')
+    
+    return doi
+
+
+def doi_key(doi: str) -> str:
+    """
+    Canonical, case-insensitive form of a DOI.
+    
+    DOIs are case-insensitive, so "10.1016/J.X" and "doi:10.1016/j.x" name
+    the same paper. Use this key wherever DOIs are compared, deduplicated,
+    tracked or turned into file names; keep the normalized DOI for display
+    and API queries.
+    
+    Args:
+        doi: DOI string in any supported notation
+        
+    Returns:
+        Normalized, lowercased DOI ("" for empty input)
+    """
+    return normalize_doi(doi).lower()
+
+
+def normalize_dois(dois: Iterable[str],
+                   on_invalid: Optional[Callable[[str], None]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Normalize and validate a batch of DOI strings in one pass.
+    
+    The DOI pattern is looked up once for the whole batch instead of once
+    per entry.
+    
+    Args:
+        dois: Raw DOI strings (e.g. lines or field values)
+        on_invalid: Called with each invalid raw value as soon as it is read
+            (e.g. to report its line number); such values are not collected
+        
+    Returns:
+        Tuple of (valid normalized DOIs, invalid raw values), both in input order
+    """
+    match = get_doi_pattern().match
+    valid: List[str] = []
+    invalid: List[str] = []
+    report = on_invalid or invalid.append
+    
+    for raw in dois:
+        doi = normalize_doi(raw)
+        if doi and match(doi):
+            valid.append(doi)
+        else:
+            report(raw)
     
-    return doi 
\ No newline at end of file
+    return valid, invalid
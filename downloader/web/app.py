@@ -71,8 +71,9 @@ def _register_error_handlers(app: Flask):
     
     @app.errorhandler(413)
     def file_too_large(error):
+        max_size = app.config['MAX_CONTENT_LENGTH'] or 0
         return {
-            'error': 'File too large. Maximum size is 16MB.'
+            'error': f'File too large. Maximum size is {max_size // (1024 * 1024)}MB.'
         }, 413
     
     @app.errorhandler(404)
@@ -2,12 +2,12 @@
 API routes for programmatic access to Science Downloader
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 from pathlib import Path
 
 from ...core.extractors import BibtexExtractor, RayyanExtractor
 from ...core.downloaders import ScienceDownloader
-from ...utils import get_logger, validate_doi
+from ...utils import get_logger, get_metrics, validate_doi
 
 api_bp = Blueprint('api', __name__)
 logger = get_logger(__name__)
@@ -66,31 +66,13 @@ def extract_bibtex_api():
         
         bibtex_content = data['content']
         
-        # Save content to temporary file
-        config = current_app.config['SCIENCE_CONFIG']
-        temp_input = config.uploads_dir / "temp_bibtex.bib"
-        temp_output = config.uploads_dir / "temp_dois.txt"
-        
-        with open(temp_input, 'w', encoding='utf-8') as f:
-            f.write(bibtex_content)
-        
-        # Extract DOIs
+        # Extract DOIs in memory (no temporary files, safe for concurrent requests)
         extractor = BibtexExtractor()
-        result = extractor.extract(temp_input, temp_output)
-        
-        # Read extracted DOIs
-        dois = []
-        if temp_output.exists():
-            with open(temp_output, 'r', encoding='utf-8') as f:
-                dois = [line.strip() for line in f if line.strip()]
-        
-        # Clean up
-        temp_input.unlink(missing_ok=True)
-        temp_output.unlink(missing_ok=True)
+        result = extractor.extract_content(bibtex_content, name="request.bib")
         
         return jsonify({
             'success': result.success,
-            'dois': dois,
+            'dois': result.dois,
             'count': result.unique_count,
             'duplicates_removed': result.duplicates_removed,
             'errors': result.errors
@@ -112,31 +94,13 @@ def extract_rayyan_api():
         
         csv_content = data['content']
         
-        # Save content to temporary file
-        config = current_app.config['SCIENCE_CONFIG']
-        temp_input = config.uploads_dir / "temp_rayyan.csv"
-        temp_output = config.uploads_dir / "temp_dois.txt"
-        
-        with open(temp_input, 'w', encoding='utf-8') as f:
-            f.write(csv_content)
-        
-        # Extract DOIs
+        # Extract DOIs in memory (no temporary files, safe for concurrent requests)
         extractor = RayyanExtractor()
-        result = extractor.extract(temp_input, temp_output)
-        
-        # Read extracted DOIs
-        dois = []
-        if temp_output.exists():
-            with open(temp_output, 'r', encoding='utf-8') as f:
-                dois = [line.strip() for line in f if line.strip()]
-        
-        # Clean up
-        temp_input.unlink(missing_ok=True)
-        temp_output.unlink(missing_ok=True)
+        result = extractor.extract_content(csv_content, name="request.csv")
         
         return jsonify({
             'success': result.success,
-            'dois': dois,
+            'dois': result.dois,
             'count': result.unique_count,
             'duplicates_removed': result.duplicates_removed,
             'errors': result.errors
@@ -158,6 +122,15 @@ def download_status():
     })
 
 
+@api_bp.route('/metrics')
+def metrics():
+    """Request, source and per-DOI metrics in Prometheus text exposition format"""
+    return Response(
+        get_metrics().render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
 @api_bp.errorhandler(404)
 def api_not_found(error):
     """API 404 handler"""
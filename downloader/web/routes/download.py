@@ -2,13 +2,15 @@
 Download routes for the Science Downloader web interface
 """
 
+import io
 import threading
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, render_template, request, jsonify, current_app, send_file
 from pathlib import Path
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from ...core.downloaders import ScienceDownloader
 from ...utils import get_logger
+from ..uploads import get_upload_stream
 
 download_bp = Blueprint('download', __name__)
 logger = get_logger(__name__)
@@ -16,6 +18,17 @@ logger = get_logger(__name__)
 # Global downloader instance for progress tracking
 _downloader = None
 
+# DOIs per list returned by /library by default, and at most
+LIBRARY_PAGE_SIZE = 1000
+LIBRARY_MAX_PAGE_SIZE = 10000
+
+
+def _library_downloader() -> ScienceDownloader:
+    """Downloader for stats and library requests before any job ran; it never downloads, so it starts closed"""
+    downloader = ScienceDownloader(current_app.config['SCIENCE_CONFIG'])
+    downloader.close()
+    return downloader
+
 
 @download_bp.route('/')
 def download_page():
@@ -29,16 +42,13 @@ def download_papers_custom():
     global _downloader
     
     try:
-        # Validate file upload
-        if 'doi_file' not in request.files:
+        # Stream the upload (multipart file or raw, optionally gzip/zip, body)
+        stream, filename = get_upload_stream('doi_file')
+        if stream is None:
             return jsonify({'error': 'No DOI file uploaded'}), 400
         
-        file = request.files['doi_file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Get output folder from form
-        output_folder = request.form.get('output_folder', '').strip()
+        # Get output folder from form (or query string for raw uploads)
+        output_folder = request.values.get('output_folder', '').strip()
         config = current_app.config['SCIENCE_CONFIG']
         
         if not output_folder:
@@ -46,39 +56,34 @@ def download_papers_custom():
         else:
             output_folder = Path(output_folder).expanduser()
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
-        file_path = upload_folder / filename
-        file.save(file_path)
+        # Initialize downloader
+        downloader = ScienceDownloader(config)
         
-        # Count DOIs in the uploaded file
+        # Validate and de-duplicate the DOIs as the upload stream is read (no
+        # temporary file); the job needs the resulting list after the request ends
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                dois = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-                doi_count = len(dois)
+            with io.TextIOWrapper(stream, encoding='utf-8') as text:
+                dois = downloader.read_dois(text)
+            doi_count = len(dois)
             
             if doi_count == 0:
-                file_path.unlink(missing_ok=True)
-                return jsonify({'error': 'No valid DOIs found in the uploaded file'}), 400
+                return jsonify({'error': 'No valid DOIs left to download in the uploaded file'}), 400
                 
         except Exception as e:
-            file_path.unlink(missing_ok=True)
             return jsonify({'error': f'Error reading DOI file: {str(e)}'}), 400
         
-        # Initialize downloader
-        _downloader = ScienceDownloader(config)
+        _downloader = downloader
         
         # Start download in background thread
         def download_thread():
             try:
-                result = _downloader.download_papers(file_path, output_folder)
+                result = downloader.download_papers(dois, output_folder, filtered=True)
                 logger.info(f"Download completed: {result}")
             except Exception as e:
                 logger.error(f"Download thread error: {e}")
             finally:
-                # Clean up uploaded file after download
-                file_path.unlink(missing_ok=True)
+                # Stays _downloader for progress and stats until the next job
+                downloader.close()
         
         thread = threading.Thread(target=download_thread, daemon=True)
         thread.start()
@@ -90,6 +95,8 @@ def download_papers_custom():
             'output_folder': str(output_folder)
         })
         
+    except RequestEntityTooLarge:
+        raise  # answered by the app's 413 handler
     except Exception as e:
         logger.error(f"Error in download_papers_custom: {e}")
         return jsonify({'error': str(e)}), 500
@@ -131,6 +138,26 @@ def get_download_progress():
         return jsonify({'error': str(e)}), 500
 
 
+@download_bp.route('/trace')
+def get_download_trace():
+    """Download the span trace of the last finished job (?format=chrome|jsonl)"""
+    global _downloader
+    
+    trace_format = request.args.get('format', 'chrome')
+    if trace_format not in ('chrome', 'jsonl'):
+        return jsonify({'error': 'format must be "chrome" or "jsonl"'}), 400
+    
+    if _downloader is None or not _downloader.last_trace:
+        return jsonify({'error': 'No trace available yet'}), 404
+    
+    trace_path = Path(_downloader.last_trace[trace_format])
+    if not trace_path.exists():
+        return jsonify({'error': 'Trace file no longer exists'}), 404
+    
+    mimetype = 'application/json' if trace_format == 'chrome' else 'application/x-ndjson'
+    return send_file(trace_path, mimetype=mimetype, as_attachment=True, download_name=trace_path.name)
+
+
 @download_bp.route('/stats')
 def get_download_stats():
     """Get comprehensive download statistics"""
@@ -138,7 +165,7 @@ def get_download_stats():
     
     try:
         if _downloader is None:
-            _downloader = ScienceDownloader()
+            _downloader = _library_downloader()
         
         stats = _downloader.get_download_stats()
         return jsonify({
@@ -198,7 +225,7 @@ def reset_all_tracking():
     
     try:
         if _downloader is None:
-            _downloader = ScienceDownloader()
+            _downloader = _library_downloader()
         
         cleared_count = _downloader.clear_all_tracking()
         
@@ -215,23 +242,27 @@ def reset_all_tracking():
 
 @download_bp.route('/library')
 def get_library():
-    """Get list of successfully downloaded papers"""
+    """Get a page of the downloaded and failed DOIs (query: offset, limit)"""
     global _downloader
     
     try:
         if _downloader is None:
-            _downloader = ScienceDownloader()
+            _downloader = _library_downloader()
         
-        downloaded_dois = list(_downloader._get_downloaded_dois())
-        failed_dois = list(_downloader._get_failed_dois())
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = min(max(1, request.args.get('limit', LIBRARY_PAGE_SIZE, type=int)), LIBRARY_MAX_PAGE_SIZE)
+        downloaded = _downloader._get_downloaded_dois()
+        failed = _downloader._get_failed_dois()
         
         return jsonify({
             'success': True,
             'library': {
-                'downloaded': downloaded_dois,
-                'failed': failed_dois,
-                'downloaded_count': len(downloaded_dois),
-                'failed_count': len(failed_dois)
+                'downloaded': downloaded.page(offset, limit),
+                'failed': failed.page(offset, limit),
+                'downloaded_count': len(downloaded),
+                'failed_count': len(failed),
+                'offset': offset,
+                'limit': limit
             }
         })
         
@@ -2,12 +2,16 @@
 Main routes for the Science Downloader web interface
 """
 
+import shutil
+import tempfile
 from flask import Blueprint, render_template, request, jsonify, current_app
 from pathlib import Path
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
-from ...core.extractors import BibtexExtractor, RayyanExtractor, ScopusExtractor
+from ...core.extractors import BibtexExtractor, RayyanExtractor, ScopusExtractor, MultiFileExtractor
 from ...utils import get_logger
+from ..uploads import get_upload_stream
 
 main_bp = Blueprint('main', __name__)
 logger = get_logger(__name__)
@@ -59,16 +63,13 @@ def extract_bibtex():
         return render_template('extract_bibtex.html')
     
     try:
-        # Validate file upload
-        if 'file' not in request.files:
+        # Stream the upload (multipart file or raw, optionally gzip/zip, body)
+        stream, filename = get_upload_stream('file')
+        if stream is None:
             return jsonify({'error': 'No file uploaded'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Get output path from form
-        output_path = request.form.get('output_path', '').strip()
+        # Get output path from form (or query string for raw uploads)
+        output_path = request.values.get('output_path', '').strip()
         config = current_app.config['SCIENCE_CONFIG']
         
         if not output_path:
@@ -76,18 +77,10 @@ def extract_bibtex():
         else:
             output_path = Path(output_path)
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
-        file_path = upload_folder / filename
-        file.save(file_path)
-        
-        # Extract DOIs using the modern extractor
+        # Extract DOIs as the upload is read, using the modern extractor
         extractor = BibtexExtractor()
-        result = extractor.extract(file_path, output_path)
-        
-        # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        with stream:
+            result = extractor.extract_stream(stream, filename, output_path)
         
         if result.success:
             return jsonify({
@@ -105,6 +98,8 @@ def extract_bibtex():
                 'details': result.errors
             }), 400
             
+    except RequestEntityTooLarge:
+        raise  # answered by the app's 413 handler
     except Exception as e:
         logger.error(f"Error in extract_bibtex: {e}")
         return jsonify({'error': str(e)}), 500
@@ -117,16 +112,13 @@ def extract_rayyan():
         return render_template('extract_rayyan.html')
     
     try:
-        # Validate file upload
-        if 'file' not in request.files:
+        # Stream the upload (multipart file or raw, optionally gzip/zip, body)
+        stream, filename = get_upload_stream('file')
+        if stream is None:
             return jsonify({'error': 'No file uploaded'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Get output path from form
-        output_path = request.form.get('output_path', '').strip()
+        # Get output path from form (or query string for raw uploads)
+        output_path = request.values.get('output_path', '').strip()
         config = current_app.config['SCIENCE_CONFIG']
         
         if not output_path:
@@ -134,18 +126,10 @@ def extract_rayyan():
         else:
             output_path = Path(output_path)
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
-        file_path = upload_folder / filename
-        file.save(file_path)
-        
-        # Extract DOIs using the modern extractor
+        # Extract DOIs as the upload is read, using the modern extractor
         extractor = RayyanExtractor()
-        result = extractor.extract(file_path, output_path)
-        
-        # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        with stream:
+            result = extractor.extract_stream(stream, filename, output_path)
         
         if result.success:
             return jsonify({
@@ -163,6 +147,8 @@ def extract_rayyan():
                 'details': result.errors
             }), 400
             
+    except RequestEntityTooLarge:
+        raise  # answered by the app's 413 handler
     except Exception as e:
         logger.error(f"Error in extract_rayyan: {e}")
         return jsonify({'error': str(e)}), 500
@@ -175,16 +161,13 @@ def extract_scopus():
         return render_template('extract_scopus.html')
     
     try:
-        # Validate file upload
-        if 'file' not in request.files:
+        # Stream the upload (multipart file or raw, optionally gzip/zip, body)
+        stream, filename = get_upload_stream('file')
+        if stream is None:
             return jsonify({'error': 'No file uploaded'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Get output path from form
-        output_path = request.form.get('output_path', '').strip()
+        # Get output path from form (or query string for raw uploads)
+        output_path = request.values.get('output_path', '').strip()
         config = current_app.config['SCIENCE_CONFIG']
         
         if not output_path:
@@ -192,18 +175,10 @@ def extract_scopus():
         else:
             output_path = Path(output_path)
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
-        file_path = upload_folder / filename
-        file.save(file_path)
-        
-        # Extract DOIs using the Scopus extractor
+        # Extract DOIs as the upload is read, using the Scopus extractor
         extractor = ScopusExtractor()
-        result = extractor.extract(file_path, output_path)
-        
-        # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        with stream:
+            result = extractor.extract_stream(stream, filename, output_path)
         
         if result.success:
             return jsonify({
@@ -221,6 +196,74 @@ def extract_scopus():
                 'details': result.errors
             }), 400
             
+    except RequestEntityTooLarge:
+        raise  # answered by the app's 413 handler
     except Exception as e:
         logger.error(f"Error in extract_scopus: {e}")
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500 
+
+
+@main_bp.route('/extract-multi', methods=['POST'])
+def extract_multi():
+    """Extract and merge DOIs from several BibTeX, Scopus and Rayyan exports"""
+    upload_dir = None
+    try:
+        # Validate file uploads
+        files = [f for f in request.files.getlist('files') if f.filename]
+        if not files:
+            return jsonify({'error': 'No files uploaded'}), 400
+        
+        # Optional format per file, in upload order; empty entries are detected
+        formats = [fmt.strip().lower() or None for fmt in request.form.getlist('formats')]
+        if formats and len(formats) != len(files):
+            return jsonify({'error': 'formats must give one entry per uploaded file'}), 400
+        
+        # Get output path from form
+        output_path = request.form.get('output_path', '').strip()
+        config = current_app.config['SCIENCE_CONFIG']
+        
+        if not output_path:
+            output_path = config.extracted_dois_file
+        else:
+            output_path = Path(output_path)
+        
+        # Save uploaded files in a per-request directory so names cannot collide
+        upload_dir = Path(tempfile.mkdtemp(dir=current_app.config['UPLOAD_FOLDER']))
+        file_paths = []
+        for index, file in enumerate(files):
+            file_path = upload_dir / str(index) / secure_filename(file.filename)
+            file_path.parent.mkdir()
+            file.save(file_path)
+            file_paths.append(file_path)
+        
+        # Detect formats and extract all files (in the shared pool for large batches)
+        extractor = MultiFileExtractor()
+        result = extractor.extract(file_paths, output_path, formats or None)
+        
+        if result.success:
+            return jsonify({
+                'success': True,
+                'message': f'Successfully extracted {result.unique_count} DOIs from {len(files)} files to {output_path}',
+                'count': result.unique_count,
+                'output_path': str(output_path),
+                'duplicates_removed': result.duplicates_removed,
+                'files': result.files,
+                'errors': result.errors[:5]  # Limit errors shown
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'No DOIs found in the uploaded files',
+                'files': result.files,
+                'details': result.errors
+            }), 400
+            
+    except RequestEntityTooLarge:
+        raise  # answered by the app's 413 handler
+    except Exception as e:
+        logger.error(f"Error in extract_multi: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        # Clean up uploaded files
+        if upload_dir is not None:
+            shutil.rmtree(upload_dir, ignore_errors=True)
@@ -0,0 +1,48 @@
+"""
+Streaming upload handling for the Science Downloader web interface
+"""
+
+from typing import BinaryIO, Optional, Tuple
+
+from flask import request
+from werkzeug.utils import secure_filename
+
+from ..utils import open_decompressed
+
+
+def get_upload_stream(field: str = 'file') -> Tuple[Optional[BinaryIO], str]:
+    """
+    Get the uploaded content of the current request as a decompressed binary stream.
+    
+    Multipart uploads are read from the form field; any other body (for
+    example `application/octet-stream` or `application/gzip`) is streamed
+    straight from the request as it arrives, with the file name taken from the
+    `filename` query parameter or the `X-Filename` header. gzip and zip
+    content is decompressed on the fly.
+    
+    Note that werkzeug parses a multipart body in full before the route runs,
+    spooling file parts larger than 500 KB to a temporary file, so only raw
+    bodies avoid the extra pass over the disk. The caller must close the
+    returned stream.
+    
+    Args:
+        field: Multipart form field holding the file
+        
+    Returns:
+        Tuple of (binary stream, secure file name); the stream is None if
+        nothing was uploaded
+    """
+    if request.mimetype == 'multipart/form-data':
+        file = request.files.get(field)
+        if file is None or file.filename == '':
+            return None, ''
+        stream, filename = file.stream, file.filename
+    else:
+        filename = request.args.get('filename') or request.headers.get('X-Filename', '')
+        chunked = request.headers.get('Transfer-Encoding', '').lower() == 'chunked'
+        if not request.content_length and not chunked:
+            return None, ''
+        stream = request.stream
+    
+    stream, filename = open_decompressed(stream, secure_filename(filename or 'upload'))
+    return stream, filename
@@ -0,0 +1,63 @@
+"""
+Tests for the journal DOI to arXiv preprint index
+"""
+
+import json
+
+from downloader.core.indexes import ArxivIndex
+from downloader.core.indexes.arxiv import parse_record
+
+RECORD = {
+    "id": "2101.00001",
+    "title": "A   preprint\n  title",
+    "doi": "10.1000/J.One; 10.1000/j.two arXiv:2101.00001",
+    "license": "http://creativecommons.org/licenses/by/4.0/",
+    "update_date": "2021-02-01",
+}
+
+
+def test_one_row_per_listed_doi():
+    rows = list(parse_record(RECORD))
+    
+    assert [row[0] for row in rows] == ["10.1000/j.one", "10.1000/j.two"]
+    assert rows[0] == ("10.1000/j.one", "2101.00001", "A preprint title",
+                       "http://creativecommons.org/licenses/by/4.0/", "2021-02-01")
+
+
+def test_record_without_id_or_doi_has_no_rows():
+    assert list(parse_record(dict(RECORD, id=""))) == []
+    assert list(parse_record(dict(RECORD, doi=None))) == []
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding='utf-8')
+
+
+def test_journal_doi_lookup(tmp_path):
+    _write(tmp_path / "arxiv-metadata-oai-snapshot.json", [RECORD])
+    index = ArxivIndex(tmp_path / "arxiv.sqlite")
+    
+    index.import_files([tmp_path / "arxiv-metadata-oai-snapshot.json"])
+    
+    assert index.lookup("https://doi.org/10.1000/J.TWO")["arxiv_id"] == "2101.00001"
+    assert index.lookup("10.1000/j.three") is None
+    assert index.stats()["preprints"] == 1
+
+
+def test_most_recently_updated_preprint_wins(tmp_path):
+    newer = dict(RECORD, id="2203.00002", doi="10.1000/j.one", update_date="2022-03-01")
+    _write(tmp_path / "a.json", [newer])
+    _write(tmp_path / "b.json", [RECORD])
+    index = ArxivIndex(tmp_path / "arxiv.sqlite")
+    
+    index.import_files([tmp_path / "a.json", tmp_path / "b.json"])
+    
+    assert index.lookup("10.1000/j.one")["arxiv_id"] == "2203.00002"
+    assert index.lookup("10.1000/j.two")["arxiv_id"] == "2101.00001"
+
+
+def test_lookup_before_any_import(tmp_path):
+    index = ArxivIndex(tmp_path / "arxiv.sqlite")
+    
+    assert index.lookup("10.1000/j.one") is None
+    assert index.stats()["exists"] is False
@@ -0,0 +1,214 @@
+"""
+Tests for batched DOI resolution
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from downloader.core.downloaders.batch import BatchPrefetcher, CoreBatchResolver, OpenAlexResolver
+
+
+class FakeResponse:
+    def __init__(self, data=None, status_code=200):
+        self.data = data
+        self.status_code = status_code
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+    
+    def json(self):
+        return self.data
+
+
+class FakeGet:
+    """Records each call and answers with respond(url, params)"""
+    
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+    
+    def __call__(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        return self.respond(url, params)
+
+
+def _work(doi, pdf_url=None):
+    return {"doi": f"https://doi.org/{doi}", "title": doi, "updated_date": "2024-01-01",
+            "best_oa_location": {"pdf_url": pdf_url} if pdf_url else None, "locations": []}
+
+
+def test_openalex_chunks_and_builds_the_filter():
+    get = FakeGet(lambda url, params: FakeResponse({"results": []}))
+    resolver = OpenAlexResolver(get, "https://api.openalex.example/", batch_size=2, email="me@example.org")
+    
+    resolver.resolve(["10.1000/A", "10.1000/b", "10.1000/c"])
+    
+    assert [url for url, _ in get.calls] == ["https://api.openalex.example/works"] * 2
+    first, second = (params for _, params in get.calls)
+    assert first["filter"] == "doi:10.1000/a|10.1000/b"
+    assert first["per-page"] == 2
+    assert first["mailto"] == "me@example.org"
+    assert second["filter"] == "doi:10.1000/c"
+
+
+def test_openalex_skips_dois_that_break_the_filter():
+    get = FakeGet(lambda url, params: FakeResponse({"results": []}))
+    
+    OpenAlexResolver(get, "https://api.openalex.example").resolve(["10.1000/a|b", "10.1000/c,d", "10.1000/e"])
+    
+    assert get.calls[0][1]["filter"] == "doi:10.1000/e"
+
+
+def test_openalex_batch_size_is_capped_at_100():
+    assert OpenAlexResolver(None, "https://api.openalex.example", batch_size=500).batch_size == 100
+
+
+def test_openalex_maps_open_closed_and_unknown_works():
+    results = [_work("10.1000/open", "https://repo.example/open.pdf"), _work("10.1000/closed")]
+    get = FakeGet(lambda url, params: FakeResponse({"results": results}))
+    
+    locations = OpenAlexResolver(get, "https://api.openalex.example").resolve(
+        ["10.1000/OPEN", "10.1000/closed", "10.1000/unknown"]
+    )
+    
+    assert locations["10.1000/open"]["url"] == "https://repo.example/open.pdf"
+    assert locations["10.1000/closed"] is None
+    assert "10.1000/unknown" not in locations
+
+
+def test_openalex_failed_chunk_leaves_its_dois_out():
+    def respond(url, params):
+        if "10.1000/a" in params["filter"]:
+            return FakeResponse(status_code=503)
+        return FakeResponse({"results": [_work("10.1000/c", "https://repo.example/c.pdf")]})
+    
+    locations = OpenAlexResolver(FakeGet(respond), "https://api.openalex.example", batch_size=2).resolve(
+        ["10.1000/a", "10.1000/b", "10.1000/c"]
+    )
+    
+    assert list(locations) == ["10.1000/c"]
+
+
+def test_prefetcher_resolves_a_chunk_ahead():
+    resolved = []
+    
+    def resolve(chunk):
+        resolved.append(chunk)
+        return {doi: f"found {doi}" for doi in chunk}
+    
+    dois = [f"10.1000/{i}" for i in range(5)]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        prefetcher = BatchPrefetcher(resolve, dois, chunk_size=2, executor=pool)
+        
+        assert prefetcher.get("10.1000/0") == "found 10.1000/0"
+        pool.shutdown(wait=True)
+    
+    # Asking for the first chunk also started the second one
+    assert sorted(resolved) == [dois[0:2], dois[2:4]]
+    assert prefetcher.covers("10.1000/4")
+    assert not prefetcher.covers("10.1000/5")
+    assert prefetcher.get("10.1000/5") is None
+
+
+def test_prefetcher_returns_none_once_stopped():
+    release = threading.Event()
+    stopped = threading.Event()
+    
+    def resolve(chunk):
+        release.wait(5)
+        return {doi: "found" for doi in chunk}
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        prefetcher = BatchPrefetcher(resolve, ["10.1000/a"], chunk_size=10, executor=pool, stopped=stopped.is_set)
+        threading.Timer(0.2, stopped.set).start()
+        
+        assert prefetcher.get("10.1000/a") is None
+        release.set()
+
+
+def test_prefetcher_failed_resolution_returns_none():
+    def resolve(chunk):
+        raise RuntimeError("boom")
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        prefetcher = BatchPrefetcher(resolve, ["10.1000/a"], chunk_size=10, executor=pool)
+        
+        assert prefetcher.get("10.1000/a") is None
+
+
+def _core(get, **kwargs):
+    waits, sleeps = [], []
+    resolver = CoreBatchResolver(get, "https://core.example/v3/", "key", wait=lambda: waits.append(1),
+                                 sleep=sleeps.append, retry_delay=7, **kwargs)
+    return resolver, waits, sleeps
+
+
+def test_core_or_joins_chunks_into_queries():
+    get = FakeGet(lambda url, params: FakeResponse({"results": [], "totalHits": 0}))
+    resolver, waits, _ = _core(get, batch_size=2, max_results=2)
+    
+    works = resolver.resolve(["10.1000/A", "10.1000/b", "10.1000/c", '10.1000/"quoted"'])
+    
+    assert [url for url, _ in get.calls] == ["https://core.example/v3/search/works"] * 2
+    first, second = (params for _, params in get.calls)
+    assert first["q"] == 'doi:"10.1000/a" OR doi:"10.1000/b"'
+    assert (first["limit"], first["offset"], first["apiKey"]) == (4, 0, "key")
+    assert second["q"] == 'doi:"10.1000/c"'
+    assert len(waits) == 2
+    assert works == {"10.1000/a": [], "10.1000/b": [], "10.1000/c": []}
+
+
+def test_core_keeps_max_results_per_doi():
+    results = [{"doi": "10.1000/A", "id": 1}, {"doi": "10.1000/a", "id": 2}, {"doi": "10.1000/other", "id": 3}]
+    get = FakeGet(lambda url, params: FakeResponse({"results": results, "totalHits": 3}))
+    resolver, _, _ = _core(get, max_results=1)
+    
+    works = resolver.resolve(["10.1000/a", "10.1000/b"])
+    
+    assert works == {"10.1000/a": [{"doi": "10.1000/A", "id": 1}], "10.1000/b": []}
+
+
+def test_core_pages_until_total_hits():
+    def respond(url, params):
+        offset = params["offset"]
+        page = [{"doi": f"10.1000/{i}"} for i in range(offset, offset + params["limit"])]
+        return FakeResponse({"results": page, "totalHits": 4})
+    
+    get = FakeGet(respond)
+    resolver, _, _ = _core(get, batch_size=2)
+    
+    works = resolver.resolve(["10.1000/0", "10.1000/3"])
+    
+    # Two-result pages: the second one reaches totalHits, so no third request
+    assert [params["offset"] for _, params in get.calls] == [0, 2]
+    assert works == {"10.1000/0": [{"doi": "10.1000/0"}], "10.1000/3": [{"doi": "10.1000/3"}]}
+
+
+def test_core_retries_once_after_429():
+    answers = [FakeResponse(status_code=429), FakeResponse({"results": [{"doi": "10.1000/a"}], "totalHits": 1})]
+    get = FakeGet(lambda url, params: answers.pop(0))
+    resolver, waits, sleeps = _core(get)
+    
+    works = resolver.resolve(["10.1000/a"])
+    
+    assert works == {"10.1000/a": [{"doi": "10.1000/a"}]}
+    assert sleeps == [7]
+    assert len(waits) == 2
+
+
+def test_core_failed_chunk_leaves_its_dois_out():
+    def respond(url, params):
+        if "10.1000/a" in params["q"]:
+            return FakeResponse(status_code=429)
+        return FakeResponse({"results": [], "totalHits": 0})
+    
+    resolver, _, sleeps = _core(FakeGet(respond), batch_size=1)
+    
+    works = resolver.resolve(["10.1000/a", "10.1000/b"])
+    
+    # A second 429 gives up on the chunk
+    assert works == {"10.1000/b": []}
+    assert sleeps == [7]
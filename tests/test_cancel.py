@@ -0,0 +1,190 @@
+"""
+Tests for cooperative job cancellation and the transfer watchdog
+"""
+
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from downloader.core.downloaders.cancel import (CancelToken, DownloadCancelled, SlowTransfer, TransferWatchdog,
+                                                abort_response)
+
+
+def test_check_raises_once_cancelled():
+    token = CancelToken()
+    token.check()
+    
+    token.cancel()
+    
+    assert token.cancelled
+    with pytest.raises(DownloadCancelled):
+        token.check()
+
+
+def test_cancelled_is_not_an_exception():
+    # except Exception handlers turning errors into failed DOIs must let it through
+    assert not issubclass(DownloadCancelled, Exception)
+
+
+def test_sleep_runs_full_length_without_cancel():
+    token = CancelToken()
+    started = time.monotonic()
+    
+    token.sleep(0.2)
+    
+    assert time.monotonic() - started >= 0.19
+
+
+def test_cancel_interrupts_sleep():
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    started = time.monotonic()
+    
+    with pytest.raises(DownloadCancelled):
+        token.sleep(10)
+    
+    assert time.monotonic() - started < 1.0
+
+
+def test_on_cancel_runs_callback_from_cancelling_thread():
+    token = CancelToken()
+    unblocked = threading.Event()
+    callback_threads = []
+    
+    def callback():
+        callback_threads.append(threading.current_thread())
+        unblocked.set()
+    
+    canceller = threading.Timer(0.1, token.cancel)
+    with token.on_cancel(callback):
+        canceller.start()
+        # Stands in for a blocking read that only the callback can interrupt
+        assert unblocked.wait(5)
+    
+    assert callback_threads == [canceller]
+
+
+def test_on_cancel_callback_is_dropped_after_the_block():
+    token = CancelToken()
+    calls = []
+    
+    with token.on_cancel(lambda: calls.append(1)):
+        pass
+    token.cancel()
+    
+    assert calls == []
+
+
+def test_on_cancel_when_already_cancelled():
+    token = CancelToken()
+    token.cancel()
+    calls = []
+    
+    with pytest.raises(DownloadCancelled):
+        with token.on_cancel(lambda: calls.append(1)):
+            pytest.fail("block must not run after cancel")
+    
+    assert calls == [1]
+
+
+def test_failing_callback_does_not_stop_others():
+    token = CancelToken()
+    calls = []
+    
+    def broken():
+        raise RuntimeError("boom")
+    
+    with token.on_cancel(broken), token.on_cancel(lambda: calls.append(1)):
+        token.cancel()
+    
+    assert calls == [1]
+
+
+def test_abort_response_wakes_a_blocked_read():
+    reader, writer = socket.socketpair()
+    response = SimpleNamespace(raw=SimpleNamespace(_connection=SimpleNamespace(sock=reader)))
+    try:
+        threading.Timer(0.1, abort_response, args=(response,)).start()
+        started = time.monotonic()
+        
+        # The peer never sends anything; only the shutdown ends the read
+        assert reader.recv(1024) == b''
+        assert time.monotonic() - started < 2.0
+    finally:
+        reader.close()
+        writer.close()
+
+
+class _BlockedResponse:
+    """Response stand-in without a socket: abort_response falls back to close()"""
+    
+    def __init__(self):
+        self.closed = threading.Event()
+    
+    def close(self):
+        self.closed.set()
+
+
+def test_watchdog_aborts_a_transfer_at_its_deadline():
+    response = _BlockedResponse()
+    started = time.monotonic()
+    watchdog = TransferWatchdog(response, deadline=started + 0.3)
+    try:
+        assert response.closed.wait(5)
+        elapsed = time.monotonic() - started
+    finally:
+        watchdog.stop()
+    
+    assert 0.25 <= elapsed < 1.5
+    assert "deadline" in watchdog.reason
+    assert isinstance(watchdog.explain(ConnectionError("reset")), SlowTransfer)
+
+
+def test_watchdog_aborts_a_stalled_transfer_after_grace():
+    response = _BlockedResponse()
+    started = time.monotonic()
+    watchdog = TransferWatchdog(response, min_rate=1024, grace=0.3)
+    try:
+        watchdog.add(100)
+        assert response.closed.wait(5)
+        elapsed = time.monotonic() - started
+    finally:
+        watchdog.stop()
+    
+    assert 0.25 <= elapsed < 1.5
+    assert "too slow" in watchdog.reason
+
+
+def test_watchdog_lets_fast_transfers_through():
+    response = _BlockedResponse()
+    watchdog = TransferWatchdog(response, deadline=time.monotonic() + 5, min_rate=1024, grace=0.2)
+    try:
+        chunks = list(watchdog.watch(b"x" * 4096 for _ in range(10)))
+    finally:
+        watchdog.stop()
+    
+    assert len(chunks) == 10
+    assert watchdog.received == 40960
+    assert watchdog.reason is None
+    assert not response.closed.wait(0.5)
+
+
+def test_watchdog_add_raises_once_too_slow():
+    watchdog = TransferWatchdog(_BlockedResponse(), min_rate=1024 * 1024, grace=0.1)
+    try:
+        time.sleep(0.2)
+        with pytest.raises(SlowTransfer):
+            watchdog.add(10)
+    finally:
+        watchdog.stop()
+
+
+def test_stopped_watchdog_does_not_abort():
+    response = _BlockedResponse()
+    watchdog = TransferWatchdog(response, deadline=time.monotonic() + 0.2)
+    watchdog.stop()
+    
+    assert not response.closed.wait(0.5)
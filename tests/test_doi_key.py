@@ -0,0 +1,31 @@
+"""
+Tests for the canonical DOI key and the names derived from it
+"""
+
+from downloader.core.downloaders.candidates import doi_filename_part
+from downloader.core.extractors import BibtexExtractor
+from downloader.utils import doi_key
+
+
+def test_doi_key_is_case_insensitive():
+    assert doi_key("10.1016/J.CELL.2020.01.001") == "10.1016/j.cell.2020.01.001"
+    assert doi_key("doi:10.1016/j.Cell.2020.01.001") == doi_key("https://doi.org/10.1016/J.cell.2020.01.001")
+    assert doi_key("") == ""
+
+
+def test_filename_part_is_shared_by_case_variants():
+    assert doi_filename_part("10.1016/J.Cell.2020/01") == "10.1016_j.cell.2020_01"
+    assert doi_filename_part("10.1016/J.CELL") == doi_filename_part("doi:10.1016/j.cell")
+
+
+def test_extractor_deduplicates_case_variants_keeping_first_spelling():
+    content = (
+        "@article{a,\n  doi = {10.1000/ABC}\n}\n"
+        "@article{b,\n  doi = {10.1000/abc}\n}\n"
+        "@article{c,\n  doi = {10.1000/def}\n}\n"
+    )
+    
+    result = BibtexExtractor().extract_content(content, "export.bib")
+    
+    assert result.dois == ["10.1000/ABC", "10.1000/def"]
+    assert result.duplicates_removed == 1
@@ -0,0 +1,157 @@
+"""
+Tests for the extraction result cache and the per-input extraction summary
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from downloader.config.settings import AppConfig, get_config, set_config
+from downloader.core.extractors import BibtexExtractor
+from downloader.core.extractors import cache as cache_module
+from downloader.core.extractors.cache import ExtractionCache, HashingReader
+
+BIBTEX = "@article{a,\n  doi = {10.1000/one}\n}\n@article{b,\n  doi = {10.1000/two}\n}\n"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ExtractionCache(max_entries=8)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def config(tmp_path):
+    previous = get_config()
+    config = AppConfig(data_dir=tmp_path / "data", extraction_summary_max_records=3)
+    set_config(config)
+    yield config
+    set_config(previous)
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Count the parses done by BibtexExtractor"""
+    calls = []
+    scan = BibtexExtractor._scan
+    
+    def counting_scan(self, stream, input_path):
+        calls.append(input_path.name)
+        return scan(self, stream, input_path)
+    
+    monkeypatch.setattr(BibtexExtractor, "_scan", counting_scan)
+    return calls
+
+
+def test_unchanged_file_is_served_from_cache(tmp_path, cache, scans):
+    path = tmp_path / "export.bib"
+    path.write_text(BIBTEX, encoding='utf-8')
+    
+    first = BibtexExtractor().collect(path)
+    second = BibtexExtractor().collect(path)
+    
+    assert second.dois == first.dois == ["10.1000/one", "10.1000/two"]
+    assert second.content_hash == first.content_hash
+    assert scans == ["export.bib"]
+
+
+def test_changed_file_is_parsed_again(tmp_path, cache, scans):
+    path = tmp_path / "export.bib"
+    path.write_text(BIBTEX, encoding='utf-8')
+    BibtexExtractor().collect(path)
+    
+    path.write_text(BIBTEX + "@article{c,\n  doi = {10.1000/three}\n}\n", encoding='utf-8')
+    result = BibtexExtractor().collect(path)
+    
+    assert result.dois == ["10.1000/one", "10.1000/two", "10.1000/three"]
+    assert len(scans) == 2
+
+
+def test_content_hash_is_of_the_decompressed_content(tmp_path, cache):
+    plain = tmp_path / "export.bib"
+    plain.write_text(BIBTEX, encoding='utf-8')
+    packed = tmp_path / "export.bib.gz"
+    with gzip.open(packed, 'wt', encoding='utf-8') as f:
+        f.write(BIBTEX)
+    
+    from_plain = BibtexExtractor().collect(plain)
+    from_gzip = BibtexExtractor().collect(packed)
+    from_upload = BibtexExtractor().extract_stream(io.BytesIO(BIBTEX.encode()), "upload.bib")
+    
+    assert from_plain.content_hash == from_gzip.content_hash == from_upload.content_hash
+
+
+def test_cached_results_are_copies(tmp_path, cache):
+    path = tmp_path / "export.bib"
+    path.write_text(BIBTEX, encoding='utf-8')
+    
+    first = BibtexExtractor().collect(path)
+    first.dois.append("10.1000/mutated")
+    first.errors.append("caller error")
+    second = BibtexExtractor().collect(path)
+    second.dois.clear()
+    third = BibtexExtractor().collect(path)
+    
+    assert third.dois == ["10.1000/one", "10.1000/two"]
+    assert third.errors == []
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.max_entries = 2
+    results = [BibtexExtractor().extract_content(BIBTEX.replace("one", str(i))) for i in range(3)]
+    
+    keys = [ExtractionCache.make_key("BibtexExtractor", result.content_hash) for result in results]
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_hashing_reader_finish_covers_unread_content():
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    reader = HashingReader(io.BytesIO(data))
+    reader.read(100)
+    
+    assert reader.finish() == hashlib.sha256(data).hexdigest()
+
+
+def _summary(config):
+    return json.loads(config.extraction_summary_file.read_text(encoding='utf-8'))
+
+
+def test_summary_keeps_one_record_per_input(tmp_path, cache, config):
+    output = tmp_path / "dois.txt"
+    extractor = BibtexExtractor()
+    
+    extractor.extract_stream(io.BytesIO(BIBTEX.encode()), "a.bib", output)
+    extractor.extract_stream(io.BytesIO(BIBTEX.replace("two", "2").encode()), "b.bib", output)
+    extractor.extract_stream(io.BytesIO(BIBTEX.encode()), "a-again.bib", output)
+    
+    summary = _summary(config)
+    records = summary["extractions"]
+    assert [record["input_file"] for record in records.values()] == ["b.bib", "a-again.bib"]
+    assert summary["latest"] == list(records)[-1]
+
+
+def test_summary_keeps_the_newest_records(tmp_path, cache, config):
+    output = tmp_path / "dois.txt"
+    for i in range(5):
+        BibtexExtractor().extract_stream(io.BytesIO(BIBTEX.replace("one", str(i)).encode()), f"{i}.bib", output)
+    
+    records = _summary(config)["extractions"]
+    assert [record["input_file"] for record in records.values()] == ["2.bib", "3.bib", "4.bib"]
+
+
+def test_legacy_summary_is_upgraded(tmp_path, cache, config):
+    legacy = {"source_format": "BibTeX", "total_found": 1, "unique_count": 1, "input_file": "old.bib"}
+    config.extraction_summary_file.write_text(json.dumps(legacy), encoding='utf-8')
+    
+    BibtexExtractor().extract_stream(io.BytesIO(BIBTEX.encode()), "new.bib", tmp_path / "dois.txt")
+    
+    records = _summary(config)["extractions"]
+    assert records["legacy"] == legacy
+    assert [record["input_file"] for record in records.values()] == ["old.bib", "new.bib"]
@@ -0,0 +1,38 @@
+"""
+Tests for the host reputation table
+"""
+
+from downloader.core.downloaders.hosts import HostReputation
+
+
+def test_probe_errors_are_not_counted():
+    hosts = HostReputation()
+    
+    hosts.record_response("example.org", 0.1, 416, "text/html", probe=True)
+    hosts.record_response("example.org", 0.1, error="ConnectTimeout", probe=True)
+    
+    entry = hosts.get("example.org")
+    assert entry['attempts'] == 0
+    assert entry['consecutive_failures'] == 0
+
+
+def test_failed_probe_and_download_count_once():
+    hosts = HostReputation()
+    
+    hosts.record_response("example.org", 0.1, 503, probe=True)
+    hosts.record_response("example.org", 0.2, 503)
+    
+    entry = hosts.get("example.org")
+    assert entry['attempts'] == 1
+    assert entry['last_failure'] == "HTTP 503"
+
+
+def test_repeated_download_failures_mark_host_bad():
+    hosts = HostReputation(reject_after=3)
+    
+    for _ in range(3):
+        hosts.record_response("example.org", 0.1, 416, probe=True)
+        hosts.record_response("example.org", 0.1, 404)
+    
+    assert hosts.verdict("example.org") == "bad"
+    assert hosts.get("example.org")['attempts'] == 3
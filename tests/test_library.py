@@ -0,0 +1,73 @@
+"""
+Tests for the memory-mapped DOI library
+"""
+
+from downloader.core.downloaders import library
+from downloader.core.downloaders.library import DoiLibrary
+
+
+def test_add_and_contains_ignore_case(tmp_path):
+    dois = DoiLibrary(tmp_path / "downloaded.txt")
+    
+    dois.add("10.1000/ABC")
+    dois.add("doi:10.1000/abc")
+    
+    assert "10.1000/abc" in dois
+    assert "https://doi.org/10.1000/Abc" in dois
+    assert "10.1000/other" not in dois
+    assert len(dois) == 1
+
+
+def test_save_merges_sorted_keys(tmp_path):
+    path = tmp_path / "downloaded.txt"
+    path.write_text("10.1000/b\n10.1000/d\n", encoding='utf-8')
+    dois = DoiLibrary(path)
+    
+    dois.add("10.1000/C")
+    dois.add("10.1000/a")
+    dois.add("10.1000/B")
+    dois.save()
+    
+    assert path.read_text(encoding='utf-8').splitlines() == ["10.1000/a", "10.1000/b", "10.1000/c", "10.1000/d"]
+    assert "10.1000/c" in dois
+    
+    reopened = DoiLibrary(path)
+    assert list(reopened) == ["10.1000/a", "10.1000/b", "10.1000/c", "10.1000/d"]
+    assert "10.1000/C" in reopened
+
+
+def test_unsorted_legacy_file_is_rewritten(tmp_path):
+    path = tmp_path / "downloaded.txt"
+    path.write_text("# downloaded\n10.1000/Zeta\n\n10.1000/alpha\n10.1000/ZETA\n10.1000/beta\n", encoding='utf-8')
+    dois = DoiLibrary(path)
+    
+    assert "10.1000/zeta" in dois
+    assert "10.1000/ALPHA" in dois
+    assert len(dois) == 3
+    assert path.read_text(encoding='utf-8').splitlines() == ["10.1000/alpha", "10.1000/beta", "10.1000/zeta"]
+
+
+def test_lookups_span_index_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(library, "INDEX_STRIDE", 4)
+    path = tmp_path / "downloaded.txt"
+    keys = [f"10.1000/{i:04d}" for i in range(50)]
+    path.write_text("\n".join(keys) + "\n", encoding='utf-8')
+    dois = DoiLibrary(path)
+    
+    assert all(key in dois for key in keys)
+    assert "10.1000/0050" not in dois
+    assert "10.0999/0000" not in dois
+    assert dois.page(10, 3) == keys[10:13]
+
+
+def test_clear_empties_file(tmp_path):
+    path = tmp_path / "failed.txt"
+    dois = DoiLibrary(path)
+    dois.add("10.1000/x")
+    dois.save()
+    
+    dois.clear()
+    
+    assert len(dois) == 0
+    assert "10.1000/x" not in dois
+    assert path.read_text(encoding='utf-8') == ""
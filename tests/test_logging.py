@@ -0,0 +1,84 @@
+"""
+Tests for the shared logging handlers
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from downloader.config.settings import AppConfig, get_config, set_config
+from downloader.utils import logging as app_logging
+from downloader.utils.logging import get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def configure(tmp_path):
+    previous = get_config()
+    
+    def apply(**settings) -> AppConfig:
+        app_logging._reset_handlers()
+        config = AppConfig(data_dir=tmp_path, **settings)
+        set_config(config)
+        return config
+    
+    yield apply
+    
+    # Rebuild the handlers of loggers created elsewhere from the original settings
+    set_config(previous)
+    setup_logging()
+
+
+def _log_lines(config):
+    shutdown_logging()
+    return config.log_file.read_text(encoding='utf-8').splitlines()
+
+
+def _warn_from_worker(message):
+    get_logger("downloader.tests.worker").warning(message)
+    return os.getpid()
+
+
+def test_shutdown_flushes_queue_and_keeps_loggers_writing(configure):
+    config = configure(log_async=True)
+    logger = get_logger("downloader.tests.shutdown")
+    
+    logger.warning("queued")
+    shutdown_logging()
+    logger.warning("after shutdown")
+    
+    lines = _log_lines(config)
+    assert any("queued" in line for line in lines)
+    assert any("after shutdown" in line for line in lines)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_workers_log_without_the_parent_listener(configure):
+    config = configure(log_async=True)
+    get_logger("downloader.tests.worker").warning("from parent")
+    
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+        pids = list(pool.map(_warn_from_worker, ["from worker 1", "from worker 2"]))
+    
+    lines = _log_lines(config)
+    assert os.getpid() not in pids
+    assert any("from parent" in line for line in lines)
+    assert any("from worker 1" in line for line in lines)
+    assert any("from worker 2" in line for line in lines)
+
+
+def test_console_and_file_keep_the_same_sampled_records(configure, capsys):
+    config = configure(log_async=False, log_sample_rate=0.5)
+    logger = get_logger("downloader.tests.sampling")
+    
+    for i in range(200):
+        logger.info(f"record {i}")
+    logger.warning("always kept")
+    
+    in_file = [line.split(": ", 1)[1] for line in _log_lines(config)]
+    on_console = [line.split(": ", 1)[1] for line in capsys.readouterr().out.splitlines()]
+    assert in_file == on_console
+    assert 0 < len(in_file) - 1 < 200
+    assert in_file[-1] == "always kept"
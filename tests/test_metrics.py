@@ -0,0 +1,109 @@
+"""
+Tests for the in-process metrics and their Prometheus exposition
+"""
+
+import threading
+
+import pytest
+
+from downloader.config import AppConfig, get_config, set_config
+from downloader.utils import get_metrics, setup_logging
+from downloader.utils.metrics import MetricsRegistry
+from downloader.web import create_app
+
+
+def test_counter_exposition():
+    registry = MetricsRegistry()
+    requests = registry.counter("http_requests_total", "Requests by source", ["source", "status"])
+    
+    requests.inc(source="CORE", status="200")
+    requests.inc(2, source="CORE", status="200")
+    requests.inc(source='Eu"rope\\PMC', status="404")
+    
+    assert registry.render() == (
+        '# HELP http_requests_total Requests by source\n'
+        '# TYPE http_requests_total counter\n'
+        'http_requests_total{source="CORE",status="200"} 3\n'
+        'http_requests_total{source="Eu\\"rope\\\\PMC",status="404"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["call"], buckets=[0.1, 1.0])
+    
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, call="pdf")
+    
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{call="pdf",le="0.1"} 1',
+        'latency_seconds_bucket{call="pdf",le="1"} 3',
+        'latency_seconds_bucket{call="pdf",le="+Inf"} 4',
+        'latency_seconds_sum{call="pdf"} 4.25',
+        'latency_seconds_count{call="pdf"} 4',
+    ]
+
+
+def test_metrics_render_in_name_order():
+    registry = MetricsRegistry()
+    registry.counter("b_total", "B").inc()
+    registry.counter("a_total", "A").inc()
+    
+    names = [line.split()[2] for line in registry.render().splitlines() if line.startswith("# TYPE")]
+    
+    assert names == ["a_total", "b_total"]
+
+
+def test_registering_again_returns_the_same_metric():
+    registry = MetricsRegistry()
+    counter = registry.counter("x_total", "X", ["source"])
+    
+    assert registry.counter("x_total", "X", ["source"]) is counter
+    with pytest.raises(ValueError):
+        registry.counter("x_total", "X", ["other"])
+    with pytest.raises(ValueError):
+        registry.histogram("x_total", "X", ["source"])
+
+
+def test_labels_must_match():
+    counter = MetricsRegistry().counter("x_total", "X", ["source"])
+    
+    with pytest.raises(ValueError):
+        counter.inc(call="pdf")
+
+
+def test_concurrent_increments_are_not_lost():
+    counter = MetricsRegistry().counter("x_total", "X", ["source"])
+    
+    def work():
+        for _ in range(1000):
+            counter.inc(source="CORE")
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert counter.get(source="CORE") == 8000
+
+
+@pytest.fixture
+def client(tmp_path):
+    previous = get_config()
+    config = AppConfig(data_dir=tmp_path / "data")
+    set_config(config)
+    with create_app(config).test_client() as client:
+        yield client
+    set_config(previous)
+    setup_logging()
+
+
+def test_metrics_endpoint_serves_the_process_registry(client):
+    get_metrics().counter("test_endpoint_total", "Counted by the endpoint test").inc()
+    
+    response = client.get("/api/metrics")
+    
+    assert response.status_code == 200
+    assert response.content_type == "text/plain; version=0.0.4; charset=utf-8"
+    assert "test_endpoint_total 1\n" in response.get_data(as_text=True)
@@ -0,0 +1,100 @@
+"""
+Tests for multi-file extraction
+"""
+
+import gzip
+
+from downloader.core.extractors import MultiFileExtractor, detect_format
+from downloader.core.extractors import cache as cache_module
+from downloader.core.extractors import multi
+from downloader.core.extractors.cache import ExtractionCache
+
+BIBTEX = """@article{a,
+  doi = {10.1000/one}
+}
+@article{b,
+  url = {https://doi.org/10.1000/two}
+}
+"""
+
+RAYYAN = "key;title;doi\n1;First;10.1000/ONE\n2;Third;10.1000/three\n"
+
+
+def _write(tmp_path):
+    bib = tmp_path / "export.bib"
+    bib.write_text(BIBTEX, encoding='utf-8')
+    csv = tmp_path / "rayyan.csv.gz"
+    with gzip.open(csv, 'wt', encoding='utf-8') as f:
+        f.write(RAYYAN)
+    other = tmp_path / "notes.txt"
+    other.write_text("nothing to see\n", encoding='utf-8')
+    return bib, csv, other
+
+
+def test_detect_format(tmp_path):
+    bib, csv, other = _write(tmp_path)
+    assert detect_format(bib) == "bibtex"
+    assert detect_format(csv) == "rayyan"
+    assert detect_format(other) is None
+
+
+def test_collect_merges_in_input_order(tmp_path):
+    bib, csv, other = _write(tmp_path)
+    
+    result = MultiFileExtractor().collect([bib, csv, other])
+    
+    assert result.dois == ['10.1000/one', '10.1000/three']
+    assert [f["new_dois"] for f in result.files] == [1, 1, 0]
+    assert result.files[2]["format"] is None
+    assert any("notes.txt" in error for error in result.errors)
+
+
+def test_explicit_scopus_format_takes_url_dois(tmp_path):
+    bib, csv, _ = _write(tmp_path)
+    
+    result = MultiFileExtractor().collect([bib, csv], formats=["scopus", None])
+    
+    assert result.dois == ['10.1000/one', '10.1000/two', '10.1000/three']
+    assert result.files[0]["format"] == "Scopus BibTeX"
+
+
+def test_pool_and_in_process_agree(tmp_path, monkeypatch):
+    bib, csv, _ = _write(tmp_path)
+    
+    monkeypatch.setattr(cache_module, "_cache", ExtractionCache())
+    in_process = MultiFileExtractor(parallel_min_bytes=1 << 30).collect([bib, csv])
+    monkeypatch.setattr(cache_module, "_cache", ExtractionCache())
+    pooled = MultiFileExtractor(parallel_min_bytes=0).collect([bib, csv])
+    
+    assert pooled.dois == in_process.dois
+    assert pooled.content_hash == in_process.content_hash
+
+
+def test_pooled_results_are_cached_in_the_parent(tmp_path, monkeypatch):
+    bib, csv, _ = _write(tmp_path)
+    monkeypatch.setattr(cache_module, "_cache", ExtractionCache())
+    first = MultiFileExtractor(parallel_min_bytes=0).collect([bib, csv])
+    
+    def no_jobs(self, jobs):
+        assert jobs == []
+        return []
+    
+    monkeypatch.setattr(MultiFileExtractor, "_run_jobs", no_jobs)
+    second = MultiFileExtractor(parallel_min_bytes=0).collect([bib, csv])
+    
+    assert second.dois == first.dois
+
+
+def test_shutdown_without_cancel_futures_before_python_39(monkeypatch):
+    calls = []
+    
+    class Pool:
+        def shutdown(self, **kwargs):
+            calls.append(kwargs)
+    
+    monkeypatch.setattr(multi, "_pool", Pool())
+    monkeypatch.setattr(multi.sys, "version_info", (3, 8, 18))
+    multi.shutdown_extraction_pool()
+    
+    assert calls == [{"wait": False}]
+    assert multi._pool is None
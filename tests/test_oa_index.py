@@ -0,0 +1,149 @@
+"""
+Tests for the OpenAlex/Unpaywall snapshot index
+"""
+
+import gzip
+import json
+import os
+import re
+
+import pytest
+
+from downloader.config import AppConfig, get_config, set_config
+from downloader.core.indexes import OAIndex
+from downloader.core.indexes import __main__ as cli
+from downloader.core.indexes import oa
+from downloader.core.indexes.oa import parse_record
+from downloader.utils import setup_logging
+
+OPENALEX_WORK = {
+    "doi": "https://doi.org/10.1000/OA.1",
+    "display_name": "An open paper",
+    "updated_date": "2024-03-01",
+    "best_oa_location": {"pdf_url": None, "is_oa": True},
+    "locations": [
+        {"is_oa": False, "pdf_url": "https://publisher.example/closed.pdf"},
+        {"is_oa": True, "pdf_url": "https://repo.example/oa1.pdf", "license": "cc-by", "version": "acceptedVersion",
+         "source": {"type": "repository"}},
+    ],
+}
+
+UNPAYWALL_RECORD = {
+    "doi": "10.1000/up.1",
+    "title": "Unpaywall paper",
+    "updated": "2024-02-01T00:00:00",
+    "best_oa_location": {"url_for_pdf": "https://publisher.example/up1.pdf", "license": "cc0",
+                         "host_type": "publisher", "version": "publishedVersion"},
+    "oa_locations": [],
+}
+
+
+def test_openalex_work_falls_back_to_oa_locations():
+    assert parse_record(OPENALEX_WORK) == (
+        "10.1000/oa.1", "https://repo.example/oa1.pdf", "cc-by", "repository", "acceptedVersion",
+        "An open paper", "OpenAlex", "2024-03-01",
+    )
+
+
+def test_closed_openalex_work_has_no_url():
+    work = {"doi": "10.1000/closed", "title": "Closed", "locations": [], "updated_date": "2024-01-01"}
+    assert parse_record(work) == ("10.1000/closed", None, None, None, None, "Closed", "OpenAlex", "2024-01-01")
+
+
+def test_unpaywall_record():
+    assert parse_record(UNPAYWALL_RECORD) == (
+        "10.1000/up.1", "https://publisher.example/up1.pdf", "cc0", "publisher", "publishedVersion",
+        "Unpaywall paper", "Unpaywall", "2024-02-01T00:00:00",
+    )
+
+
+def test_record_without_doi_is_skipped():
+    assert parse_record({"doi": None, "locations": []}) is None
+
+
+def _write_lines(path, records):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write("not json\n")
+
+
+def test_import_and_lookup(tmp_path):
+    _write_lines(tmp_path / "works.jsonl.gz", [OPENALEX_WORK, UNPAYWALL_RECORD])
+    index = OAIndex(tmp_path / "oa.sqlite")
+    
+    summary = index.import_files([tmp_path])
+    
+    assert summary == {'files_imported': 1, 'files_skipped': 0, 'records': 2}
+    assert index.lookup("10.1000/OA.1")["url"] == "https://repo.example/oa1.pdf"
+    assert index.lookup("doi:10.1000/up.1")["origin"] == "Unpaywall"
+    assert index.lookup("10.1000/missing") is None
+
+
+def test_unchanged_files_are_not_imported_again(tmp_path):
+    snapshot = tmp_path / "snapshot"
+    snapshot.mkdir()
+    _write_lines(snapshot / "part_000.gz", [OPENALEX_WORK])
+    index = OAIndex(tmp_path / "oa.sqlite")
+    index.import_files([snapshot])
+    
+    assert index.import_files([snapshot]) == {'files_imported': 0, 'files_skipped': 1, 'records': 0}
+    assert index.import_files([snapshot], force=True)['files_imported'] == 1
+    
+    # A changed modification time (or size) means a new version of the file
+    stat = (snapshot / "part_000.gz").stat()
+    os.utime(snapshot / "part_000.gz", (stat.st_atime, stat.st_mtime + 10))
+    assert index.import_files([snapshot])['files_imported'] == 1
+
+
+def test_newer_records_win(tmp_path):
+    index = OAIndex(tmp_path / "oa.sqlite")
+    newer = dict(UNPAYWALL_RECORD, updated="2024-06-01T00:00:00",
+                 best_oa_location=dict(UNPAYWALL_RECORD["best_oa_location"], url_for_pdf="https://new.example/up1.pdf"))
+    _write_lines(tmp_path / "a.jsonl.gz", [newer])
+    _write_lines(tmp_path / "b.jsonl.gz", [UNPAYWALL_RECORD])
+    
+    index.import_files([tmp_path / "a.jsonl.gz", tmp_path / "b.jsonl.gz"])
+    
+    assert index.lookup("10.1000/up.1")["url"] == "https://new.example/up1.pdf"
+
+
+def test_newer_closed_record_removes_the_doi(tmp_path):
+    index = OAIndex(tmp_path / "oa.sqlite")
+    closed = dict(UNPAYWALL_RECORD, updated="2024-06-01T00:00:00", best_oa_location=None)
+    _write_lines(tmp_path / "a.jsonl.gz", [UNPAYWALL_RECORD])
+    _write_lines(tmp_path / "b.jsonl.gz", [closed])
+    
+    index.import_files([tmp_path / "a.jsonl.gz"])
+    index.import_files([tmp_path / "b.jsonl.gz"])
+    
+    assert index.lookup("10.1000/up.1") is None
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    previous = get_config()
+    config = AppConfig(data_dir=tmp_path / "data")
+    set_config(config)
+    monkeypatch.setattr(oa, "_oa_index", None)
+    yield config
+    set_config(previous)
+    setup_logging()  # the command logs to the test's data directory
+
+
+def _printed_json(capsys):
+    # Log records share stdout with the command's output
+    out = capsys.readouterr().out.splitlines()
+    return json.loads("\n".join(line for line in out if not re.match(r"\d{4}-\d\d-\d\d ", line)))
+
+
+def test_cli_imports_and_looks_up(config, tmp_path, capsys):
+    _write_lines(tmp_path / "works.jsonl.gz", [OPENALEX_WORK])
+    
+    assert cli.main(["import", "oa", str(tmp_path / "works.jsonl.gz")]) == 0
+    assert _printed_json(capsys)["records"] == 1
+    
+    assert cli.main(["lookup", "10.1000/oa.1"]) == 0
+    found = _printed_json(capsys)
+    assert found["oa"]["url"] == "https://repo.example/oa1.pdf"
+    assert config.oa_index_file.exists()
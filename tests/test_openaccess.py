@@ -0,0 +1,103 @@
+"""
+Tests for the open-access downloader's job plumbing
+"""
+
+import threading
+import time
+
+import pytest
+
+from downloader.config.settings import AppConfig, get_config, set_config
+from downloader.core.downloaders import ScienceDownloader
+from downloader.core.downloaders.candidates import Candidate
+from downloader.utils.tracing import Tracer
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    previous = get_config()
+    config = AppConfig(data_dir=tmp_path, use_oa_index=False, use_pmc_index=False, use_arxiv_index=False,
+                       delay_between_downloads=0)
+    set_config(config)
+    downloader = ScienceDownloader(config)
+    yield downloader
+    downloader.close()
+    set_config(previous)
+
+
+def _candidate(name: str) -> Candidate:
+    return Candidate(url=f"https://{name}.example/paper.pdf", source="CORE", label="CORE", filename=f"{name}.pdf")
+
+
+def test_race_spans_nest_under_the_fetch_span(downloader, monkeypatch):
+    downloader.tracer = Tracer()
+    
+    def open_candidate(candidate, doi):
+        time.sleep(0.05 if "slow" in candidate.url else 0.01)
+        return {'success': "slow" in candidate.url, 'candidate': candidate, 'error': 'not a PDF'}
+    
+    monkeypatch.setattr(downloader, "_open_candidate", open_candidate)
+    monkeypatch.setattr(downloader, "_close_opened", lambda opened: None)
+    
+    with downloader.tracer.span("10.1000/x", "fetch") as fetch:
+        opened, failures = downloader._race_candidates([_candidate("fast"), _candidate("slow")], "10.1000/x")
+    
+    assert opened['candidate'].url == "https://slow.example/paper.pdf"
+    assert [failure['candidate'].url for failure in failures] == ["https://fast.example/paper.pdf"]
+    races = [span for span in downloader.tracer.spans() if span.category == "candidate"]
+    assert len(races) == 2
+    assert all(span.parent_id == fetch.span_id for span in races)
+
+
+def test_races_share_one_pool(downloader, monkeypatch):
+    threads = set()
+    
+    def open_candidate(candidate, doi):
+        threads.add(threading.current_thread().name)
+        return {'success': False, 'candidate': candidate, 'error': 'not a PDF'}
+    
+    monkeypatch.setattr(downloader, "_open_candidate", open_candidate)
+    before = threading.active_count()
+    
+    for i in range(20):
+        downloader._race_candidates([_candidate(f"a{i}"), _candidate(f"b{i}")], "10.1000/x")
+    
+    assert all(name.startswith("candidate-race") for name in threads)
+    assert threading.active_count() - before <= downloader._race_pool._max_workers
+
+
+def test_close_stops_worker_threads(downloader, monkeypatch):
+    monkeypatch.setattr(downloader, "_open_candidate",
+                        lambda candidate, doi: {'success': False, 'candidate': candidate, 'error': 'not a PDF'})
+    downloader._race_candidates([_candidate("a"), _candidate("b")], "10.1000/x")
+    list(downloader._lookup_pool.map(str, range(4)))
+    list(downloader._batch_pool.map(str, range(4)))
+    
+    downloader.close()
+    
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        names = [thread.name for thread in threading.enumerate()]
+        if not any(name.startswith(("candidate-race", "source-lookup", "batch-resolve")) for name in names):
+            break
+        time.sleep(0.05)
+    assert not any(name.startswith(("candidate-race", "source-lookup", "batch-resolve")) for name in names)
+
+
+def test_dois_read_from_an_upload_are_filtered_once(downloader, monkeypatch, tmp_path):
+    filter_calls = []
+    filter_dois = downloader._filter_dois
+    
+    def counting_filter(lines):
+        filter_calls.append(1)
+        return filter_dois(lines)
+    
+    processed = []
+    monkeypatch.setattr(downloader, "_filter_dois", counting_filter)
+    monkeypatch.setattr(downloader, "_process_dois", lambda dois, output: processed.append(dois) or {'success': True})
+    
+    dois = downloader.read_dois(["10.1000/a", "# comment", "doi:10.1000/A", "10.1000/b"])
+    downloader.download_papers(dois, tmp_path / "papers", filtered=True)
+    
+    assert processed == [["10.1000/a", "10.1000/b"]]
+    assert len(filter_calls) == 1
@@ -0,0 +1,104 @@
+"""
+Tests for the two-stage resolve/fetch pipeline
+"""
+
+import threading
+import time
+
+from downloader.core.downloaders.pipeline import Pipeline
+
+
+def test_every_item_is_resolved_and_fetched():
+    resolved, fetched = [], []
+    lock = threading.Lock()
+    
+    def resolve(item):
+        with lock:
+            resolved.append(item)
+        return item
+    
+    def fetch(item):
+        with lock:
+            fetched.append(item)
+        return None
+    
+    Pipeline(resolve, fetch, resolve_workers=3, fetch_workers=2, queue_size=2).run(range(50))
+    
+    assert sorted(resolved) == list(range(50))
+    assert sorted(fetched) == list(range(50))
+
+
+def test_resolve_can_finish_items():
+    fetched = []
+    Pipeline(lambda item: item if item % 2 else None, fetched.append,
+             resolve_workers=1, fetch_workers=1).run(range(10))
+    
+    assert sorted(fetched) == [1, 3, 5, 7, 9]
+
+
+def test_sent_back_items_are_resolved_again_before_new_items():
+    resolve_order = []
+    attempts = {}
+    
+    def resolve(item):
+        resolve_order.append(item)
+        return item
+    
+    def fetch(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        # The first item fails its first candidates and goes back for more
+        return item if item == 0 and attempts[item] == 1 else None
+    
+    Pipeline(resolve, fetch, resolve_workers=1, fetch_workers=1, queue_size=1).run(range(20))
+    
+    assert attempts == {i: 2 if i == 0 else 1 for i in range(20)}
+    # Only the items already resolved or queued when 0 came back are ahead of it
+    assert resolve_order.index(0, 1) <= 4
+
+
+def test_resolvers_wait_while_fetching_falls_behind():
+    release = threading.Event()
+    resolved = []
+    
+    def resolve(item):
+        resolved.append(item)
+        return item
+    
+    def fetch(item):
+        release.wait(5)
+    
+    pipeline = Pipeline(resolve, fetch, resolve_workers=1, fetch_workers=1, queue_size=2)
+    runner = threading.Thread(target=pipeline.run, args=(range(100),))
+    runner.start()
+    time.sleep(0.5)
+    
+    # One item being fetched, queue_size items queued and one waiting to be queued
+    assert len(resolved) <= 4
+    
+    release.set()
+    runner.join(10)
+    assert not runner.is_alive()
+    assert len(resolved) == 100
+
+
+def test_stop_drops_queued_items_and_returns_promptly():
+    stopped = threading.Event()
+    release = threading.Event()
+    fetched = []
+    
+    def fetch(item):
+        fetched.append(item)
+        release.wait(10)
+    
+    pipeline = Pipeline(lambda item: item, fetch, resolve_workers=2, fetch_workers=1, queue_size=5,
+                        stopped=stopped.is_set, stop_grace=0.3)
+    threading.Timer(0.3, stopped.set).start()
+    
+    started = time.monotonic()
+    pipeline.run(range(1000))
+    elapsed = time.monotonic() - started
+    release.set()
+    
+    # The busy fetch is abandoned after stop_grace instead of being waited for
+    assert elapsed < 2.0
+    assert len(fetched) == 1
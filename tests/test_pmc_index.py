@@ -0,0 +1,78 @@
+"""
+Tests for the PMC Open Access file-list index
+"""
+
+import gzip
+
+from downloader.core.indexes import PMCIndex
+
+PMC_IDS = (
+    "Journal Title,ISSN,eISSN,Year,Volume,Issue,Page,DOI,PMCID,PMID,Manuscript Id,Release Date\n"
+    "J Test,1,2,2020,1,1,1,10.1000/PMC.1,PMC100,111,,live\n"
+    "J Test,1,2,2020,1,1,2,10.1000/pmc.2,PMC200,222,,live\n"
+    "J Test,1,2,2020,1,1,3,10.1000/pmc.3,PMC300,,,live\n"
+)
+
+OA_FILE_LIST = (
+    "File,Article Citation,Accession ID,Last Updated (YYYY-MM-DD HH:MM:SS),PMID,License\n"
+    "oa_package/00/01/PMC100.tar.gz,J Test. 2020,PMC100,2023-05-01 10:00:00,PMID:111,CC BY\n"
+    "oa_package/00/02/PMC200.tar.gz,J Test. 2020,PMC200,2023-05-02 10:00:00,PMID:222,CC BY-NC\n"
+)
+
+OA_PDF_LIST = (
+    "File,Article Citation,Accession ID,Last Updated (YYYY-MM-DD HH:MM:SS),PMID,License\n"
+    "oa_pdf/00/01/test.PMC100.pdf,J Test. 2020,PMC100,2023-06-01 10:00:00,PMID:111,CC BY\n"
+)
+
+
+def _build(tmp_path):
+    with gzip.open(tmp_path / "PMC-ids.csv.gz", 'wt', encoding='utf-8') as f:
+        f.write(PMC_IDS)
+    (tmp_path / "oa_file_list.csv").write_text(OA_FILE_LIST, encoding='utf-8')
+    (tmp_path / "oa_comm_use_pdf.csv").write_text(OA_PDF_LIST, encoding='utf-8')
+    index = PMCIndex(tmp_path / "index" / "pmc.sqlite")
+    summary = index.import_files([tmp_path / "PMC-ids.csv.gz", tmp_path / "oa_file_list.csv",
+                                  tmp_path / "oa_comm_use_pdf.csv"])
+    return index, summary
+
+
+def test_ids_and_file_lists_are_joined_by_pmcid(tmp_path):
+    index, summary = _build(tmp_path)
+    
+    assert summary['records'] == 6
+    assert index.lookup("10.1000/pmc.1") == {
+        'pmcid': 'PMC100', 'pmid': '111', 'package': 'oa_package/00/01/PMC100.tar.gz',
+        'pdf': 'oa_pdf/00/01/test.PMC100.pdf', 'license': 'CC BY', 'updated': '2023-06-01 10:00:00',
+    }
+    assert index.lookup("10.1000/PMC.2")['pdf'] is None
+
+
+def test_articles_outside_the_oa_subset_are_not_found(tmp_path):
+    index, _ = _build(tmp_path)
+    
+    # PMC300 has a PMCID but is in no OA file list
+    assert index.lookup("10.1000/pmc.3") is None
+    assert index.lookup("10.1000/unknown") is None
+
+
+def test_legacy_tab_separated_list(tmp_path):
+    (tmp_path / "PMC-ids.csv").write_text(PMC_IDS, encoding='utf-8')
+    (tmp_path / "oa_file_list.txt").write_text(
+        "2023-05-01 10:00:00\n"
+        "oa_package/00/03/PMC300.tar.gz\tJ Test. 2020\tPMC300\tPMID:333\tCC0\n",
+        encoding='utf-8'
+    )
+    index = PMCIndex(tmp_path / "pmc.sqlite")
+    
+    index.import_files([tmp_path / "PMC-ids.csv", tmp_path / "oa_file_list.txt"])
+    
+    assert index.lookup("10.1000/pmc.3")['package'] == "oa_package/00/03/PMC300.tar.gz"
+    assert index.lookup("10.1000/pmc.3")['license'] == "CC0"
+
+
+def test_unrelated_csv_is_skipped(tmp_path):
+    (tmp_path / "other.csv").write_text("a,b\n1,2\n", encoding='utf-8')
+    
+    summary = PMCIndex(tmp_path / "pmc.sqlite").import_files([tmp_path / "other.csv"])
+    
+    assert summary['records'] == 0
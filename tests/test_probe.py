@@ -0,0 +1,121 @@
+"""
+Tests for the ranged pre-flight probe of candidate URLs
+"""
+
+import requests
+
+from downloader.core.downloaders.probe import PROBE_BYTES, probe_url
+
+
+PDF_HEAD = b"%PDF-1.7\n" + b"x" * 2000
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {key.lower(): value for key, value in (headers or {}).items()}
+        self.read = 0
+        self.closed = False
+    
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            self.read += len(self.body[start:start + chunk_size])
+            yield self.body[start:start + chunk_size]
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeGet:
+    """Answers every probe with one response and keeps the request arguments"""
+    
+    def __init__(self, response):
+        self.response = response
+        self.kwargs = None
+    
+    def __call__(self, **kwargs):
+        self.kwargs = kwargs
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def test_probe_asks_for_the_first_kilobyte_only():
+    get = FakeGet(FakeResponse(206, PDF_HEAD[:PROBE_BYTES], {"Content-Range": "bytes 0-1023/250000"}))
+    
+    probe_url(get, timeout=7)
+    
+    assert get.kwargs == {"headers": {"Range": "bytes=0-1023"}, "timeout": 7, "stream": True}
+    assert get.response.closed
+
+
+def test_partial_content_takes_size_from_content_range():
+    response = FakeResponse(206, PDF_HEAD[:PROBE_BYTES],
+                            {"Content-Type": "application/pdf", "Content-Range": "bytes 0-1023/250000",
+                             "Content-Length": "1024"})
+    
+    result = probe_url(FakeGet(response), timeout=5)
+    
+    assert result.verdict == "pdf"
+    assert result.status == 206
+    assert result.content_length == 250000
+    assert not result.rejected
+
+
+def test_partial_content_of_a_tiny_file_is_rejected():
+    response = FakeResponse(206, b"%PDF-1.4\n", {"Content-Range": "bytes 0-8/9"})
+    
+    result = probe_url(FakeGet(response), timeout=5)
+    
+    assert result.rejected
+    assert "too small" in result.reason
+
+
+def test_full_response_to_a_ranged_request_reads_only_the_head():
+    # Servers that ignore Range answer 200 with the whole body
+    body = PDF_HEAD + b"y" * 100_000
+    response = FakeResponse(200, body, {"Content-Type": "application/octet-stream",
+                                        "Content-Length": str(len(body))})
+    
+    result = probe_url(FakeGet(response), timeout=5)
+    
+    assert result.verdict == "pdf"
+    assert result.status == 200
+    assert result.content_length == len(body)
+    assert response.read == PROBE_BYTES
+    assert response.closed
+
+
+def test_full_response_with_html_is_rejected():
+    by_type = probe_url(FakeGet(FakeResponse(200, b"<html>", {"Content-Type": "text/html; charset=utf-8"})), 5)
+    by_content = probe_url(FakeGet(FakeResponse(200, b"\n<!DOCTYPE html><html>" + b" " * 2000)), 5)
+    
+    assert by_type.rejected and "Content-Type" in by_type.reason
+    assert by_content.rejected and by_content.reason == "content is an HTML page"
+
+
+def test_unrecognised_bytes_are_inconclusive():
+    result = probe_url(FakeGet(FakeResponse(200, b"\x00" * 4096, {"Content-Length": "4096"})), 5)
+    
+    assert result.verdict == "unknown"
+    assert not result.rejected
+
+
+def test_range_not_satisfiable_falls_back_to_full_download():
+    response = FakeResponse(416, b"", {"Content-Type": "text/html", "Content-Range": "bytes */0"})
+    
+    result = probe_url(FakeGet(response), timeout=5)
+    
+    assert result.verdict == "unknown"
+    assert result.reason == "HTTP 416"
+    assert result.status == 416
+    assert not result.rejected
+    assert response.closed
+
+
+def test_request_errors_are_inconclusive():
+    result = probe_url(FakeGet(requests.exceptions.ConnectTimeout()), timeout=5)
+    
+    assert result.verdict == "unknown"
+    assert result.reason == "probe failed: ConnectTimeout"
@@ -0,0 +1,131 @@
+"""
+Tests for reading compressed input files and uploads
+"""
+
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from downloader.utils import streams
+from downloader.utils.streams import open_decompressed, open_text_input
+
+
+TEXT = "doi\n10.1000/ä\n" + "".join(f"10.1000/{i}\n" for i in range(5000))
+
+
+class OneWayStream(io.RawIOBase):
+    """Readable stream that cannot seek, like a request body"""
+    
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _read_text(path):
+    with open_text_input(path) as (stream, name):
+        return stream.read(), name
+
+
+def test_plain_file_is_read_as_is(tmp_path):
+    path = tmp_path / "dois.txt"
+    path.write_bytes(TEXT.encode('utf-8'))
+    
+    assert _read_text(path) == (TEXT, "dois.txt")
+
+
+def test_gzip_is_detected_and_suffix_stripped(tmp_path):
+    path = tmp_path / "dois.csv.gz"
+    path.write_bytes(gzip.compress(TEXT.encode('utf-8')))
+    
+    assert _read_text(path) == (TEXT, "dois.csv")
+
+
+def test_compression_is_detected_by_content_not_name(tmp_path):
+    path = tmp_path / "dois.csv"
+    path.write_bytes(gzip.compress(TEXT.encode('utf-8')))
+    
+    assert _read_text(path) == (TEXT, "dois.csv")
+
+
+def test_zstd_is_decompressed(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "dois.csv.zst"
+    # Two frames, as written by concatenating zstd files
+    compressor = zstandard.ZstdCompressor()
+    data = TEXT.encode('utf-8')
+    half = len(data) // 2
+    path.write_bytes(compressor.compress(data[:half]) + compressor.compress(data[half:]))
+    
+    assert _read_text(path) == (TEXT, "dois.csv")
+
+
+def test_zstd_without_the_package_is_a_clear_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(streams, "zstandard", None)
+    path = tmp_path / "dois.csv.zst"
+    path.write_bytes(b'\x28\xb5\x2f\xfd' + b'\x00' * 16)
+    
+    with pytest.raises(ValueError, match="zstandard"):
+        _read_text(path)
+
+
+def test_zip_yields_first_file_member(tmp_path):
+    path = tmp_path / "export.zip"
+    path.write_bytes(_zip([("export/", ""), ("export/savedrecs.txt", TEXT), ("export/other.txt", "ignored")]))
+    
+    assert _read_text(path) == (TEXT, "savedrecs.txt")
+
+
+def test_zip_without_files_is_rejected(tmp_path):
+    path = tmp_path / "empty.zip"
+    path.write_bytes(_zip([("folder/", "")]))
+    
+    with pytest.raises(ValueError, match="contains no files"):
+        _read_text(path)
+
+
+def test_decoding_errors_follow_the_errors_argument(tmp_path):
+    path = tmp_path / "latin1.txt.gz"
+    path.write_bytes(gzip.compress("10.1000/é\n".encode('latin-1')))
+    
+    with open_text_input(path, errors='replace') as (stream, _):
+        assert stream.read() == "10.1000/�\n"
+    with pytest.raises(UnicodeDecodeError):
+        _read_text(path)
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, lambda data: _zip([("dois.txt", data)])], ids=["gzip", "zip"])
+def test_non_seekable_streams_are_decompressed(compress):
+    stream, _ = open_decompressed(OneWayStream(compress(TEXT.encode('utf-8'))), "upload")
+    with stream:
+        assert stream.read().decode('utf-8') == TEXT
+
+
+def test_non_seekable_plain_stream_keeps_its_first_bytes():
+    stream, name = open_decompressed(OneWayStream(TEXT.encode('utf-8')), "upload.txt")
+    
+    assert name == "upload.txt"
+    assert stream.read().decode('utf-8') == TEXT
+
+
+def test_seekable_stream_is_rewound_to_where_it_was():
+    raw = io.BytesIO(b"header" + gzip.compress(TEXT.encode('utf-8')))
+    raw.seek(len(b"header"))
+    
+    stream, _ = open_decompressed(raw, "dois.gz")
+    
+    assert stream.read().decode('utf-8') == TEXT
@@ -0,0 +1,84 @@
+"""
+Tests for the streaming BibTeX tokenizer
+"""
+
+import io
+
+from downloader.core.extractors import ScopusExtractor
+from downloader.core.extractors.tokenizer import iter_bibtex_dois, iter_bibtex_entries
+
+BIBTEX = """@article{first,
+  title = {First},
+  doi = {10.1000/ABC}
+}
+@article{second,
+  title = {Second},
+  url = {https://doi.org/10.1000/def}
+}
+@inproceedings{third,
+  title = {Third},
+  doi = "10.1000/ghi"
+}
+"""
+
+
+def _split(text, chunk_size=1024, sniff=0):
+    stream = io.StringIO(text)
+    prefix = stream.read(sniff) if sniff else ""
+    return list(iter_bibtex_entries(stream, chunk_size, prefix))
+
+
+class TestIterBibtexEntries:
+    
+    def test_splits_entries(self):
+        entries = _split(BIBTEX)
+        assert [entry.split('{', 1)[1].split(',', 1)[0] for entry in entries] == ['first', 'second', 'third']
+    
+    def test_entries_rejoin_to_input(self):
+        for chunk_size in (1, 7, 64, 4096):
+            assert "".join(_split(BIBTEX, chunk_size)) == BIBTEX
+    
+    def test_file_smaller_than_sniffed_prefix(self):
+        # The whole file is consumed while sniffing, so only the prefix is left to split
+        entries = _split(BIBTEX, sniff=1000)
+        assert len(entries) == 3
+        assert "".join(entries) == BIBTEX
+    
+    def test_prefix_followed_by_chunks(self):
+        for sniff in (1, 30, len(BIBTEX) - 1):
+            entries = _split(BIBTEX, chunk_size=16, sniff=sniff)
+            assert len(entries) == 3
+            assert "".join(entries) == BIBTEX
+    
+    def test_at_sign_inside_entry_does_not_split(self):
+        text = "@misc{a,\n  note = {mail me@example.org},\n  doi = {10.1000/x}\n}\n"
+        assert _split(text, chunk_size=5) == [text]
+    
+    def test_empty_input(self):
+        assert _split("") == []
+        assert _split("\n\n", sniff=1000) == []
+
+
+class TestIterBibtexDois:
+    
+    def test_url_fallback_per_entry(self):
+        stream = io.StringIO(BIBTEX)
+        dois = list(iter_bibtex_dois(stream, include_urls=True, prefix=stream.read(1000)))
+        assert dois == ['10.1000/ABC', '10.1000/def', '10.1000/ghi']
+    
+    def test_urls_ignored_without_include_urls(self):
+        dois = list(iter_bibtex_dois(io.StringIO(BIBTEX)))
+        assert dois == ['10.1000/ABC', '10.1000/ghi']
+    
+    def test_doi_field_preferred_over_url(self):
+        text = "@article{a,\n  doi = {10.1000/field},\n  url = {https://doi.org/10.1000/link}\n}\n"
+        assert list(iter_bibtex_dois(io.StringIO(text), include_urls=True)) == ['10.1000/field']
+
+
+def test_scopus_small_file_keeps_url_only_dois(tmp_path):
+    bib = tmp_path / "scopus.bib"
+    bib.write_text(BIBTEX, encoding='utf-8')
+    
+    result = ScopusExtractor().collect(bib)
+    
+    assert sorted(doi.lower() for doi in result.dois) == ['10.1000/abc', '10.1000/def', '10.1000/ghi']
@@ -0,0 +1,139 @@
+"""
+Tests for span tracing across threads and its exports
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from downloader.utils.tracing import Tracer
+
+
+def test_nested_spans_on_one_thread_form_a_tree():
+    tracer = Tracer()
+    
+    with tracer.span("doi", "doi") as outer:
+        with tracer.span("resolve", "resolve") as inner:
+            assert tracer.current() is inner
+        assert tracer.current() is outer
+    
+    assert tracer.current() is None
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    # Spans are recorded as they close, innermost first
+    assert [span.name for span in tracer.spans()] == ["resolve", "doi"]
+
+
+def test_other_threads_do_not_inherit_the_active_span():
+    tracer = Tracer()
+    
+    def fetch():
+        with tracer.span("fetch") as span:
+            return span
+    
+    with tracer.span("doi"):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            orphan = pool.submit(fetch).result()
+    
+    assert orphan.parent_id is None
+
+
+def test_explicit_parent_links_spans_across_threads():
+    tracer = Tracer()
+    children = []
+    
+    def work(parent, index):
+        with tracer.span("candidate", "fetch", parent=parent, index=index) as child:
+            with tracer.span("http", "http") as grandchild:
+                children.append((child, grandchild))
+    
+    with tracer.span("doi", "doi") as parent:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(work, [tracer.current()] * 8, range(8)))
+    
+    assert len(children) == 8
+    for child, grandchild in children:
+        assert child.parent_id == parent.span_id
+        assert grandchild.parent_id == child.span_id
+        assert child.thread != parent.thread
+    assert sorted(child.attrs["index"] for child, _ in children) == list(range(8))
+    assert len({span.span_id for span in tracer.spans()}) == 17
+
+
+def test_started_span_outlives_its_thread():
+    tracer = Tracer()
+    
+    with tracer.span("job") as job:
+        doi = tracer.start("doi", "doi", doi="10.1000/a")
+    # The span is not active anywhere; work on it names it as parent
+    assert tracer.current() is None
+    
+    def fetch():
+        with tracer.span("fetch", "fetch", parent=doi):
+            pass
+    
+    thread = threading.Thread(target=fetch)
+    thread.start()
+    thread.join()
+    tracer.finish(doi, status="success")
+    
+    spans = {span.name: span for span in tracer.spans()}
+    assert spans["doi"].parent_id == job.span_id
+    assert spans["fetch"].parent_id == doi.span_id
+    assert spans["doi"].attrs == {"doi": "10.1000/a", "status": "success"}
+    assert spans["doi"].end is not None
+
+
+def test_error_is_recorded_and_stack_unwound():
+    tracer = Tracer()
+    
+    with pytest.raises(ValueError):
+        with tracer.span("doi"):
+            with tracer.span("fetch"):
+                raise ValueError("boom")
+    
+    assert tracer.current() is None
+    assert [span.attrs for span in tracer.spans()] == [{"error": "ValueError"}, {"error": "ValueError"}]
+
+
+def test_disabled_tracer_yields_spans_but_records_nothing():
+    tracer = Tracer(enabled=False)
+    
+    with tracer.span("doi") as span:
+        span.set(status="success")
+        tracer.finish(tracer.start("fetch"))
+    
+    assert span.attrs == {"status": "success"}
+    assert tracer.spans() == []
+
+
+def test_spans_over_the_limit_are_counted_as_dropped():
+    tracer = Tracer(max_spans=3)
+    
+    for _ in range(5):
+        with tracer.span("http"):
+            pass
+    
+    assert len(tracer.spans()) == 3
+    assert tracer.dropped == 2
+
+
+def test_exports_keep_parent_links(tmp_path):
+    tracer = Tracer()
+    with tracer.span("doi", "doi") as parent:
+        thread = threading.Thread(target=lambda: tracer.finish(tracer.start("fetch", "fetch", parent=parent)))
+        thread.start()
+        thread.join()
+    
+    lines = tracer.export_jsonl(tmp_path / "trace.jsonl").read_text(encoding="utf-8").splitlines()
+    chrome = json.loads(tracer.export_chrome(tmp_path / "trace.json").read_text(encoding="utf-8"))
+    
+    records = [json.loads(line) for line in lines]
+    assert [record["name"] for record in records] == ["doi", "fetch"]
+    assert records[1]["parent_id"] == records[0]["span_id"]
+    events = chrome["traceEvents"]
+    assert [(event["name"], event["cat"], event["ph"]) for event in events] == [("doi", "doi", "X"),
+                                                                                ("fetch", "fetch", "X")]
+    assert events[0]["tid"] != events[1]["tid"]
@@ -0,0 +1,185 @@
+"""
+Tests for the cached DNS resolution and the HTTP/2 client's error mapping
+"""
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from downloader.core.downloaders import transport
+from downloader.core.downloaders.transport import DnsCache, create_session
+
+
+@pytest.fixture
+def fake_dns(monkeypatch):
+    """Resolve names in the returned dict; everything else (e.g. IPs) goes to the real resolver"""
+    hosts = {}
+    lookups = []
+    real_getaddrinfo = socket.getaddrinfo
+    
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host not in hosts:
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        lookups.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in hosts[host]]
+    
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    hosts["lookups"] = lookups
+    return hosts
+
+
+def test_cache_hits_until_ttl_expires(fake_dns):
+    fake_dns["api.example"] = ["10.0.0.1", "10.0.0.2", "10.0.0.1"]
+    cache = DnsCache(ttl=0.2)
+    
+    assert cache.resolve("api.example", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert cache.resolve("api.example", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    time.sleep(0.3)
+    cache.resolve("api.example", 443)
+    assert fake_dns["lookups"] == ["api.example", "api.example"]
+
+
+def test_invalidate_drops_every_port_of_a_host(fake_dns):
+    fake_dns["api.example"] = ["10.0.0.1"]
+    cache = DnsCache()
+    cache.resolve("api.example", 80)
+    cache.resolve("api.example", 443)
+    
+    cache.invalidate("api.example")
+    cache.resolve("api.example", 443)
+    
+    assert cache.misses == 3
+
+
+def test_full_cache_drops_expired_entries(fake_dns):
+    for i in range(3):
+        fake_dns[f"host{i}.example"] = ["10.0.0.1"]
+    cache = DnsCache(ttl=0.1, max_entries=2)
+    cache.resolve("host0.example", 443)
+    cache.resolve("host1.example", 443)
+    time.sleep(0.2)
+    
+    cache.resolve("host2.example", 443)
+    
+    assert list(cache._entries) == [("host2.example", 443)]
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.headers["Host"].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = HTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_connects_to_the_next_cached_address(fake_dns, local_server, monkeypatch):
+    # Nothing listens on 127.0.0.2, so that connection is refused and the next address is tried
+    fake_dns["api.example"] = ["127.0.0.2", "127.0.0.1"]
+    monkeypatch.setattr(transport, "_dns_cache", DnsCache())
+    session = create_session(SimpleNamespace(dns_cache_ttl=300, http_pool_size=2))
+    
+    response = session.get(f"http://api.example:{local_server}/works", timeout=5)
+    session.close()
+    
+    assert response.status_code == 200
+    assert response.text == f"api.example:{local_server}"
+    assert fake_dns["lookups"] == ["api.example"]
+
+
+def test_session_evicts_host_when_no_address_connects(fake_dns, local_server, monkeypatch):
+    fake_dns["api.example"] = ["127.0.0.2"]
+    cache = DnsCache()
+    monkeypatch.setattr(transport, "_dns_cache", cache)
+    session = create_session(SimpleNamespace(dns_cache_ttl=300, http_pool_size=2))
+    
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"http://api.example:{local_server}/works", timeout=5)
+    session.close()
+    
+    assert cache._entries == {}
+
+
+@pytest.fixture
+def http2_client(monkeypatch):
+    """Build an Http2Client whose httpx client answers through handler instead of the network"""
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    real_client = httpx.Client
+    
+    def build(handler):
+        monkeypatch.setattr(httpx, "Client", lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+        return transport.Http2Client({"User-Agent": "test"})
+    
+    return build
+
+
+def test_http2_client_follows_redirects(http2_client):
+    import httpx
+    
+    def handler(request):
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"Location": "https://api.example/new"})
+        return httpx.Response(200, json={"path": request.url.path})
+    
+    client = http2_client(handler)
+    response = client.get("https://api.example/old")
+    client.close()
+    
+    assert response.status_code == 200
+    assert response.json() == {"path": "/new"}
+    assert response.url == "https://api.example/new"
+
+
+@pytest.mark.parametrize("error, expected", [
+    ("ConnectTimeout", requests.exceptions.Timeout),
+    ("ReadTimeout", requests.exceptions.Timeout),
+    ("ConnectError", requests.exceptions.ConnectionError),
+    ("RemoteProtocolError", requests.exceptions.ConnectionError),
+    ("DecodingError", requests.exceptions.RequestException),
+])
+def test_http2_errors_become_requests_errors(http2_client, error, expected):
+    import httpx
+    
+    def handler(request):
+        raise getattr(httpx, error)("failed", request=request)
+    
+    client = http2_client(handler)
+    with pytest.raises(expected) as raised:
+        client.get("https://api.example/works")
+    client.close()
+    
+    assert isinstance(raised.value.__cause__, httpx.HTTPError)
+
+
+def test_http2_status_errors_match_requests(http2_client):
+    import httpx
+    
+    client = http2_client(lambda request: httpx.Response(503))
+    response = client.get("https://api.example/works")
+    client.close()
+    
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        response.raise_for_status()
+    assert raised.value.response is response
+    assert "503 Server Error" in str(raised.value)
@@ -0,0 +1,85 @@
+"""
+Tests for streamed uploads to the extraction routes
+"""
+
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from downloader.config import AppConfig, get_config, set_config
+from downloader.utils import setup_logging
+from downloader.web import create_app
+
+BIBTEX = "@article{a,\n  doi = {10.1000/one}\n}\n@article{b,\n  doi = {10.1000/two}\n}\n"
+
+
+@pytest.fixture
+def config(tmp_path):
+    previous = get_config()
+    config = AppConfig(data_dir=tmp_path / "data", max_upload_size=64 * 1024)
+    set_config(config)
+    yield config
+    set_config(previous)
+    setup_logging()
+
+
+@pytest.fixture
+def client(config):
+    with create_app(config).test_client() as client:
+        yield client
+
+
+def _zip(name: str, content: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("body", [
+    BIBTEX.encode(),
+    gzip.compress(BIBTEX.encode()),
+    _zip("export.bib", BIBTEX),
+])
+def test_raw_body_is_extracted(client, config, tmp_path, body):
+    output = tmp_path / "dois.txt"
+    
+    response = client.post(f"/extract-bibtex?filename=export.bib&output_path={output}", data=body,
+                           content_type="application/octet-stream")
+    
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()["count"] == 2
+    assert output.read_text(encoding='utf-8').splitlines() == ["10.1000/one", "10.1000/two"]
+
+
+def test_multipart_upload_is_extracted(client, tmp_path):
+    output = tmp_path / "dois.txt"
+    
+    response = client.post("/extract-bibtex", data={
+        "file": (io.BytesIO(gzip.compress(BIBTEX.encode())), "export.bib.gz"),
+        "output_path": str(output),
+    }, content_type="multipart/form-data")
+    
+    assert response.status_code == 200, response.get_json()
+    assert output.read_text(encoding='utf-8').splitlines() == ["10.1000/one", "10.1000/two"]
+
+
+def test_empty_body_is_rejected(client):
+    response = client.post("/extract-bibtex", data=b"", content_type="application/octet-stream")
+    
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "No file uploaded"
+
+
+def test_body_over_the_upload_limit_is_rejected(client):
+    body = (BIBTEX * 2000).encode()
+    
+    response = client.post("/extract-bibtex?filename=export.bib", data=body, content_type="application/octet-stream")
+    
+    assert response.status_code == 413
+
+
+def test_upload_limit_defaults_to_one_gib():
+    assert AppConfig.max_upload_size == 1024 ** 3
@@ -0,0 +1,33 @@
+"""
+Tests for DOI normalization and validation
+"""
+
+from downloader.utils import normalize_doi, normalize_dois
+
+
+def test_normalize_doi_prefixes():
+    for raw in ("doi:10.1000/abc", "https://doi.org/10.1000/abc", "http://dx.doi.org/10.1000/abc",
+                "doi.org/10.1000/abc", "  10.1000/abc  "):
+        assert normalize_doi(raw) == "10.1000/abc"
+
+
+def test_normalize_dois_keeps_input_order():
+    valid, invalid = normalize_dois(["10.1000/b", "nonsense", "doi:10.1000/a", ""])
+    assert valid == ["10.1000/b", "10.1000/a"]
+    assert invalid == ["nonsense", ""]
+
+
+def test_normalize_dois_reports_invalid_values_as_they_are_read():
+    read = []
+    reported = []
+    
+    def values():
+        for value in ("10.1000/a", "bad", "10.1000/b"):
+            read.append(value)
+            yield value
+    
+    valid, invalid = normalize_dois(values(), on_invalid=lambda raw: reported.append((raw, len(read))))
+    
+    assert valid == ["10.1000/a", "10.1000/b"]
+    assert invalid == []
+    assert reported == [("bad", 2)]